@@ -157,6 +157,41 @@ class JamfObjectReader(JamfObjectReaderBase):
             "description": "Only output a variable with a list of all objects - ID and name",
             "default": "False",
         },
+        "download_workers": {
+            "required": False,
+            "description": (
+                "Number of objects to download at once when using 'all_objects'. "
+                "Must be an integer between 1 and 20."
+            ),
+            "default": "4",
+        },
+        "export_format": {
+            "required": False,
+            "description": (
+                "When using 'all_objects', how to write the objects to output_dir: "
+                "'files' for a file per object, 'jsonl' for a single gzip-compressed "
+                "JSON Lines file, or 'tar' for a single tar archive. Archives have "
+                "an index for finding objects by name."
+            ),
+            "default": "files",
+        },
+        "incremental": {
+            "required": False,
+            "description": (
+                "When using 'all_objects', only download objects that are new or "
+                "have changed since the previous export to output_dir, and remove "
+                "the files of objects that no longer exist."
+            ),
+            "default": "False",
+        },
+        "resume": {
+            "required": False,
+            "description": (
+                "When using 'all_objects', continue an export to output_dir that "
+                "did not finish, instead of reading every object again."
+            ),
+            "default": "False",
+        },
     }
 
     output_variables = {
@@ -187,6 +222,12 @@ class JamfObjectReader(JamfObjectReaderBase):
         "payload_file_path": {
             "description": "Path of outputted payload",
         },
+        "export_changes": {
+            "description": (
+                "For incremental exports, the number of objects added, changed, "
+                "removed and unchanged since the previous export."
+            ),
+        },
     }
 
     def main(self):
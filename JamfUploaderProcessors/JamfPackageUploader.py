@@ -230,6 +230,16 @@ class JamfPackageUploader(JamfPackageUploaderBase):
             "description": "Overwrite an existing package if True.",
             "default": "False",
         },
+        "skip_unchanged_pkg": {
+            "required": False,
+            "description": (
+                "If True, and replace_pkg is True, don't upload the package when the "
+                "existing package in Jamf Pro has the same SHA3-512 or MD5 hash "
+                "and its file is on the Cloud Distribution Point. Package metadata "
+                "is still replaced if replace_pkg_metadata is True."
+            ),
+            "default": "False",
+        },
         "jcds_mode": {
             "required": False,
             "description": ("This option is no longer functional. "),
@@ -294,6 +304,12 @@ class JamfPackageUploader(JamfPackageUploaderBase):
         "pkg_uploaded": {
             "description": "True/False depending if a package was uploaded or not.",
         },
+        "pkg_deduplicated": {
+            "description": (
+                "True if the package was not uploaded because the existing package "
+                "has the same hash."
+            ),
+        },
         "jamfpackageuploader_summary_result": {
             "description": "Description of interesting results.",
         },
@@ -114,6 +114,14 @@ class JamfUnusedPackageCleaner(JamfUnusedPackageCleanerBase):
             ),
             "default": "5",
         },
+        "download_workers": {
+            "required": False,
+            "description": (
+                "Number of policies and patch titles to read at once when looking "
+                "for packages in use. Must be an integer between 1 and 20."
+            ),
+            "default": "4",
+        },
     }
 
     output_variables = {
@@ -20,8 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
-
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
 )
@@ -62,34 +60,21 @@ class JamfAPIClientUploaderBase(JamfUploaderBase):
         else:
             url = f"{api_url}/{endpoint}"
 
-        count = 0
-        while True:
-            count += 1
-            self.output(
-                f"{object_type} upload attempt {count}",
-                verbose_level=2,
-            )
-            request = "PUT" if object_id else "POST"
-            r = self.curl(
+        request = "PUT" if object_id else "POST"
+        r = self.send_with_retry(
+            lambda: self.curl(
                 api_type="jpapi",
                 request=request,
                 url=url,
                 token=token,
                 data=object_template,
-            )
-            # check HTTP response
-            if self.status_check(r, object_type, object_name, request) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"{object_type} upload did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError(f"ERROR: {object_type} upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            object_type,
+            object_name,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
         return r
 
     def get_api_client_credentials(
@@ -105,31 +90,15 @@ class JamfAPIClientUploaderBase(JamfUploaderBase):
         api_client_id = ""
         api_client_secret = ""
 
-        count = 0
-        while True:
-            count += 1
-            self.output(
-                f"{object_type} upload attempt {count}",
-                verbose_level=2,
-            )
-            request = "POST"
-            r = self.curl(api_type="jpapi", request=request, url=url, token=token)
-            # check HTTP response
-            if (
-                self.status_check(r, object_type, "client secret request", request)
-                == "break"
-            ):
-                break
-            if count >= max_tries:
-                self.output(
-                    f"{object_type} upload did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError(f"ERROR: {object_type} upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+        request = "POST"
+        r = self.send_with_retry(
+            lambda: self.curl(api_type="jpapi", request=request, url=url, token=token),
+            object_type,
+            "client secret request",
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
 
         # get the Client ID and Secret
         if r.status_code < 300:
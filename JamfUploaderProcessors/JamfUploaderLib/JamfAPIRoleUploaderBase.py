@@ -20,8 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
-
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
 )
@@ -62,31 +60,21 @@ class JamfAPIRoleUploaderBase(JamfUploaderBase):
         else:
             url = f"{api_url}/{endpoint}"
 
-        count = 0
-        while True:
-            count += 1
-            self.output(f"{object_type} upload attempt {count}", verbose_level=2)
-            request = "PUT" if object_id else "POST"
-            r = self.curl(
+        request = "PUT" if object_id else "POST"
+        r = self.send_with_retry(
+            lambda: self.curl(
                 api_type="jpapi",
                 request=request,
                 url=url,
                 token=token,
                 data=object_template,
-            )
-            # check HTTP response
-            if self.status_check(r, object_type, object_name, request) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"WARNING: {object_type} upload did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError(f"ERROR: {object_type} upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            object_type,
+            object_name,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
         return r
 
     def execute(self):
@@ -20,12 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
-
-from autopkglib import (  # pylint: disable=import-error
-    ProcessorError,
-)
-
 # to use a base module in AutoPkg we need to add this path to the sys.path.
 # this violates flake8 E402 (PEP8 imports) but is unavoidable, so the following
 # imports require noqa comments for E402
@@ -66,38 +60,24 @@ class JamfCategoryUploaderBase(JamfUploaderBase):
             url = f"{api_url}/{endpoint}"
 
         # write the category.
-        count = 0
         category_json = self.write_json_file(api_url, category_data)
-        while True:
-            count += 1
-            self.output(
-                f"Category upload attempt {count}",
-                verbose_level=2,
-            )
-            request = "PUT" if object_id else "POST"
-            r = self.curl(
+        request = "PUT" if object_id else "POST"
+        r = self.send_with_retry(
+            lambda: self.curl(
                 api_type="jpapi",
                 request=request,
                 url=url,
                 token=token,
                 data=category_json,
-            )
-
-            # check HTTP response
-            if self.status_check(r, "Category", object_name, request) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"ERROR: Category creation did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError("ERROR: Category upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            "Category",
+            object_name,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
 
-            # output the ID of the new or updated object
+        # output the ID of the new or updated object
         if not object_id:
             object_id = r.output["id"]
         if object_id:
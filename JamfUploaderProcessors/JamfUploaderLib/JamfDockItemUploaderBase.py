@@ -24,12 +24,6 @@ import os.path
 import sys
 import xml.etree.ElementTree as ET
 
-from time import sleep
-
-from autopkglib import (  # pylint: disable=import-error
-    ProcessorError,
-)
-
 # to use a base module in AutoPkg we need to add this path to the sys.path.
 # this violates flake8 E402 (PEP8 imports) but is unavoidable, so the following
 # imports require noqa comments for E402
@@ -73,34 +67,21 @@ class JamfDockItemUploaderBase(JamfUploaderBase):
         endpoint = self.api_endpoints(object_type, tenant_id=tenant_id)
         url = f"{api_url}/{endpoint}/id/{object_id}"
 
-        count = 0
-        while True:
-            count += 1
-            self.output(
-                f"Dock Item upload attempt {count}",
-                verbose_level=2,
-            )
-            request = "PUT" if object_id else "POST"
-            r = self.curl(
+        request = "PUT" if object_id else "POST"
+        self.send_with_retry(
+            lambda: self.curl(
                 api_type="classic",
                 request=request,
                 url=url,
                 token=token,
                 data=dock_item_xml,
-            )
-            # check HTTP response
-            if self.status_check(r, "Dock Item", object_name, request) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"ERROR: Temporary dock item update did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError("ERROR: dock item upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            "Dock Item",
+            object_name,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
 
     def execute(self):
         """Upload a dock item"""
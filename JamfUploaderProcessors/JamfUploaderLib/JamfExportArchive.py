@@ -0,0 +1,175 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfExportArchive — single-file exports of many Jamf Pro objects.
+
+Writing one file per object is slow when there are tens of thousands of them,
+and the results are awkward to sync and diff. This module streams every object
+of a run into one archive instead:
+
+- "jsonl": gzip-compressed JSON Lines. Each line is a record holding the id,
+  name, type and parsed content of one object, compressed as a gzip member of
+  its own so that it can be read without decompressing the rest. The file can
+  still be read in full with gzip or zcat.
+- "tar": an uncompressed tar archive whose members are the files that a normal
+  export would write. The id, name and type of each object are stored in the
+  member's pax headers.
+
+Alongside the archive an index, <archive>.index.json, gives the byte offset and
+length of each object's data by name, for random access with read_record().
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import gzip
+import io
+import json
+import os
+import tarfile
+import time
+
+ARCHIVE_FORMATS = ("jsonl", "tar")
+ARCHIVE_EXTENSIONS = {"jsonl": "jsonl.gz", "tar": "tar"}
+
+
+def index_path(archive_path):
+    """Return the path of the index for an archive."""
+    return f"{archive_path}.index.json"
+
+
+def read_index(archive_path):
+    """Return the index of an archive."""
+    with open(index_path(archive_path), "r", encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+def read_record(archive_path, name, index=None):
+    """Return the records for the objects with this name in an archive.
+
+    Only the data for those objects is read. Each record is a dict with id,
+    name, type and content. An empty list is returned if the name is not in
+    the archive.
+    """
+    index = index or read_index(archive_path)
+    records = []
+    with open(archive_path, "rb") as fp:
+        for entry in index["objects"].get(name, []):
+            fp.seek(entry["offset"])
+            data = fp.read(entry["length"])
+            if index["format"] == "jsonl":
+                records.append(json.loads(gzip.decompress(data)))
+            else:
+                records.append(
+                    {
+                        "id": entry["id"],
+                        "name": name,
+                        "type": index["object_type"],
+                        "content": data.decode("utf-8"),
+                    }
+                )
+    return records
+
+
+class JamfExportArchive:
+    """Writer for a single-file export. Use as a context manager.
+
+    The archive and its index are written to temporary files, which only
+    replace any previous export when the archive is closed without an error.
+    """
+
+    def __init__(self, archive_path, archive_format, object_type, log_fn=None):
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unknown archive format '{archive_format}'")
+        self.archive_path = archive_path
+        self.archive_format = archive_format
+        self.object_type = object_type
+        self._log = log_fn or (lambda msg, verbose_level=2: None)
+        self._temp_path = f"{archive_path}.tmp"
+        self._fp = None
+        self._tar = None
+        self._objects = {}  # name -> list of index entries
+        self.count = 0
+
+    def __enter__(self):
+        self._fp = open(self._temp_path, "wb")  # pylint: disable=consider-using-with
+        if self.archive_format == "tar":
+            self._tar = tarfile.open(  # pylint: disable=consider-using-with
+                fileobj=self._fp, mode="w", format=tarfile.PAX_FORMAT
+            )
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._tar is not None:
+            self._tar.close()
+        self._fp.close()
+        if exc_type is not None:
+            os.remove(self._temp_path)
+            return False
+        index = {
+            "format": self.archive_format,
+            "object_type": self.object_type,
+            "created": int(time.time()),
+            "objects": self._objects,
+        }
+        temp_index_path = f"{index_path(self.archive_path)}.tmp"
+        with open(temp_index_path, "w", encoding="utf-8") as fp:
+            json.dump(index, fp, indent=4, sort_keys=True)
+        os.replace(self._temp_path, self.archive_path)
+        os.replace(temp_index_path, index_path(self.archive_path))
+        self._log(
+            f"Wrote {self.count} objects to {self.archive_path}", verbose_level=1
+        )
+        return False
+
+    def add(self, object_id, name, content, filename):
+        """Add an object to the archive.
+
+        content is the parsed object, either as text or, for JSON objects, as a
+        dict. filename is the name of the member in a tar archive.
+        """
+        if self.archive_format == "jsonl":
+            record = {
+                "id": str(object_id),
+                "name": name,
+                "type": self.object_type,
+                "content": content,
+            }
+            line = json.dumps(record, ensure_ascii=False) + "\n"
+            offset = self._fp.tell()
+            self._fp.write(gzip.compress(line.encode("utf-8"), mtime=0))
+            length = self._fp.tell() - offset
+        else:
+            if not isinstance(content, str):
+                content = json.dumps(content, indent=4, ensure_ascii=False)
+            data = content.encode("utf-8")
+            info = tarfile.TarInfo(filename)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            info.pax_headers = {
+                "JAMF.id": str(object_id),
+                "JAMF.name": str(name),
+                "JAMF.type": self.object_type,
+            }
+            self._tar.addfile(info, io.BytesIO(data))
+            # the data is the last thing written, padded to a 512-byte block
+            offset = self._fp.tell() - tarfile.BLOCKSIZE * (
+                -(-len(data) // tarfile.BLOCKSIZE)
+            )
+            length = len(data)
+        self._objects.setdefault(str(name), []).append(
+            {"id": str(object_id), "offset": offset, "length": length}
+        )
+        self.count += 1
@@ -0,0 +1,200 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfFileDigests — hash a file with several algorithms in one pass.
+
+Packages can be many gigabytes, so reading one once per digest (SHA3-512 for
+Jamf Pro, MD5 for some distribution points) is slow. file_digests() reads the
+file once, in large chunks, and feeds each chunk to every requested digest.
+Where there is more than one CPU, each digest is updated in a thread of its own,
+and hashlib releases the GIL while hashing, so the digests are calculated in
+parallel with each other and with the reading of the next chunk.
+
+Packages are often hashed again on the next run without having changed, so
+JamfDigestCache keeps the digests of each file in a small JSON file, and gives
+them back for as long as the file's path, size, inode, device, and modification
+and change times are the same.
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+
+DIGEST_ALGORITHMS = ("sha3_512", "sha512", "sha256", "md5")
+
+# bytes read at a time, a multiple of the page size
+HASH_BUFFER_SIZE = 8 * 1024 * 1024
+
+# chunks read ahead of the slowest digest
+HASH_QUEUE_DEPTH = 4
+
+
+def file_digests(path, algorithms=("sha3_512",), log_fn=None):
+    """Return {algorithm: hex digest} for a file, reading it only once.
+
+    algorithms are names from DIGEST_ALGORITHMS.
+    """
+    log = log_fn or (lambda msg, verbose_level=2: None)
+    algorithms = list(dict.fromkeys(algorithms))
+    unknown = set(algorithms) - set(DIGEST_ALGORITHMS)
+    if unknown:
+        raise ValueError(f"Unknown digest algorithm: {', '.join(sorted(unknown))}")
+    hashes = {name: hashlib.new(name) for name in algorithms}
+
+    start = time.monotonic()
+    if len(hashes) == 1 or (os.cpu_count() or 1) == 1:
+        size = _hash_serially(path, list(hashes.values()))
+    else:
+        size = _hash_in_parallel(path, list(hashes.values()))
+    elapsed = time.monotonic() - start
+    log(
+        f"Calculated {', '.join(algorithms)} of {size} bytes in {elapsed:.1f} seconds"
+        + (f" ({size / 1024 / 1024 / elapsed:.0f} MB/s)" if elapsed else ""),
+        verbose_level=2,
+    )
+    return {name: h.hexdigest() for name, h in hashes.items()}
+
+
+def _hash_serially(path, hashes):
+    """Feed a file to digests in this thread, reusing a single buffer, and return
+    its size."""
+    size = 0
+    buffer = memoryview(bytearray(HASH_BUFFER_SIZE))
+    with open(path, "rb", buffering=0) as f:
+        for n in iter(lambda: f.readinto(buffer), 0):
+            for h in hashes:
+                h.update(buffer[:n])
+            size += n
+    return size
+
+
+def _hash_in_parallel(path, hashes):
+    """Feed a file to several digests, each in its own thread, and return its size.
+
+    Chunks are new bytes objects rather than a reused buffer, so that a chunk can
+    be read while the digests are still hashing the ones before it.
+    """
+    queues = [queue.Queue(maxsize=HASH_QUEUE_DEPTH) for _ in hashes]
+
+    def update(h, chunks):
+        for chunk in iter(chunks.get, None):
+            h.update(chunk)
+
+    threads = [
+        threading.Thread(target=update, args=(h, chunks), daemon=True)
+        for h, chunks in zip(hashes, queues)
+    ]
+    for thread in threads:
+        thread.start()
+    size = 0
+    try:
+        with open(path, "rb", buffering=0) as f:
+            for chunk in iter(lambda: f.read(HASH_BUFFER_SIZE), b""):
+                for chunks in queues:
+                    chunks.put(chunk)
+                size += len(chunk)
+    finally:
+        for chunks in queues:
+            chunks.put(None)
+        for thread in threads:
+            thread.join()
+    return size
+
+
+def file_identity(path):
+    """Return the details of a file that change when its contents are replaced or
+    modified."""
+    st = os.stat(path)
+    return {
+        "path": path,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "ctime_ns": st.st_ctime_ns,
+        "inode": st.st_ino,
+        "device": st.st_dev,
+    }
+
+
+class JamfDigestCache:
+    """Digests of files, kept between runs.
+
+    Each file's digests are stored as {"identity": {...}, "digests": {...}} in
+    <cache_dir>/<sha256 of the file's real path>.json, and are used only while
+    file_identity() is unchanged. Entries are replaced atomically, so that several
+    runs can share a cache without locking.
+    """
+
+    def __init__(self, cache_dir, log_fn=None):
+        self.cache_dir = cache_dir
+        self._log = log_fn or (lambda msg, verbose_level=2: None)
+
+    def path(self, file_path):
+        """Return the path of the cache entry for a file."""
+        key = hashlib.sha256(os.path.realpath(file_path).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def file_digests(self, file_path, algorithms=("sha3_512",)):
+        """Return {algorithm: hex digest} for a file, as file_digests() does,
+        hashing it only if the cache does not hold the digests of its current
+        contents."""
+        real_path = os.path.realpath(file_path)
+        identity = file_identity(real_path)
+        cached = self._read(file_path, identity)
+        missing = [name for name in dict.fromkeys(algorithms) if name not in cached]
+        if not missing:
+            self._log(f"Using cached digests of {file_path}", verbose_level=2)
+            return {name: cached[name] for name in algorithms}
+
+        digests = {**cached, **file_digests(real_path, missing, self._log)}
+        # don't keep digests of a file that changed while it was being read
+        if file_identity(real_path) == identity:
+            self._write(file_path, {"identity": identity, "digests": digests})
+        else:
+            self._log(f"{file_path} changed while it was hashed", verbose_level=2)
+        return {name: digests[name] for name in algorithms}
+
+    def _read(self, file_path, identity):
+        """Return the cached digests of a file with this identity, or {}."""
+        try:
+            with open(self.path(file_path), "r", encoding="utf-8") as fp:
+                entry = json.load(fp)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(entry, dict) or entry.get("identity") != identity:
+            return {}
+        digests = entry.get("digests")
+        return digests if isinstance(digests, dict) else {}
+
+    def _write(self, file_path, entry):
+        """Replace the cache entry for a file. Failures are logged, as the cache
+        is only an optimisation."""
+        temp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                json.dump(entry, fp)
+            os.replace(temp_path, self.path(file_path))
+        except OSError as e:
+            self._log(f"Could not update digest cache: {e}", verbose_level=2)
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
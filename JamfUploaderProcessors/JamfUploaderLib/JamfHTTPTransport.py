@@ -0,0 +1,542 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfHTTPTransport — in-process HTTP engine for JamfUploader.
+
+Provides a thread-safe pool of persistent (keep-alive) connections built on
+the standard library's http.client, as an alternative to forking /usr/bin/curl
+for every request. JamfUploaderBase.curl() still builds a curl argument list
+for each request; request_from_curl_args() translates that list into a request
+for this engine, so both engines share one description of every API call.
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import http.client
+import http.cookiejar
+import os
+import shutil
+import socket
+import ssl
+import tempfile
+import threading
+import uuid
+import urllib.request
+
+from collections import namedtuple
+from urllib.parse import quote_plus, urljoin, urlsplit
+
+try:
+    import certifi
+
+    CERTIFI_AVAILABLE = True
+except ImportError:
+    CERTIFI_AVAILABLE = False
+
+# Size of the blocks used when streaming request bodies and reading responses.
+# The http.client default of 8 KiB is far too small for multi-GB packages.
+BLOCK_SIZE = 1024 * 1024
+
+# Default socket timeout (seconds) for each connect/send/receive operation.
+DEFAULT_TIMEOUT = 300
+
+# Idle connections kept per host. Requests beyond this open extra connections,
+# which are closed rather than pooled once the request completes.
+DEFAULT_MAX_CONNECTIONS = 8
+
+MAX_REDIRECTS = 20
+
+# curl options that take no argument and have no effect on the request itself
+_CURL_FLAGS_IGNORED = {
+    "--show-error",
+    "--silent",
+    "--progress-bar",
+    "--no-buffer",
+}
+
+# curl options that take an argument we do not need in-process
+_CURL_OPTS_IGNORED = {
+    "--dump-header",  # headers are returned directly
+    "--cookie-jar",  # cookies are held in the transport's cookie jar
+    "--cookie",
+    "--output",  # the body is returned directly
+}
+
+# Errors on a reused keep-alive connection that mean the server closed it while
+# it sat idle. The request is retried once on a fresh connection.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+HTTPResult = namedtuple("HTTPResult", ["status_code", "header_lines", "body"])
+
+
+class TransportError(Exception):
+    """A request could not be completed (connection, TLS or protocol failure)."""
+
+
+class UnsupportedCurlOption(Exception):
+    """The curl arguments contain an option this engine cannot reproduce."""
+
+
+def request_from_curl_args(args):
+    """Translate a curl argument list (without the curl binary) into request kwargs.
+
+    Only the options that JamfUploaderBase.curl() and its callers use are
+    understood. Anything else (e.g. from custom_curl_opts) raises
+    UnsupportedCurlOption so that the caller can fall back to curl itself.
+    """
+    url = ""
+    method = ""
+    headers = []
+    upload_file = ""
+    data = []
+    form = []
+    insecure = False
+    follow_redirects = False
+
+    i = 0
+    while i < len(args):
+        arg = args[i].decode("utf-8") if isinstance(args[i], bytes) else str(args[i])
+        if not arg.startswith("-"):
+            url = arg
+            i += 1
+            continue
+        if arg in _CURL_FLAGS_IGNORED:
+            i += 1
+            continue
+        if arg == "--location":
+            follow_redirects = True
+            i += 1
+            continue
+        if arg == "--insecure":
+            insecure = True
+            i += 1
+            continue
+        if i + 1 >= len(args):
+            raise UnsupportedCurlOption(f"{arg} (missing value)")
+        value = args[i + 1]
+        value = value.decode("utf-8") if isinstance(value, bytes) else str(value)
+        if arg in _CURL_OPTS_IGNORED:
+            pass
+        elif arg == "--url":
+            url = value
+        elif arg == "--request":
+            method = value.upper()
+        elif arg == "--header":
+            name, _, header_value = value.partition(":")
+            headers.append((name.strip(), header_value.strip()))
+        elif arg == "--upload-file":
+            upload_file = value
+        elif arg == "--data":
+            data.append(_curl_data_value(value))
+        elif arg == "--data-urlencode":
+            data.append(_curl_urlencode_value(value))
+        elif arg == "--form":
+            form.append(_curl_form_value(value))
+        else:
+            raise UnsupportedCurlOption(arg)
+        i += 2
+
+    if not url:
+        raise UnsupportedCurlOption("no URL")
+
+    # curl derives the method from the body options when --request is absent
+    if not method:
+        if data or form:
+            method = "POST"
+        elif upload_file:
+            method = "PUT"
+        else:
+            method = "GET"
+
+    body = None
+    if form:
+        body = ("form", form)
+    elif upload_file:
+        body = ("file", upload_file)
+    elif data:
+        body = ("bytes", "&".join(data).encode("utf-8"))
+        if not _get_header(headers, "content-type"):
+            headers.append(("Content-Type", "application/x-www-form-urlencoded"))
+
+    return {
+        "method": method,
+        "url": url,
+        "headers": headers,
+        "body": body,
+        "insecure": insecure,
+        "follow_redirects": follow_redirects,
+    }
+
+
+def _curl_data_value(value):
+    """Reproduce curl --data: '@file' reads the file with CR/LF removed."""
+    if value.startswith("@"):
+        with open(value[1:], "r", encoding="utf-8") as fp:
+            return fp.read().replace("\r", "").replace("\n", "")
+    return value
+
+
+def _curl_urlencode_value(value):
+    """Reproduce curl --data-urlencode for the 'name=content' and 'content' forms."""
+    if "=" in value:
+        name, _, content = value.partition("=")
+        if name:
+            return f"{name}={quote_plus(content)}"
+        return quote_plus(content)
+    return quote_plus(value)
+
+
+def _curl_form_value(value):
+    """Parse a curl --form value such as 'file=@/path/to.pkg;type=image/png'."""
+    name, _, content = value.partition("=")
+    if not content.startswith("@"):
+        raise UnsupportedCurlOption(f"--form {name} (only file parts are supported)")
+    path, _, params = content[1:].partition(";")
+    content_type = "application/octet-stream"
+    if params.startswith("type="):
+        content_type = params[len("type=") :]
+    return (name, path, content_type)
+
+
+def _get_header(headers, name):
+    """Return the first value of a header from a list of (name, value) pairs."""
+    for header_name, header_value in headers:
+        if header_name.lower() == name:
+            return header_value
+    return None
+
+
+class _MultipartBody:
+    """A multipart/form-data body streamed from disk with a known length."""
+
+    def __init__(self, parts):
+        self.boundary = f"------------------------{uuid.uuid4().hex}"
+        self._parts = []
+        for name, path, content_type in parts:
+            filename = os.path.basename(path).replace('"', "%22")
+            head = (
+                f"--{self.boundary}\r\n"
+                f'Content-Disposition: form-data; name="{name}"; '
+                f'filename="{filename}"\r\n'
+                f"Content-Type: {content_type}\r\n\r\n"
+            ).encode("utf-8")
+            self._parts.append((head, path))
+        self._tail = f"--{self.boundary}--\r\n".encode("utf-8")
+
+    @property
+    def content_type(self):
+        """The Content-Type header value including the boundary."""
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self):
+        size = len(self._tail)
+        for head, path in self._parts:
+            size += len(head) + os.path.getsize(path) + 2
+        return size
+
+    def __iter__(self):
+        for head, path in self._parts:
+            yield head
+            with open(path, "rb") as fp:
+                while True:
+                    chunk = fp.read(BLOCK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+            yield b"\r\n"
+        yield self._tail
+
+
+class _HTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection with Nagle's algorithm disabled, as curl does.
+
+    http.client sends headers and body in separate writes; without TCP_NODELAY
+    the second write can stall on the server's delayed ACK.
+    """
+
+    def connect(self):
+        super().connect()
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+class _HTTPSConnection(http.client.HTTPSConnection):
+    """HTTPSConnection with Nagle's algorithm disabled, as curl does."""
+
+    def connect(self):
+        super().connect()
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+class JamfHTTPTransport:
+    """A pool of keep-alive HTTP(S) connections shared by all requests in a process.
+
+    Args:
+        max_connections: Idle connections kept per host.
+        timeout:         Socket timeout in seconds.
+        log_fn:          Optional callable(msg, verbose_level) for logging.
+    """
+
+    def __init__(
+        self, max_connections=DEFAULT_MAX_CONNECTIONS, timeout=DEFAULT_TIMEOUT, log_fn=None
+    ):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._log = log_fn or (lambda msg, **kw: None)
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._cookies = http.cookiejar.CookieJar()
+        self._ssl_contexts = {}
+        self.stats = {"requests": 0, "connections_opened": 0, "connections_reused": 0}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def request(
+        self,
+        method,
+        url,
+        headers=None,
+        body=None,
+        insecure=False,
+        follow_redirects=False,
+        spool_threshold=None,
+    ):
+        """Send a request and return an HTTPResult.
+
+        Args:
+            headers: list of (name, value) pairs. Where a name is repeated,
+                     the first value is used.
+            body:    None, or a tuple of ("bytes", data), ("file", path) or
+                     ("form", [(name, path, content_type), ...]).
+            spool_threshold: if set, the response body is returned as a
+                     SpooledTemporaryFile that is held in memory up to this
+                     many bytes and spills to disk above it. Otherwise the
+                     body is returned as bytes.
+
+        Raises TransportError if no HTTP response could be obtained.
+        """
+        headers = list(headers or [])
+        header_lines = []
+        for _ in range(MAX_REDIRECTS + 1):
+            status, lines, response_body, location = self._send(
+                method, url, headers, body, insecure, spool_threshold
+            )
+            header_lines.extend(lines)
+            if not (follow_redirects and location and status in (301, 302, 303, 307, 308)):
+                return HTTPResult(status, header_lines, response_body)
+            if spool_threshold is not None:
+                response_body.close()
+            new_url = urljoin(url, location)
+            self._log(f"Following redirect to {new_url}", verbose_level=3)
+            if urlsplit(new_url).netloc != urlsplit(url).netloc:
+                # like curl, only send credentials to the original host
+                headers = [h for h in headers if h[0].lower() != "authorization"]
+            if status == 303:
+                method, body = "GET", None
+            url = new_url
+        raise TransportError(f"Maximum of {MAX_REDIRECTS} redirects exceeded")
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn in connections:
+                conn.close()
+
+    # ------------------------------------------------------------------
+    # Connection pool
+    # ------------------------------------------------------------------
+
+    def _pool_key(self, scheme, netloc, insecure):
+        """Return the pool key and proxy (if any) for a URL."""
+        proxy = None
+        proxies = urllib.request.getproxies()
+        host = netloc.rpartition("@")[2]
+        if proxies.get(scheme) and not urllib.request.proxy_bypass(host.split(":")[0]):
+            proxy = proxies[scheme]
+        return (scheme, host, insecure, proxy), proxy
+
+    def _checkout(self, key):
+        """Return (connection, reused) for a pool key."""
+        with self._lock:
+            connections = self._idle.get(key)
+            if connections:
+                self.stats["connections_reused"] += 1
+                return connections.pop(), True
+            self.stats["connections_opened"] += 1
+        return self._connect(*key), False
+
+    def _checkin(self, key, conn):
+        """Return a connection to the pool, or close it if the pool is full."""
+        with self._lock:
+            connections = self._idle.setdefault(key, [])
+            if len(connections) < self.max_connections:
+                connections.append(conn)
+                return
+        conn.close()
+
+    def _connect(self, scheme, host, insecure, proxy):
+        """Create a new (unconnected) HTTP(S) connection."""
+        target_host, _, target_port = host.partition(":")
+        target_port = int(target_port) if target_port else None
+        if proxy:
+            proxy_netloc = urlsplit(proxy).netloc or proxy
+            proxy_host, _, proxy_port = proxy_netloc.rpartition("@")[2].partition(":")
+            connect_host, connect_port = proxy_host, int(proxy_port or 8080)
+        else:
+            connect_host, connect_port = target_host, target_port
+
+        if scheme == "https":
+            conn = _HTTPSConnection(
+                connect_host,
+                connect_port,
+                timeout=self.timeout,
+                context=self._ssl_context(insecure),
+                blocksize=BLOCK_SIZE,
+            )
+            if proxy:
+                conn.set_tunnel(target_host, target_port)
+        elif scheme == "http":
+            conn = _HTTPConnection(
+                connect_host, connect_port, timeout=self.timeout, blocksize=BLOCK_SIZE
+            )
+        else:
+            raise TransportError(f"Unsupported URL scheme '{scheme}'")
+        return conn
+
+    def _ssl_context(self, insecure):
+        """Return a (cached) SSL context."""
+        if insecure not in self._ssl_contexts:
+            if CERTIFI_AVAILABLE:
+                context = ssl.create_default_context(cafile=certifi.where())
+            else:
+                context = ssl.create_default_context()
+            if insecure:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            self._ssl_contexts[insecure] = context
+        return self._ssl_contexts[insecure]
+
+    # ------------------------------------------------------------------
+    # Single request/response exchange
+    # ------------------------------------------------------------------
+
+    def _send(self, method, url, headers, body, insecure, spool_threshold=None):
+        """Send one request (no redirect handling).
+
+        Returns (status, header_lines, response_body, location).
+        """
+        parts = urlsplit(url)
+        key, proxy = self._pool_key(parts.scheme, parts.netloc, insecure)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        if proxy and parts.scheme == "http":
+            # plain HTTP through a proxy uses the absolute URL as the request target
+            path = url
+
+        # attach any cookies the server has set for this URL
+        cookie_request = urllib.request.Request(url, method=method)
+        self._cookies.add_cookie_header(cookie_request)
+
+        # first value wins for repeated header names
+        send_headers = {}
+        for name, value in headers:
+            if name.lower() not in (k.lower() for k in send_headers):
+                send_headers[name] = value
+        if cookie_request.has_header("Cookie"):
+            send_headers["Cookie"] = cookie_request.get_header("Cookie")
+
+        self.stats["requests"] += 1
+        attempt = 0
+        while True:
+            attempt += 1
+            conn, reused = self._checkout(key)
+            request_body = None
+            try:
+                request_body = self._prepare_body(body, send_headers)
+                conn.request(method, path, body=request_body, headers=send_headers)
+                response = conn.getresponse()
+                if spool_threshold is None:
+                    response_body = response.read()
+                else:
+                    response_body = tempfile.SpooledTemporaryFile(
+                        max_size=spool_threshold
+                    )
+                    shutil.copyfileobj(response, response_body, BLOCK_SIZE)
+                    response_body.seek(0)
+            except _STALE_CONNECTION_ERRORS as e:
+                conn.close()
+                if reused and attempt == 1:
+                    self._log(
+                        f"Pooled connection was closed by the server ({e}), reconnecting",
+                        verbose_level=3,
+                    )
+                    continue
+                raise TransportError(str(e) or type(e).__name__) from e
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                raise TransportError(str(e) or type(e).__name__) from e
+            finally:
+                if hasattr(request_body, "close"):
+                    request_body.close()
+            break
+
+        self._cookies.extract_cookies(response, cookie_request)
+
+        version = "HTTP/1.0" if response.version == 10 else "HTTP/1.1"
+        header_lines = [f"{version} {response.status} {response.reason}".strip()]
+        header_lines.extend(f"{name}: {value}" for name, value in response.getheaders())
+        header_lines.append("")
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._checkin(key, conn)
+
+        return (
+            response.status,
+            header_lines,
+            response_body,
+            response.getheader("Location"),
+        )
+
+    @staticmethod
+    def _prepare_body(body, send_headers):
+        """Return the body to pass to http.client, setting length/type headers."""
+        if body is None:
+            return None
+        kind, value = body
+        if kind == "bytes":
+            return value
+        if kind == "file":
+            send_headers["Content-Length"] = str(os.path.getsize(value))
+            return open(value, "rb")  # pylint: disable=consider-using-with
+        if kind == "form":
+            multipart = _MultipartBody(value)
+            for name in [k for k in send_headers if k.lower() == "content-type"]:
+                del send_headers[name]
+            send_headers["Content-Type"] = multipart.content_type
+            send_headers["Content-Length"] = str(len(multipart))
+            return iter(multipart)
+        raise TransportError(f"Unknown body type '{kind}'")
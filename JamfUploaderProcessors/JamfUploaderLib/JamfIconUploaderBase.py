@@ -20,8 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
-
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
 )
@@ -44,30 +42,17 @@ class JamfIconUploaderBase(JamfUploaderBase):
 
         self.output(f"Downloading icon from {icon_uri}...", verbose_level=2)
         # download the icon
-        count = 0
-        while True:
-            count += 1
-            self.output(
-                f"Icon download attempt {count}",
-                verbose_level=2,
-            )
-            request = "GET"
-            r = self.curl(
+        request = "GET"
+        r = self.send_with_retry(
+            lambda: self.curl(
                 api_type="none", request=request, url=icon_uri, endpoint_type="icon_get"
-            )
-            # check HTTP response
-            if self.status_check(r, "Icon", icon_uri, request) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"ERROR: Icon download did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError("ERROR: Icon download failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            "Icon",
+            icon_uri,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
         return r
 
     def upload_icon(self, api_url, icon_file, sleep_time, token, max_tries, tenant_id=""):
@@ -81,36 +66,22 @@ class JamfIconUploaderBase(JamfUploaderBase):
         url = f"{api_url}/{endpoint}"
 
         # upload the icon
-        count = 0
-        while True:
-            count += 1
-            self.output(
-                f"Icon upload attempt {count}",
-                verbose_level=2,
-            )
-            request = "POST"
-            r = self.curl(
+        request = "POST"
+        r = self.send_with_retry(
+            lambda: self.curl(
                 api_type="jpapi",
                 request=request,
                 url=url,
                 token=token,
                 data=icon_file,
                 endpoint_type="icon_upload",
-            )
-
-            # check HTTP response
-            if self.status_check(r, "Icon", icon_file, request) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"ERROR: Icon upload did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError("ERROR: Icon upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            "Icon",
+            icon_file,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
         return r
 
     def execute(self):
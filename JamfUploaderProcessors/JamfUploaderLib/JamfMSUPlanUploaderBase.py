@@ -21,8 +21,6 @@ import os.path
 import sys
 
 from datetime import datetime, timedelta
-from time import sleep
-
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
 )
@@ -136,30 +134,20 @@ class JamfMSUPlanUploaderBase(JamfUploaderBase):
         url = f"{api_url}/{endpoint}"
         request = "POST"
 
-        count = 0
-        while True:
-            count += 1
-            self.output(f"{object_type} upload attempt {count}", verbose_level=2)
-            r = self.curl(
+        r = self.send_with_retry(
+            lambda: self.curl(
                 api_type="jpapi",
                 request=request,
                 url=url,
                 token=token,
                 data=object_template,
-            )
-            # check HTTP response
-            if self.status_check(r, object_type, object_name, request) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"WARNING: {object_type} upload did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError(f"ERROR: {object_type} upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            object_type,
+            object_name,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
         return r
 
     def execute(self):
@@ -22,8 +22,6 @@ import os.path
 import re
 import sys
 
-from time import sleep
-
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
 )
@@ -83,31 +81,21 @@ class JamfMacAppUploaderBase(JamfUploaderBase):
         # if we find an object ID we put, if not, we post
         url = f"{api_url}/{endpoint}/id/{object_id}"
 
-        count = 0
-        while True:
-            count += 1
-            self.output(f"MAS app upload attempt {count}", verbose_level=2)
-            request = "PUT" if object_id else "POST"
-            r = self.curl(
+        request = "PUT" if object_id else "POST"
+        r = self.send_with_retry(
+            lambda: self.curl(
                 api_type="classic",
                 request=request,
                 url=url,
                 token=token,
                 data=object_template,
-            )
-            # check HTTP response
-            if self.status_check(r, "mac_application", object_name, request) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"WARNING: MAS app upload did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError("ERROR: Mac app upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            "mac_application",
+            object_name,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
         return r
 
     def execute(self):
@@ -20,8 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
-
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
 )
@@ -106,37 +104,21 @@ class JamfMobileDeviceExtensionAttributeUploaderBase(JamfUploaderBase):
             verbose_level=2,
         )
 
-        count = 0
-        while True:
-            count += 1
-            self.output(
-                f"Extension Attribute upload attempt {count}",
-                verbose_level=2,
-            )
-            request = "PUT" if object_id else "POST"
-            r = self.curl(
+        request = "PUT" if object_id else "POST"
+        self.send_with_retry(
+            lambda: self.curl(
                 api_type="classic",
                 request=request,
                 url=url,
                 token=token,
                 data=template_xml,
-            )
-            # check HTTP response
-            if (
-                self.status_check(r, "Extension Attribute", object_name, request)
-                == "break"
-            ):
-                break
-            if count >= max_tries:
-                self.output(
-                    f"ERROR: Extension Attribute upload did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError("ERROR: Extension Attribute upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            "Extension Attribute",
+            object_name,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
 
     def execute(self):
         """Upload an extension attribute"""
@@ -74,35 +74,21 @@ class JamfMobileDeviceGroupUploaderBase(JamfUploaderBase):
         # if we find an object ID we put, if not, we post
         url = f"{api_url}/{endpoint}/id/{object_id}"
 
-        count = 0
-        while True:
-            count += 1
-            self.output(f"Mobile Device Group upload attempt {count}", verbose_level=2)
-            request = "PUT" if object_id else "POST"
-            r = self.curl(
+        request = "PUT" if object_id else "POST"
+        self.send_with_retry(
+            lambda: self.curl(
                 api_type="classic",
                 request=request,
                 url=url,
                 token=token,
                 data=template_xml,
-            )
-
-            # check HTTP response
-            if (
-                self.status_check(r, "Mobile Device Group", object_name, request)
-                == "break"
-            ):
-                break
-            if count >= max_tries:
-                self.output(
-                    f"WARNING: Mobile Device Group upload did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError("ERROR: Mobile Device Group upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            "Mobile Device Group",
+            object_name,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
 
     def execute(self):
         """Upload a mobile device group"""
@@ -23,8 +23,6 @@ import plistlib
 import subprocess
 import uuid
 
-from time import sleep
-
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
 )
@@ -169,38 +167,22 @@ class JamfMobileDeviceProfileUploaderBase(JamfUploaderBase):
         # if we find an object ID we put, if not, we post
         url = f"{api_url}/{endpoint}/id/{object_id}"
 
-        count = 0
-        while True:
-            count += 1
-            self.output(
-                f"Configuration Profile upload attempt {count}", verbose_level=1
-            )
-            request = "PUT" if object_id else "POST"
-            r = self.curl(
+        request = "PUT" if object_id else "POST"
+        r = self.send_with_retry(
+            lambda: self.curl(
                 api_type="classic",
                 request=request,
                 url=url,
                 token=token,
                 data=template_xml,
-            )
-
-            # check HTTP response
-            if (
-                self.status_check(r, "Configuration Profile", object_name, request)
-                == "break"
-            ):
-                break
-            if count >= max_tries:
-                self.output(
-                    f"ERROR: Configuration Profile upload did not succeed after {max_tries} "
-                    "attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                break
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            "Configuration Profile",
+            object_name,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+            raise_on_failure=False,
+        )
 
         return r
 
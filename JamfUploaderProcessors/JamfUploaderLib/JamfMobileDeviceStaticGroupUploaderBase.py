@@ -22,10 +22,6 @@ import sys
 
 from time import sleep
 
-from autopkglib import (  # pylint: disable=import-error
-    ProcessorError,
-)
-
 # to use a base module in AutoPkg we need to add this path to the sys.path.
 # this violates flake8 E402 (PEP8 imports) but is unavoidable, so the following
 # imports require noqa comments for E402
@@ -97,36 +93,22 @@ class JamfMobileDeviceStaticGroupUploaderBase(JamfUploaderBase):
         else:
             url = f"{api_url}/{endpoint}"
 
-        count = 0
         object_json = self.write_json_file(api_url, object_data)
-        while True:
-            count += 1
-            self.output(f"Mobile Device Group upload attempt {count}", verbose_level=2)
-            request = "PUT" if object_id else "POST"
-            r = self.curl(
+        request = "PUT" if object_id else "POST"
+        self.send_with_retry(
+            lambda: self.curl(
                 api_type="jpapi",
                 request=request,
                 url=url,
                 token=token,
                 data=object_json,
-            )
-
-            # check HTTP response
-            if (
-                self.status_check(r, "Mobile Device Group", object_name, request)
-                == "break"
-            ):
-                break
-            if count >= max_tries:
-                self.output(
-                    f"WARNING: Mobile Device Group upload did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError("ERROR: Mobile Device Group upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            "Mobile Device Group",
+            object_name,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
 
     def execute(self):
         """Upload a static mobile device group"""
@@ -0,0 +1,198 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfNameIndex — persistent name-to-ID index for Classic API objects.
+
+Looking up a Classic API object by name means downloading the whole list of
+objects of that type. This module keeps the result as a case-folded map of
+names to IDs for each object type, in a small JSON file per type under the
+instance's directory in /tmp/jamf_upload, so that later lookups - in the same
+run or in the next one - can be answered without the download. Indexes expire
+after a TTL, and are updated in place when JamfUploader creates, renames or
+deletes an object. Entries are trusted until the TTL expires, so an object
+deleted outside JamfUploader is only dropped when a write to its ID fails.
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import fcntl
+import json
+import os
+import re
+import threading
+import time
+
+DEFAULT_INDEX_TTL = 600
+
+
+def tenant_for_url(url):
+    """Return the Jamf Platform tenant ID in an API URL, or an empty string."""
+    match = re.search(r"/tenant/([^/]+)/", url)
+    return match.group(1) if match else ""
+
+
+def fold(name):
+    """Return the form of an object name used as an index key."""
+    return str(name).casefold()
+
+
+class JamfNameIndex:
+    """Name-to-ID maps for the object types of one Jamf Pro instance.
+
+    Each map is stored as {"updated": <epoch>, "names": {<folded name>: <id>}} in
+    <resource>.json. Maps that are older than the TTL are treated as missing.
+    Changes are made under an exclusive lock on the file, so several processes
+    can share an index.
+    """
+
+    def __init__(self, index_dir, ttl=DEFAULT_INDEX_TTL, log_fn=None):
+        self.index_dir = index_dir
+        self.ttl = float(ttl)
+        self._log = log_fn or (lambda msg, verbose_level=2: None)
+        self._lock = threading.Lock()
+        self._loaded = {}  # resource -> (mtime_ns, state)
+
+    def path(self, resource):
+        """Return the path of the index file for a resource."""
+        return os.path.join(self.index_dir, f"{resource}.json")
+
+    def lookup(self, resource, name):
+        """Return the ID of the object with this name, or None if it is not in a
+        current index."""
+        state = self._read(resource)
+        if state is None or time.time() - state["updated"] > self.ttl:
+            return None
+        return state["names"].get(fold(name))
+
+    def replace(self, resource, objects):
+        """Rebuild the index for a resource from a list of {"name", "id"} objects.
+
+        Where two objects share a name the first is kept, as in a list scan.
+        """
+        names = {}
+        for obj in objects:
+            if isinstance(obj, dict) and "name" in obj and "id" in obj:
+                names.setdefault(fold(obj["name"]), obj["id"])
+        self._update(
+            resource, lambda state: {"updated": time.time(), "names": names}, create=True
+        )
+        self._log(
+            f"Name index for '{resource}' rebuilt with {len(names)} objects",
+            verbose_level=3,
+        )
+
+    def set_name(self, resource, object_id, name):
+        """Record that the object with this ID now has this name."""
+
+        def change(state):
+            if state is None:
+                return None
+            names = {k: v for k, v in state["names"].items() if str(v) != str(object_id)}
+            names[fold(name)] = object_id
+            state["names"] = names
+            return state
+
+        self._update(resource, change)
+
+    def remove_id(self, resource, object_id):
+        """Remove the object with this ID from the index."""
+
+        def change(state):
+            if state is None:
+                return None
+            state["names"] = {
+                k: v for k, v in state["names"].items() if str(v) != str(object_id)
+            }
+            return state
+
+        self._update(resource, change)
+
+    def invalidate(self, resource):
+        """Discard the index for a resource."""
+        with self._lock:
+            self._loaded.pop(resource, None)
+            try:
+                os.remove(self.path(resource))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self._log(f"Could not remove name index: {e}", verbose_level=2)
+
+    def _read(self, resource):
+        """Return the stored state for a resource, or None if there is none."""
+        path = self.path(resource)
+        with self._lock:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                self._loaded.pop(resource, None)
+                return None
+            loaded = self._loaded.get(resource)
+            if loaded and loaded[0] == mtime:
+                return loaded[1]
+            try:
+                with open(path, "r", encoding="utf-8") as fp:
+                    state = self._parse(fp.read())
+            except OSError:
+                state = None
+            if state is not None:
+                self._loaded[resource] = (mtime, state)
+            return state
+
+    def _update(self, resource, change, create=False):
+        """Apply change(state) to the stored state under the file lock.
+
+        change() is given the current state (or None) and returns the new state,
+        or None to leave the file as it is. The file is only created if create is
+        true. Failures to write are logged, as the index is only an optimisation.
+        """
+        path = self.path(resource)
+        try:
+            if create:
+                os.makedirs(self.index_dir, exist_ok=True)
+            flags = os.O_RDWR | (os.O_CREAT if create else 0)
+            fd = os.open(path, flags, 0o666)
+            with os.fdopen(fd, "r+", encoding="utf-8") as fp:
+                fcntl.flock(fp, fcntl.LOCK_EX)
+                try:
+                    state = change(self._parse(fp.read()))
+                    if state is not None:
+                        fp.seek(0)
+                        fp.truncate()
+                        json.dump(state, fp)
+                        fp.flush()
+                finally:
+                    fcntl.flock(fp, fcntl.LOCK_UN)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self._log(f"Could not update name index: {e}", verbose_level=2)
+        with self._lock:
+            self._loaded.pop(resource, None)
+
+    def _parse(self, text):
+        """Return the state from an index file's contents, or None if not valid."""
+        try:
+            state = json.loads(text)
+        except ValueError:
+            return None
+        if (
+            not isinstance(state, dict)
+            or not isinstance(state.get("names"), dict)
+            or not isinstance(state.get("updated"), (int, float))
+        ):
+            return None
+        return state
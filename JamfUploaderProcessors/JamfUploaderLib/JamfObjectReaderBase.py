@@ -17,11 +17,17 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import hashlib
 import json
 import os.path
 import sys
+import threading
 import xml.etree.ElementTree as ET
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import nullcontext
+
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
 )
@@ -34,36 +40,66 @@ sys.path.insert(0, os.path.dirname(__file__))
 from JamfUploaderBase import (  # pylint: disable=import-error, wrong-import-position
     JamfUploaderBase,
 )
+from JamfExportArchive import (  # pylint: disable=import-error, wrong-import-position
+    ARCHIVE_EXTENSIONS,
+    ARCHIVE_FORMATS,
+    JamfExportArchive,
+)
+
+
+# number of objects downloaded at once when reading all objects
+DEFAULT_DOWNLOAD_WORKERS = 4
+MAX_DOWNLOAD_WORKERS = 20
+
+# format of the manifest kept in output_dir for incremental exports
+EXPORT_MANIFEST_VERSION = 1
+
+# objects read between saves of the checkpoint of an all_objects export
+CHECKPOINT_INTERVAL = 50
 
 
 class JamfObjectReaderBase(JamfUploaderBase):
     """Class for functions used to read a generic API object in Jamf"""
 
-    def write_output_file(
-        self,
-        object_type,
-        output_dir,
-        object_content,
-        subdomain,
-        object_subtype=None,
-        n=None,
-    ):
-        """output the file"""
+    # number of output files left alone because they were unchanged
+    skipped_writes = 0
+    _write_lock = threading.Lock()
+
+    def write_if_changed(self, file_path, content):
+        """Write text to a file, unless the file already holds exactly that text.
+
+        Rewriting an identical file changes its modification time, which makes
+        the export look changed to git, rsync and the like. Returns True if the
+        file was written. Skipped writes are counted in self.skipped_writes.
+        """
+        data = content.encode("utf-8")
+        try:
+            if os.path.getsize(file_path) == len(data):
+                with open(file_path, "rb") as fp:
+                    existing_hash = hashlib.sha256(fp.read()).digest()
+                if existing_hash == hashlib.sha256(data).digest():
+                    with self._write_lock:
+                        self.skipped_writes += 1
+                    return False
+        except OSError:
+            # no existing file, or one that cannot be read, so write it
+            pass
+        with open(file_path, "w", encoding="utf-8") as fp:
+            fp.write(content)
+        return True
+
+    def get_output_filename(self, object_type, subdomain, object_subtype=None, n=None):
+        """construct the filename for an object"""
 
         # get api type
         api_type = self.api_type(object_type)
 
-        # construct the filename
         if api_type == "classic":
             filetype = "xml"
         else:
             filetype = "json"
 
         if object_type == "account":
-            if object_subtype == "users":
-                object_type = "account_user"
-            else:
-                object_type = "account_group"
             output_filename = f"{subdomain}-accounts-{object_subtype}-{n}.{filetype}"
         elif n is not None and n != "":
             self.output(f"Object name is {n}", verbose_level=3)
@@ -77,6 +113,27 @@ class JamfObjectReaderBase(JamfUploaderBase):
             output_filename = (
                 f"{subdomain}-{self.object_list_types(object_type)}.{filetype}"
             )
+        return output_filename
+
+    def write_output_file(
+        self,
+        object_type,
+        output_dir,
+        object_content,
+        subdomain,
+        object_subtype=None,
+        n=None,
+    ):
+        """output the file"""
+
+        output_filename = self.get_output_filename(
+            object_type, subdomain, object_subtype=object_subtype, n=n
+        )
+        if object_type == "account":
+            if object_subtype == "users":
+                object_type = "account_user"
+            else:
+                object_type = "account_group"
 
         file_path = os.path.join(output_dir, output_filename)
         # check that parent folder exists
@@ -95,9 +152,10 @@ class JamfObjectReaderBase(JamfUploaderBase):
                 elif isinstance(object_content, str):
                     # ensure it's a string
                     object_content = str(object_content)
-                with open(file_path, "w", encoding="utf-8") as fp:
-                    fp.write(object_content)
-                self.output(f"Wrote object to {file_path}")
+                if self.write_if_changed(file_path, object_content):
+                    self.output(f"Wrote object to {file_path}")
+                else:
+                    self.output(f"{file_path} is unchanged", verbose_level=2)
                 return output_filename, file_path
             except IOError as e:
                 raise ProcessorError(
@@ -150,9 +208,10 @@ class JamfObjectReaderBase(JamfUploaderBase):
             # also replace colons with underscores
             payload_output_filename = payload_output_filename.replace(":", "_")
             payload_file_path = os.path.join(output_dir, payload_output_filename)
-            with open(payload_file_path, "w", encoding="utf-8") as fp:
-                fp.write(payload)
-            self.output(f"Wrote {object_type} payload to {payload_file_path}")
+            if self.write_if_changed(payload_file_path, payload):
+                self.output(f"Wrote {object_type} payload to {payload_file_path}")
+            else:
+                self.output(f"{payload_file_path} is unchanged", verbose_level=2)
 
         except IOError as e:
             raise ProcessorError(
@@ -161,6 +220,256 @@ class JamfObjectReaderBase(JamfUploaderBase):
 
         return payload_output_filename, payload_file_path
 
+    def export_manifest_path(self, output_dir, subdomain, object_type):
+        """Return the path of the manifest used for incremental exports"""
+        return os.path.join(
+            output_dir,
+            f".{subdomain}-{self.object_list_types(object_type)}-manifest.json",
+        )
+
+    def read_export_manifest(self, manifest_path, options):
+        """Return the objects recorded by the previous incremental export, keyed by
+        ID. Nothing is returned if there is no manifest, or if it was written with
+        different options, as every object must then be downloaded again."""
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as fp:
+                manifest = json.load(fp)
+        except FileNotFoundError:
+            self.output("No previous export found, so all objects will be read")
+            return {}
+        except (OSError, ValueError) as e:
+            self.output(f"WARNING: could not read export manifest: {e}")
+            return {}
+        if (
+            not isinstance(manifest, dict)
+            or manifest.get("version") != EXPORT_MANIFEST_VERSION
+            or manifest.get("options") != options
+            or not isinstance(manifest.get("objects"), dict)
+        ):
+            self.output(
+                "Previous export was made with different options, "
+                "so all objects will be read"
+            )
+            return {}
+        return manifest["objects"]
+
+    def write_export_manifest(self, manifest_path, options, objects):
+        """Write the manifest for the next incremental export"""
+        manifest = {
+            "version": EXPORT_MANIFEST_VERSION,
+            "options": options,
+            "objects": objects,
+        }
+        temp_path = f"{manifest_path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as fp:
+                json.dump(manifest, fp, indent=4, sort_keys=True)
+            os.replace(temp_path, manifest_path)
+        except IOError as e:
+            raise ProcessorError(
+                f"Could not write export manifest to {manifest_path} - {str(e)}"
+            ) from e
+        self.output(f"Wrote export manifest to {manifest_path}", verbose_level=2)
+
+    def export_checkpoint_path(self, output_dir, subdomain, object_type):
+        """Return the path of the checkpoint of an unfinished export"""
+        return os.path.join(
+            output_dir,
+            f".{subdomain}-{self.object_list_types(object_type)}-checkpoint.json",
+        )
+
+    def read_export_checkpoint(self, checkpoint_path, options):
+        """Return the objects that an unfinished export had already read, keyed by
+        ID. Nothing is returned if there is no checkpoint, or if it was written
+        with different options."""
+        try:
+            with open(checkpoint_path, "r", encoding="utf-8") as fp:
+                checkpoint = json.load(fp)
+        except FileNotFoundError:
+            self.output("No unfinished export found, so all objects will be read")
+            return {}
+        except (OSError, ValueError) as e:
+            self.output(f"WARNING: could not read export checkpoint: {e}")
+            return {}
+        if (
+            not isinstance(checkpoint, dict)
+            or checkpoint.get("options") != options
+            or not isinstance(checkpoint.get("completed"), dict)
+        ):
+            self.output(
+                "Unfinished export was made with different options, "
+                "so all objects will be read"
+            )
+            return {}
+        self.output(
+            f"Resuming export from {checkpoint_path}: "
+            f"{len(checkpoint['completed'])} objects already read"
+        )
+        return checkpoint["completed"]
+
+    def write_export_checkpoint(self, checkpoint_path, options, completed):
+        """Record the objects read so far, so that the export can be resumed"""
+        temp_path = f"{checkpoint_path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as fp:
+                json.dump({"options": options, "completed": completed}, fp)
+            os.replace(temp_path, checkpoint_path)
+        except IOError as e:
+            self.output(f"WARNING: could not write export checkpoint: {e}")
+            return
+        self.output(
+            f"Saved checkpoint of {len(completed)} objects to {checkpoint_path}",
+            verbose_level=2,
+        )
+
+    def list_entry_fingerprint(self, obj, namekey):
+        """Return a hash of an object's entry in the object list, or None if the
+        entry holds nothing but the ID and name. Classic API lists, and some Jamf Pro
+        API lists, only give the ID and name, so changes to the rest of the object
+        cannot be seen without downloading it."""
+        if not set(obj) - {"id", namekey}:
+            return None
+        return hashlib.sha256(
+            json.dumps(obj, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+    def export_files_exist(self, output_dir, entry):
+        """Return True if the files recorded for an exported object still exist"""
+        return all(
+            os.path.isfile(os.path.join(output_dir, filename))
+            for filename in entry.get("files", [])
+        )
+
+    def remove_stale_export_files(self, output_dir, previous_objects, current_objects):
+        """Remove the files of objects that were deleted or renamed since the
+        previous incremental export"""
+        current_files = {
+            filename
+            for entry in current_objects.values()
+            for filename in entry.get("files", [])
+        }
+        for entry in previous_objects.values():
+            for filename in entry.get("files", []):
+                if filename in current_files:
+                    continue
+                file_path = os.path.join(output_dir, os.path.basename(filename))
+                try:
+                    os.remove(file_path)
+                    self.output(f"Removed {file_path}")
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    self.output(f"WARNING: could not remove {file_path}: {e}")
+
+    def read_object(
+        self,
+        api_url,
+        object_type,
+        object_id,
+        n,
+        token,
+        tenant_id,
+        elements_to_remove,
+        elements_to_retain,
+        output_dir,
+        subdomain,
+        previous=None,
+    ):
+        """Download and parse an object, and write it and any payload to file if
+        output_dir is set. If previous is the future of an earlier object with the
+        same name, the files are not written until that one has finished, so that
+        the last object in the list always wins."""
+        raw_object = self.get_api_object_contents_from_id(
+            api_url,
+            object_type,
+            object_id,
+            object_path="",
+            token=token,
+            tenant_id=tenant_id,
+        )
+
+        # parse the object
+        parsed_object = self.parse_downloaded_api_object(
+            raw_object, object_type, elements_to_remove, elements_to_retain
+        )
+
+        self.output("Raw object:", verbose_level=3)
+        self.output(parsed_object, verbose_level=3)
+
+        result = {
+            "raw_object": raw_object,
+            "parsed_object": parsed_object,
+            "file_path": "",
+            "payload_output_filename": "",
+            "payload_file_path": "",
+        }
+
+        # dump the object to file if output_dir is specified
+        if output_dir:
+            if previous is not None:
+                wait([previous])
+            _, result["file_path"] = self.write_output_file(
+                object_type,
+                output_dir,
+                parsed_object,
+                subdomain,
+                object_subtype=None,
+                n=n,
+            )
+
+            payload, payload_filetype = self.get_payload_filetype(
+                object_type, parsed_object
+            )
+
+            if payload:
+                result["payload_output_filename"], result["payload_file_path"] = (
+                    self.write_payload_file(
+                        output_dir,
+                        payload,
+                        payload_filetype,
+                        subdomain,
+                        object_type,
+                        n=n,
+                    )
+                )
+        return result
+
+    def read_objects(self, objects, workers, read_fn):
+        """Call read_fn(obj, previous) for each (obj, name) in objects, up to workers
+        at a time, and yield (obj, result, error) in list order.
+
+        previous is the future of the last earlier object with the same name, or
+        None. error is the exception raised by read_fn, or None, so that one object
+        that cannot be read does not stop the others.
+        """
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            latest = {}  # name -> future of the last object submitted with that name
+
+            def finish():
+                obj, name, future = pending.popleft()
+                if latest.get(name) is future:
+                    del latest[name]
+                try:
+                    return obj, future.result(), None
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    return obj, None, e
+
+            try:
+                for obj, name in objects:
+                    future = executor.submit(read_fn, obj, latest.get(name))
+                    latest[name] = future
+                    pending.append((obj, name, future))
+                    # keep a few objects queued so that the workers stay busy
+                    if len(pending) >= workers * 2:
+                        yield finish()
+                while pending:
+                    yield finish()
+            finally:
+                # the caller may stop early
+                for _, _, future in pending:
+                    future.cancel()
+
     def execute(self):
         """Upload an API object"""
         jamf_url = (self.env.get("JSS_URL") or "").rstrip("/")
@@ -180,6 +489,10 @@ class JamfObjectReaderBase(JamfUploaderBase):
         output_dir = self.env.get("output_dir")
         settings_key = self.env.get("settings_key")
         uuid = self.env.get("uuid")
+        download_workers = self.env.get("download_workers")
+        incremental = self.to_bool(self.env.get("incremental"))
+        resume = self.to_bool(self.env.get("resume"))
+        export_format = self.env.get("export_format") or "files"
         elements_to_remove = self.env.get("elements_to_remove")
         elements_to_remove = (
             [elements_to_remove] if isinstance(elements_to_remove, str) else []
@@ -198,9 +511,50 @@ class JamfObjectReaderBase(JamfUploaderBase):
         if not object_type:
             raise ProcessorError("ERROR: no object type provided")
 
+        # verify that download_workers is an integer between 1 and the maximum
+        try:
+            download_workers = int(download_workers)
+            if download_workers < 1 or download_workers > MAX_DOWNLOAD_WORKERS:
+                raise ValueError
+        except (ValueError, TypeError):
+            download_workers = DEFAULT_DOWNLOAD_WORKERS
+
+        if export_format not in ("files",) + ARCHIVE_FORMATS:
+            raise ProcessorError(
+                f"ERROR: export_format must be one of: files, {', '.join(ARCHIVE_FORMATS)}"
+            )
+        if export_format != "files" and (not all_objects or object_type == "account"):
+            self.output(
+                "WARNING: export_format is only used with all_objects, "
+                "and not for accounts"
+            )
+            export_format = "files"
+        if incremental and export_format != "files":
+            self.output("WARNING: incremental is not used with archive exports")
+            incremental = False
+        if resume and (
+            not all_objects or object_type == "account" or export_format != "files"
+        ):
+            self.output(
+                "WARNING: resume is only used with all_objects, and not for accounts "
+                "or archive exports"
+            )
+            resume = False
+
+        # incremental exports compare a full download with the previous one
+        if incremental and (not all_objects or object_type == "account"):
+            self.output(
+                "WARNING: incremental is only used with all_objects, "
+                "and not for accounts"
+            )
+            incremental = False
+
         # clear any pre-existing summary result
         if "jamfobjectreader_summary_result" in self.env:
             del self.env["jamfobjectreader_summary_result"]
+        if "export_changes" in self.env:
+            del self.env["export_changes"]
+        self.skipped_writes = 0
 
         # now start the process of reading the object
         # we need to substitute the values in the computer group name now to
@@ -226,6 +580,23 @@ class JamfObjectReaderBase(JamfUploaderBase):
             jamf_cli_profile=jamf_cli_profile,
         )
 
+        # long exports check the token as they go, and renew it when needed
+        self.keep_token(
+            token,
+            None
+            if bearer_token
+            else {
+                "jamf_url": jamf_url,
+                "jamf_user": jamf_user,
+                "password": jamf_password,
+                "region": jamf_platform_gw_region,
+                "tenant_id": jamf_platform_gw_tenant_id,
+                "client_id": client_id,
+                "client_secret": client_secret,
+                "jamf_cli_profile": jamf_cli_profile,
+            },
+        )
+
         # get instance name from URL
         host = jamf_url.partition("://")[2]
         subdomain = host.partition(".")[0]
@@ -239,9 +610,6 @@ class JamfObjectReaderBase(JamfUploaderBase):
         settings_value = ""
         raw_object = ""
         parsed_object = ""
-        payload = ""
-        payload_output_filename = ""
-        payload_file_path = ""
 
         # declare name key
         namekey = self.get_namekey(object_type)
@@ -257,14 +625,25 @@ class JamfObjectReaderBase(JamfUploaderBase):
         # if requesting all objects we need to generate a list of all to iterate through
         if all_objects or list_only:
             self.output(f"Getting all {object_type} objects from {api_url}")
-            object_list = self.get_all_api_objects(
-                api_url,
-                object_type,
-                tenant_id=jamf_platform_gw_tenant_id,
-                uuid=uuid,
-                token=token,
-                namekey=namekey,
-            )
+            if list_only or object_type == "account":
+                object_list = self.get_all_api_objects(
+                    api_url,
+                    object_type,
+                    tenant_id=jamf_platform_gw_tenant_id,
+                    uuid=uuid,
+                    token=token,
+                    namekey=namekey,
+                )
+            else:
+                # read each object as soon as its page of the list arrives
+                object_list = self.iter_all_api_objects(
+                    api_url,
+                    object_type,
+                    tenant_id=jamf_platform_gw_tenant_id,
+                    uuid=uuid,
+                    token=token,
+                    namekey=namekey,
+                )
             if list_only:
                 self.env["object_list"] = object_list
                 if output_dir:
@@ -274,8 +653,9 @@ class JamfObjectReaderBase(JamfUploaderBase):
                     )
                     file_path = os.path.join(output_dir, output_filename)
                     try:
-                        with open(file_path, "w", encoding="utf-8") as fp:
-                            json.dump(object_list, fp, indent=4)
+                        self.write_if_changed(
+                            file_path, json.dumps(object_list, indent=4)
+                        )
                         self.output(
                             f"Wrote object list to file {file_path}", verbose_level=1
                         )
@@ -288,8 +668,9 @@ class JamfObjectReaderBase(JamfUploaderBase):
                                     f"Created output directory {output_dir}",
                                     verbose_level=1,
                                 )
-                                with open(file_path, "w", encoding="utf-8") as fp:
-                                    json.dump(object_list, fp, indent=4)
+                                self.write_if_changed(
+                                    file_path, json.dumps(object_list, indent=4)
+                                )
                                 self.output(
                                     f"Wrote object list to file {file_path}",
                                     verbose_level=1,
@@ -431,7 +812,6 @@ class JamfObjectReaderBase(JamfUploaderBase):
                         n = obj["name"]
                         raw_object = ""
                         parsed_object = ""
-                        payload = ""
 
                         # get the object
                         if object_subtype == "users":
@@ -469,75 +849,266 @@ class JamfObjectReaderBase(JamfUploaderBase):
                                 n=n,
                             )
             else:
-                # for all other object types we can just iterate through the list
-                # and get the object contents
-                for obj in object_list:
-                    i = obj["id"]
+                # for all other object types, download, parse and write the objects
+                # several at a time, handling the results in list order
+                def object_filename(obj):
                     if object_name:
                         # if we have an object name, use that
-                        n = object_name
-                    elif object_id and len(object_list) == 1:
+                        return object_name
+                    if object_id and not all_objects and len(object_list) == 1:
                         # if we have an object ID use the ID in the filename if only one object
-                        n = object_id
-                    else:
-                        # otherwise use the name key from the object
-                        if namekey not in obj:
-                            raise ProcessorError(
-                                f"ERROR: {namekey} not found in object {obj}"
-                            )
-                        n = obj[namekey]
-                    raw_object = ""
-                    parsed_object = ""
-                    payload = ""
+                        return object_id
+                    # otherwise use the name key from the object
+                    return obj.get(namekey)
 
-                    # get the object
-                    raw_object = self.get_api_object_contents_from_id(
+                def read(obj, previous):
+                    n = object_filename(obj)
+                    if n is None:
+                        raise ProcessorError(
+                            f"ERROR: {namekey} not found in object {obj}"
+                        )
+                    return self.read_object(
                         api_url,
                         object_type,
-                        i,
-                        object_path="",
-                        token=token,
-                        tenant_id=jamf_platform_gw_tenant_id,
+                        obj["id"],
+                        n,
+                        self.current_token(),
+                        jamf_platform_gw_tenant_id,
+                        elements_to_remove,
+                        elements_to_retain,
+                        # objects are added to an archive as the results arrive
+                        "" if archive else output_dir,
+                        subdomain,
+                        previous=previous,
                     )
 
-                    # parse the object
-                    parsed_object = self.parse_downloaded_api_object(
-                        raw_object, object_type, elements_to_remove, elements_to_retain
+                # archive formats write every object to a single file
+                archive = None
+                if export_format != "files":
+                    if not os.path.isdir(output_dir):
+                        raise ProcessorError(
+                            f"Cannot write to {output_dir} as the folder doesn't exist"
+                        )
+                    file_path = os.path.join(
+                        output_dir,
+                        f"{subdomain}-{self.object_list_types(object_type)}."
+                        f"{ARCHIVE_EXTENSIONS[export_format]}",
+                    )
+                    archive = JamfExportArchive(
+                        file_path, export_format, object_type, log_fn=self.output
                     )
 
-                    self.output("Raw object:", verbose_level=3)
-                    self.output(parsed_object, verbose_level=3)
+                # for incremental exports, objects whose list entry has not changed
+                # since the previous export are not downloaded again
+                previous_export = {}
+                current_export = {}
+                listed_ids = set()
+                export_changes = {"added": [], "changed": [], "removed": []}
+                unchanged = 0
+                if incremental:
+                    manifest_path = self.export_manifest_path(
+                        output_dir, subdomain, object_type
+                    )
+                    export_options = {
+                        "elements_to_remove": elements_to_remove,
+                        "elements_to_retain": elements_to_retain,
+                    }
+                    previous_export = self.read_export_manifest(
+                        manifest_path, export_options
+                    )
 
-                    # dump the object to file if output_dir is specified
-                    if output_dir:
-                        object_content, file_path = self.write_output_file(
-                            object_type,
-                            output_dir,
-                            parsed_object,
-                            subdomain,
-                            object_subtype=None,
-                            n=n,
+                # a checkpoint of the objects read so far is kept in output_dir, so
+                # that an export that stops part way through can be resumed
+                checkpoint_path = ""
+                completed = {}
+                resumed = 0
+                if all_objects and export_format == "files":
+                    checkpoint_path = self.export_checkpoint_path(
+                        output_dir, subdomain, object_type
+                    )
+                    checkpoint_options = {
+                        "elements_to_remove": elements_to_remove,
+                        "elements_to_retain": elements_to_retain,
+                        "incremental": incremental,
+                    }
+                    if resume:
+                        completed = self.read_export_checkpoint(
+                            checkpoint_path, checkpoint_options
                         )
 
-                        payload, payload_filetype = self.get_payload_filetype(
-                            object_type, parsed_object
-                        )
+                def objects_to_read():
+                    nonlocal unchanged, resumed
+                    for obj in object_list:
+                        key = str(obj.get("id"))
+                        listed_ids.add(key)
+                        entry = completed.get(key)
+                        if entry and self.export_files_exist(output_dir, entry):
+                            # read by the export that is being resumed
+                            resumed += 1
+                            if incremental:
+                                current_export[key] = {
+                                    k: v for k, v in entry.items() if k != "change"
+                                }
+                                if entry["change"] == "unchanged":
+                                    unchanged += 1
+                                else:
+                                    export_changes[entry["change"]].append(
+                                        entry["name"]
+                                    )
+                            continue
+                        if incremental:
+                            previous = previous_export.get(key)
+                            fingerprint = self.list_entry_fingerprint(obj, namekey)
+                            if (
+                                previous
+                                and fingerprint
+                                and previous.get("fingerprint") == fingerprint
+                                and self.export_files_exist(output_dir, previous)
+                            ):
+                                current_export[key] = previous
+                                unchanged += 1
+                                continue
+                        yield obj, object_filename(obj)
 
-                        if payload:
-                            payload_output_filename, payload_file_path = (
-                                self.write_payload_file(
-                                    output_dir,
-                                    payload,
-                                    payload_filetype,
-                                    subdomain,
-                                    object_type,
-                                    n=n,
-                                )
+                if all_objects:
+                    self.output(
+                        f"Reading {download_workers} objects at a time", verbose_level=2
+                    )
+                failed_objects = []
+
+                def handle_result(obj, result, error):
+                    nonlocal raw_object, parsed_object, file_path, unchanged
+                    key = str(obj.get("id"))
+                    if error is not None:
+                        if not all_objects:
+                            raise error
+                        self.output(
+                            f"WARNING: could not read {object_type} ID {obj.get('id')}: "
+                            f"{error}"
+                        )
+                        failed_objects.append(key)
+                        if key in previous_export:
+                            # keep the previous files, and try again next time
+                            current_export[key] = {
+                                **previous_export[key],
+                                "fingerprint": None,
+                            }
+                        return
+                    content_hash = hashlib.sha256(
+                        str(result["parsed_object"]).encode("utf-8")
+                    ).hexdigest()
+                    entry = {
+                        "name": obj.get(namekey),
+                        "fingerprint": self.list_entry_fingerprint(obj, namekey),
+                        "hash": content_hash,
+                        "files": [
+                            os.path.basename(path)
+                            for path in (
+                                result["file_path"],
+                                result["payload_file_path"],
                             )
-                            self.env["payload_output_filename"] = (
-                                payload_output_filename
+                            if path
+                        ],
+                    }
+                    change = "added"
+                    if incremental:
+                        current_export[key] = entry
+                        previous = previous_export.get(key)
+                        if not previous:
+                            export_changes["added"].append(obj.get(namekey))
+                        elif previous.get("hash") != content_hash:
+                            change = "changed"
+                            export_changes["changed"].append(obj.get(namekey))
+                        else:
+                            change = "unchanged"
+                            unchanged += 1
+                    if checkpoint_path:
+                        completed[key] = {**entry, "change": change}
+                        if len(completed) % CHECKPOINT_INTERVAL == 0:
+                            self.write_export_checkpoint(
+                                checkpoint_path, checkpoint_options, completed
                             )
-                            self.env["payload_file_path"] = payload_file_path
+                    raw_object = result["raw_object"]
+                    parsed_object = result["parsed_object"]
+                    if archive:
+                        n = object_filename(obj)
+                        content = parsed_object
+                        if export_format == "jsonl" and api_type != "classic":
+                            content = json.loads(parsed_object)
+                        archive.add(
+                            obj["id"],
+                            n,
+                            content,
+                            self.get_output_filename(object_type, subdomain, n=n),
+                        )
+                    if result["file_path"]:
+                        file_path = result["file_path"]
+                    if result["payload_file_path"]:
+                        self.env["payload_output_filename"] = result[
+                            "payload_output_filename"
+                        ]
+                        self.env["payload_file_path"] = result["payload_file_path"]
+
+                try:
+                    with archive or nullcontext():
+                        for obj, result, error in self.read_objects(
+                            objects_to_read(),
+                            download_workers if all_objects else 1,
+                            read,
+                        ):
+                            handle_result(obj, result, error)
+                except BaseException:
+                    # save what has been read, so that the export can be resumed
+                    if checkpoint_path:
+                        self.write_export_checkpoint(
+                            checkpoint_path, checkpoint_options, completed
+                        )
+                    raise
+                if checkpoint_path:
+                    if failed_objects:
+                        # resume to read the objects that failed
+                        self.write_export_checkpoint(
+                            checkpoint_path, checkpoint_options, completed
+                        )
+                    elif os.path.exists(checkpoint_path):
+                        os.remove(checkpoint_path)
+                if resumed:
+                    self.output(
+                        f"{resumed} objects were already read by the unfinished export"
+                    )
+
+                if failed_objects:
+                    self.output(
+                        f"WARNING: {len(failed_objects)} {object_type} objects could "
+                        f"not be read: ID {', '.join(failed_objects)}"
+                    )
+
+                if incremental:
+                    for key, entry in previous_export.items():
+                        if key not in listed_ids:
+                            export_changes["removed"].append(entry.get("name"))
+                    self.remove_stale_export_files(
+                        output_dir, previous_export, current_export
+                    )
+                    self.write_export_manifest(
+                        manifest_path, export_options, current_export
+                    )
+                    for change, names in export_changes.items():
+                        for name in names:
+                            self.output(
+                                f"{change.capitalize()}: {name}", verbose_level=2
+                            )
+                    self.output(
+                        f"Incremental export of {object_type}: "
+                        f"{len(export_changes['added'])} added, "
+                        f"{len(export_changes['changed'])} changed, "
+                        f"{len(export_changes['removed'])} removed, "
+                        f"{unchanged} unchanged"
+                    )
+                    self.env["export_changes"] = {
+                        change: len(names) for change, names in export_changes.items()
+                    }
+                    self.env["export_changes"]["unchanged"] = unchanged
 
         self.env["object_type"] = object_type
         self.env["output_dir"] = output_dir
@@ -559,10 +1130,17 @@ class JamfObjectReaderBase(JamfUploaderBase):
             self.env["parsed_object"] = str(parsed_object)
 
         # output the summary
+        summary_data = {"file_path": file_path}
+        if "export_changes" in self.env:
+            for change, count in self.env["export_changes"].items():
+                summary_data[change] = str(count)
+        if self.skipped_writes:
+            self.output(
+                f"{self.skipped_writes} output files were unchanged, so not rewritten"
+            )
+            summary_data["skipped_writes"] = str(self.skipped_writes)
         self.env["jamfobjectreader_summary_result"] = {
             "summary_text": "The following objects were outputted in Jamf Pro:",
-            "report_fields": ["file_path"],
-            "data": {
-                "file_path": file_path,
-            },
+            "report_fields": list(summary_data),
+            "data": summary_data,
         }
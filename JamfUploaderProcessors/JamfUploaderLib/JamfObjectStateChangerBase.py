@@ -21,7 +21,6 @@ import json
 import os.path
 import sys
 
-from time import sleep
 from xml.etree import ElementTree as ET
 
 from autopkglib import (  # pylint: disable=import-error
@@ -69,34 +68,22 @@ class JamfObjectStateChangerBase(JamfUploaderBase):
         else:
             raise ProcessorError(f"ERROR: API type {api_type} not supported")
 
-        count = 0
-        while True:
-            count += 1
-            self.output(f"Request attempt {count}", verbose_level=2)
-            request = "GET"
-            # need to receive XML for Classic API, JSON for JPAPI
-
-            r = self.curl(
+        request = "GET"
+        # need to receive XML for Classic API, JSON for JPAPI
+        r = self.send_with_retry(
+            lambda: self.curl(
                 api_type=api_type,
                 request=request,
                 url=url,
                 token=token,
                 accept_header=accept_header,
-            )
-
-            # check HTTP response
-            if self.status_check(r, object_type, object_id, request) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"WARNING: {object_type} request did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP GET Response Code: {r.status_code}")
-                raise ProcessorError(f"ERROR: {object_type} GET Request failed")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            object_type,
+            object_id,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
 
         # now update the object state
         self.output(f"Setting {object_type} state to {object_state}...")
@@ -152,34 +139,23 @@ class JamfObjectStateChangerBase(JamfUploaderBase):
         self.output(updated_data.decode("utf-8"), verbose_level=3)
 
         # now upload the updated object
-        count = 0
-        while True:
-            count += 1
-            self.output(f"{object_type} update attempt {count}", verbose_level=2)
-            request = "PUT"
-            # Ensure token is a string if it's bytes
-            token_str = token.decode("utf-8") if isinstance(token, bytes) else token
-            r = self.curl(
+        request = "PUT"
+        # Ensure token is a string if it's bytes
+        token_str = token.decode("utf-8") if isinstance(token, bytes) else token
+        self.send_with_retry(
+            lambda: self.curl(
                 api_type=api_type,
                 request=request,
                 url=url,
                 token=token_str,
                 data=output_file,
-            )
-
-            # check HTTP response
-            if self.status_check(r, object_type, object_id, request) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"WARNING: {object_type} update did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP PUT Response Code: {r.status_code}")
-                raise ProcessorError(f"ERROR: {object_type} update failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            object_type,
+            object_id,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
 
     def execute(self):
         """Flush a policy log"""
@@ -17,11 +17,9 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-import json
 import os.path
 import sys
 
-from time import sleep
 from urllib.parse import urlparse
 
 from autopkglib import (  # pylint: disable=import-error
@@ -65,34 +63,6 @@ class JamfPackageCleanerBase(JamfUploaderBase):
                 verbose_level=2,
             )
 
-    def delete_package(self, api_url, object_id, token, max_tries, tenant_id=""):
-        """Cleaning Packages"""
-
-        self.output("Deleting package...")
-
-        object_type = "package_v1"
-        endpoint = self.api_endpoints(object_type, tenant_id=tenant_id)
-        url = f"{api_url}/{endpoint}/{object_id}"
-
-        count = 0
-        while True:
-            count += 1
-            self.output(f"Package delete attempt {count}", verbose_level=2)
-            request = "DELETE"
-            r = self.curl(api_type="jpapi", request=request, url=url, token=token)
-
-            # check HTTP response
-            if self.status_check(r, "Package", object_id, request) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"WARNING: Package deletion did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP DELETE Response Code: {r.status_code}")
-                raise ProcessorError("ERROR: Package deletion failed")
-            sleep(10)
-        return r
-
     def execute(self):
         """Clean up old packages in Jamf Pro"""
 
@@ -221,24 +191,23 @@ class JamfPackageCleanerBase(JamfUploaderBase):
         )
         self.output(f"API URL is {api_url}", verbose_level=3)
 
-        # check for existing
+        # get the packages whose names start with pkg_name_match, newest first.
+        # The server matches the prefix and pages through the results; the match
+        # is checked again here as the server may ignore case
         object_type = "package_v1"
-        url = f"{api_url}/{self.api_endpoints(object_type, tenant_id=jamf_platform_gw_tenant_id)}"
-        r = self.curl(api_type="jpapi", request="GET", url=url, token=token)
-        if isinstance(r.output, dict):
-            jamf_packages = r.output["results"]
-        else:
-            jamf_packages = json.loads(r.output)["results"]
-
-        # Find packages that match the name pattern
+        rsql_filter = f"packageName=={self.rsql_quote(pkg_name_match + '*')}"
         found_packages = [
             item
-            for item in jamf_packages
+            for item in self.iter_all_api_objects(
+                api_url,
+                object_type,
+                tenant_id=jamf_platform_gw_tenant_id,
+                token=token,
+                sort="id:desc",
+                rsql_filter=rsql_filter,
+            )
             if item["packageName"].startswith(pkg_name_match)
         ]
-        found_packages = sorted(
-            found_packages, key=lambda item: item["id"], reverse=True
-        )
 
         # If there are not enough versions to delete, log it will skip the deletion step
         if len(found_packages) <= versions_to_keep:
@@ -284,34 +253,42 @@ class JamfPackageCleanerBase(JamfUploaderBase):
             )
             return
 
-        for package in packages_to_delete:
-            # package deletion could take time, so we check the token before each deletion
-            # get a token
-            token, jamf_url, jamf_platform_gw_region, jamf_platform_gw_tenant_id = self.auth(
-                jamf_url=jamf_url,
-                jamf_user=jamf_user,
-                password=jamf_password,
-                region=jamf_platform_gw_region,
-                tenant_id=jamf_platform_gw_tenant_id,
-                client_id=client_id,
-                client_secret=client_secret,
-                token=bearer_token,
-                jamf_cli_profile=jamf_cli_profile,
-            )
-
-            # construct the api_url
-            api_url = self.construct_api_url(
-                jamf_url=jamf_url, region=jamf_platform_gw_region
-            )
+        # delete the packages. This could take time, so the token is renewed when
+        # it is about to expire
+        self.keep_token(
+            token,
+            None
+            if bearer_token
+            else {
+                "jamf_url": jamf_url,
+                "jamf_user": jamf_user,
+                "password": jamf_password,
+                "region": jamf_platform_gw_region,
+                "tenant_id": jamf_platform_gw_tenant_id,
+                "client_id": client_id,
+                "client_secret": client_secret,
+                "jamf_cli_profile": jamf_cli_profile,
+            },
+        )
+        outcomes = self.delete_objects(
+            api_url,
+            object_type,
+            [package["id"] for package in packages_to_delete],
+            tenant_id=jamf_platform_gw_tenant_id,
+            max_tries=max_tries,
+        )
 
-            self.delete_package(
-                jamf_url=api_url,
-                object_id=package["id"],
-                token=token,
-                max_tries=max_tries,
-                tenant_id=jamf_platform_gw_tenant_id,
-            )
-            self.output(f"Deleting {package['packageName']}", verbose_level=2)
+        deleted_packages = []
+        failed_packages = []
+        for package in packages_to_delete:
+            pkg_name = package["packageName"]
+            error = outcomes[package["id"]]
+            if error:
+                self.output(f"WARNING: {pkg_name} was not deleted: {error}")
+                failed_packages.append(pkg_name)
+                continue
+            self.output(f"Deleted {pkg_name}", verbose_level=2)
+            deleted_packages.append(pkg_name)
 
             # Process for SMB shares if defined
             if len(smb_shares) > 0:
@@ -319,7 +296,6 @@ class JamfPackageCleanerBase(JamfUploaderBase):
                     "Number of File Share DPs: " + str(len(smb_shares)),
                     verbose_level=2,
                 )
-            pkg_name = package["packageName"]
             for smb_share in smb_shares:
                 smb_url, smb_user, smb_password = (
                     smb_share[0],
@@ -346,11 +322,17 @@ class JamfPackageCleanerBase(JamfUploaderBase):
                 "found_matches",
                 "versions_to_keep",
                 "deleted",
+                "failed",
+                "deleted_packages",
+                "failed_packages",
             ],
             "data": {
                 "pkg_name_match": pkg_name_match,
                 "found_matches": str(len(found_packages)),
                 "versions_to_keep": str(versions_to_keep),
-                "deleted": str(len(packages_to_delete)),
+                "deleted": str(len(deleted_packages)),
+                "failed": str(len(failed_packages)),
+                "deleted_packages": ", ".join(deleted_packages),
+                "failed_packages": ", ".join(failed_packages),
             },
         }
@@ -24,7 +24,6 @@ Requirements for uploading to the AWS S3 API endpoint:
 To resolve the dependencies, run: /usr/local/autopkg/python -m pip install boto3
 """
 
-import hashlib
 import json
 import os.path
 import shutil
@@ -45,51 +44,54 @@ sys.path.insert(0, os.path.dirname(__file__))
 from JamfUploaderBase import (  # pylint: disable=import-error, wrong-import-position
     JamfUploaderBase,
 )
+from JamfFileDigests import (  # pylint: disable=import-error, wrong-import-position
+    JamfDigestCache,
+    file_digests,
+)
 
 
 class JamfPackageUploaderBase(JamfUploaderBase):
     """Class for functions used to upload a package to Jamf"""
 
+    def file_digests(self, filename, algorithms):
+        """calculate several hashes of the package in one read of the file
+        (see JamfFileDigests.py)"""
+        return file_digests(
+            filename,
+            algorithms,
+            log_fn=lambda msg, verbose_level=2: self.output(
+                msg, verbose_level=verbose_level
+            ),
+        )
+
+    def package_digests(self, pkg_path, algorithms, recipe_cache_dir=None):
+        """calculate several hashes of the package, or get them from the digest
+        cache in the recipe cache dir if the package has not changed since they
+        were calculated"""
+        cache_dir = os.path.join(recipe_cache_dir or "/tmp/jamf_upload", "digest_cache")
+        cache = JamfDigestCache(
+            cache_dir,
+            log_fn=lambda msg, verbose_level=2: self.output(
+                msg, verbose_level=verbose_level
+            ),
+        )
+        return cache.file_digests(pkg_path, algorithms)
+
     def sha512sum(self, filename):
-        """calculate the SHA512 hash of the package
-        (see https://stackoverflow.com/a/44873382)"""
-        h = hashlib.sha512()
-        b = bytearray(128 * 1024)
-        mv = memoryview(b)
-        with open(filename, "rb", buffering=0) as f:
-            for n in iter(lambda: f.readinto(mv), 0):
-                h.update(mv[:n])
-        return h.hexdigest()
+        """calculate the SHA512 hash of the package"""
+        return self.file_digests(filename, ["sha512"])["sha512"]
 
     def sha3sum(self, pkg_path):
         """calculate the SHA-3 512 hash of the package"""
-        h = hashlib.sha3_512()
-        b = bytearray(128 * 1024)
-        mv = memoryview(b)
-        with open(pkg_path, "rb", buffering=0) as f:
-            for n in iter(lambda: f.readinto(mv), 0):
-                h.update(mv[:n])
-        return h.hexdigest()
+        return self.file_digests(pkg_path, ["sha3_512"])["sha3_512"]
 
     def sha256sum(self, filename):
         """calculate the SHA256 hash of the package"""
-        h = hashlib.sha256()
-        b = bytearray(128 * 1024)
-        mv = memoryview(b)
-        with open(filename, "rb", buffering=0) as f:
-            for n in iter(lambda: f.readinto(mv), 0):
-                h.update(mv[:n])
-        return h.hexdigest()
+        return self.file_digests(filename, ["sha256"])["sha256"]
 
     def md5sum(self, filename):
         """calculate the MD5 hash of the package"""
-        h = hashlib.md5()
-        b = bytearray(128 * 1024)
-        mv = memoryview(b)
-        with open(filename, "rb", buffering=0) as f:
-            for n in iter(lambda: f.readinto(mv), 0):
-                h.update(mv[:n])
-        return h.hexdigest()
+        return self.file_digests(filename, ["md5"])["md5"]
 
     def zip_pkg_path(self, bundle_path, recipe_cache_dir):
         """Add files from path to a zip file handle.
@@ -208,40 +210,22 @@ class JamfPackageUploaderBase(JamfUploaderBase):
         object_type = "package_v1"
         endpoint = self.api_endpoints(object_type, tenant_id=tenant_id)
         url = f"{api_url}/{endpoint}/{pkg_id}/upload"
-        count = 0
-        while True:
-            count += 1
-            self.output(
-                f"Package upload attempt {count}",
-                verbose_level=2,
-            )
-
-            request = "POST"
-            r = self.curl(
+        request = "POST"
+        r = self.send_with_retry(
+            lambda: self.curl(
                 api_type="jpapi",
                 request=request,
                 url=url,
                 token=token,
                 data=pkg_path,
                 endpoint_type="package_v1",
-            )
-
-            # check HTTP response
-            if self.status_check(r, "Package upload", pkg_name, request) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"WARNING: Package upload did not succeed after {max_tries} attempts"
-                )
-                self.output(
-                    f"HTTP POST Response Code: {r.status_code}",
-                    verbose_level=1,
-                )
-                raise ProcessorError("ERROR: Package upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            "Package upload",
+            pkg_name,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
 
         self.output(f"HTTP response: {r.status_code}", verbose_level=1)
 
@@ -323,6 +307,89 @@ class JamfPackageUploaderBase(JamfUploaderBase):
         else:
             return "-1"
 
+    def get_cloud_dp_file(self, api_url, file_name, token, tenant_id=""):
+        """return the entry for a file in the list of files on the Jamf Cloud
+        Distribution Point, or None if it is not there or the list is unavailable"""
+        endpoint = self.api_endpoints("jcds", tenant_id=tenant_id)
+        r = self.curl(
+            api_type="jpapi",
+            request="GET",
+            url=f"{api_url}/{endpoint}/files",
+            token=token,
+            use_cache=False,
+        )
+        if r.status_code != 200 or not isinstance(r.output, list):
+            self.output(
+                f"Could not list the files on the Cloud DP (HTTP {r.status_code})",
+                verbose_level=1,
+            )
+            return None
+        for jcds_file in r.output:
+            if isinstance(jcds_file, dict) and jcds_file.get("fileName") == file_name:
+                return jcds_file
+        return None
+
+    def remote_pkg_matches(
+        self, api_url, pkg_id, pkg_path, digests, recipe_cache_dir, token, tenant_id=""
+    ):
+        """check whether the existing package object has the same hash as the local
+        package, comparing whichever of SHA3-512 or MD5 the object records.
+
+        The metadata is saved before the file is uploaded, so a matching hash does
+        not show that the upload succeeded. The package's file must also be on the
+        Cloud DP, with the same MD5 hash where the Cloud DP gives one."""
+        pkg_object = self.get_api_object_contents_from_id(
+            api_url, "package_v1", pkg_id, token=token, tenant_id=tenant_id
+        )
+        hash_type = str((pkg_object or {}).get("hashType") or "").upper()
+        hash_value = str((pkg_object or {}).get("hashValue") or "").lower()
+        algorithm = {"SHA3_512": "sha3_512", "MD5": "md5"}.get(hash_type)
+        if not algorithm or not hash_value:
+            self.output(
+                f"Existing package {pkg_id} has no SHA3-512 or MD5 hash to compare",
+                verbose_level=1,
+            )
+            return False
+
+        local_value = digests.get(algorithm)
+        if not local_value:
+            local_value = self.package_digests(pkg_path, [algorithm], recipe_cache_dir)[
+                algorithm
+            ]
+        self.output(
+            f"Existing package {hash_type} hash: {hash_value}; "
+            f"local package: {local_value}",
+            verbose_level=2,
+        )
+        if local_value.lower() != hash_value:
+            return False
+
+        file_name = pkg_object.get("fileName")
+        jcds_file = self.get_cloud_dp_file(
+            api_url, file_name, token=token, tenant_id=tenant_id
+        )
+        if not jcds_file:
+            self.output(
+                f"Existing package file {file_name} is not on the Cloud DP",
+                verbose_level=1,
+            )
+            return False
+        remote_md5 = str(jcds_file.get("md5") or "").lower()
+        if remote_md5:
+            local_md5 = digests.get("md5")
+            if not local_md5:
+                local_md5 = self.package_digests(pkg_path, ["md5"], recipe_cache_dir)[
+                    "md5"
+                ]
+            if local_md5.lower() != remote_md5:
+                self.output(
+                    f"Package file {file_name} on the Cloud DP has a different MD5 "
+                    f"hash: {remote_md5}",
+                    verbose_level=1,
+                )
+                return False
+        return True
+
     def get_category_id(self, api_url, category_name, token="", tenant_id=""):
         """Get the category ID from the name, or abort if ID not found"""
         # check for existing category
@@ -413,30 +480,17 @@ class JamfPackageUploaderBase(JamfUploaderBase):
         else:
             url = f"{api_url}/{endpoint}"
 
-        count = 0
-        while True:
-            count += 1
-            self.output(
-                f"Package metadata upload attempt {count}",
-                verbose_level=2,
-            )
-            request = "PUT" if pkg_id else "POST"
-            r = self.curl(
+        request = "PUT" if pkg_id else "POST"
+        r = self.send_with_retry(
+            lambda: self.curl(
                 api_type="jpapi", request=request, url=url, token=token, data=pkg_json
-            )
-            # check HTTP response
-            if self.status_check(r, "Package Metadata", pkg_name, request) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"Package metadata upload did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError("ERROR: Package metadata upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            "Package Metadata",
+            pkg_name,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
         if r.status_code == 201:
             obj = json.loads(json.dumps(r.output))
             self.output(
@@ -520,6 +574,7 @@ class JamfPackageUploaderBase(JamfUploaderBase):
         pkg_display_name = self.env.get("pkg_display_name")
         version = self.env.get("version")
         replace = self.to_bool(self.env.get("replace_pkg"))
+        skip_unchanged_pkg = self.to_bool(self.env.get("skip_unchanged_pkg"))
         sleep_time = self.env.get("sleep")
         replace_metadata = self.to_bool(self.env.get("replace_pkg_metadata"))
         skip_metadata_upload = self.to_bool(self.env.get("skip_metadata_upload"))
@@ -540,6 +595,7 @@ class JamfPackageUploaderBase(JamfUploaderBase):
         recipe_cache_dir = self.env.get("RECIPE_CACHE_DIR")
         pkg_uploaded = False
         pkg_metadata_updated = False
+        pkg_deduplicated = False
         max_tries = self.env.get("max_tries")
 
         # verify that max_tries is an integer greater than zero and less than 10
@@ -673,14 +729,15 @@ class JamfPackageUploaderBase(JamfUploaderBase):
         if not pkg_display_name:
             pkg_display_name = pkg_name
 
-        # calculate the SHA-3-512 hash of the package
-        sha3string = self.sha3sum(pkg_path)
-
-        # calculate the SHA-256 hash of the package
-        # sha256string = self.sha256sum(pkg_path)
-
-        # calculate the MD5 hash of the package
-        md5string = self.md5sum(pkg_path) if use_md5 else None
+        # calculate the SHA-3-512 hash of the package, and the MD5 hash if needed,
+        # in one read of the package, unless they are cached
+        digests = self.package_digests(
+            pkg_path,
+            ["sha3_512", "md5"] if use_md5 else ["sha3_512"],
+            recipe_cache_dir,
+        )
+        sha3string = digests["sha3_512"]
+        md5string = digests.get("md5")
 
         # now start the process of uploading the package
         self.output(f"Checking for existing package '{pkg_name}' on {jamf_url}")
@@ -802,6 +859,27 @@ class JamfPackageUploaderBase(JamfUploaderBase):
                     # fake that the package was replaced even if it wasn't
                     # so that the metadata gets replaced
                     pkg_uploaded = True
+                elif (
+                    pkg_id
+                    and skip_unchanged_pkg
+                    and self.remote_pkg_matches(
+                        api_url,
+                        pkg_id,
+                        pkg_path,
+                        digests,
+                        recipe_cache_dir,
+                        token=token,
+                        tenant_id=jamf_platform_gw_tenant_id,
+                    )
+                ):
+                    self.output(
+                        (
+                            f"Not uploading {pkg_name} as the existing package has "
+                            "the same hash ('skip_unchanged_pkg' is set to True)"
+                        ),
+                        verbose_level=1,
+                    )
+                    pkg_deduplicated = True
 
             else:
                 self.output(
@@ -836,9 +914,11 @@ class JamfPackageUploaderBase(JamfUploaderBase):
                 raise ProcessorError("ERROR: Jamf Pro URL not supplied")
 
         # now process the package metadata
+        # a package that was not uploaded because it is unchanged only gets its
+        # metadata replaced if replace_pkg_metadata is set
         if (
             int(pkg_id) > 0
-            and (pkg_uploaded or replace_metadata or replace)
+            and (pkg_uploaded or replace_metadata or (replace and not pkg_deduplicated))
             and not skip_metadata_upload
         ):
             # replace existing package metadata
@@ -891,7 +971,12 @@ class JamfPackageUploaderBase(JamfUploaderBase):
 
         # upload package if the metadata was updated - has to be done last with v1/packages
         # (already done with smb_shares or aws_cdp_mode)
-        if not aws_cdp_mode and (not smb_shares or cloud_dp) and pkg_metadata_updated:
+        if (
+            not aws_cdp_mode
+            and (not smb_shares or cloud_dp)
+            and pkg_metadata_updated
+            and not pkg_deduplicated
+        ):
             self.output(f"ID: {object_id}", verbose_level=3)  # TEMP
             if object_id != "-1":
                 self.output(f"Package '{pkg_name}' metadata exists: ID {object_id}")
@@ -968,7 +1053,8 @@ class JamfPackageUploaderBase(JamfUploaderBase):
         self.env["pkg_display_name"] = pkg_display_name
         self.env["pkg_uploaded"] = pkg_uploaded
         self.env["pkg_metadata_updated"] = pkg_metadata_updated
-        if pkg_metadata_updated or pkg_uploaded:
+        self.env["pkg_deduplicated"] = pkg_deduplicated
+        if pkg_metadata_updated or pkg_uploaded or pkg_deduplicated:
             self.env["jamfpackageuploader_summary_result"] = {
                 "summary_text": "The following packages were uploaded to or updated in Jamf Pro:",
                 "report_fields": [
@@ -978,6 +1064,7 @@ class JamfPackageUploaderBase(JamfUploaderBase):
                     "pkg_display_name",
                     "pkg_path",
                     "version",
+                    "upload_deduplicated",
                     "packages_recalculated",
                 ],
                 "data": {
@@ -987,6 +1074,7 @@ class JamfPackageUploaderBase(JamfUploaderBase):
                     "pkg_display_name": pkg_display_name,
                     "pkg_path": pkg_path,
                     "version": version,
+                    "upload_deduplicated": str(pkg_deduplicated),
                     "packages_recalculated": str(packages_recalculated),
                 },
             }
@@ -106,7 +106,11 @@ class JamfPatchUploaderBase(JamfUploaderBase):
                     f"ERROR: Couldn't fetch package id for package '{pkg_name}' after {max_tries} "
                     "attempts."
                 )
-            sleep(10)
+            # don't let the cached package list hide a package that has just arrived
+            self.invalidate_cached_responses(
+                f"{api_url}/{self.api_endpoints('package', tenant_id=tenant_id)}"
+            )
+            sleep(self.retry_delay(count))
 
         # Get current softwaretitle
         object_type = "patch_software_title"
@@ -173,37 +177,20 @@ class JamfPatchUploaderBase(JamfUploaderBase):
         )
 
         # Upload the 'updated' patch softwaretitle
-        count = 0
-        while True:
-            count += 1
-            self.output(
-                f"Patch Software Title upload attempt {count}.", verbose_level=2
-            )
-            r = self.curl(
+        self.send_with_retry(
+            lambda: self.curl(
                 api_type="classic",
                 request="PUT",
                 url=url,  # Unchanged url from the request earlier
                 token=token,
                 data=patch_softwaretitle_xml_file,
-            )
-            # Check HTTP Status
-            if (
-                self.status_check(
-                    r, "Patch Software Title", patch_softwaretitle_name, "PUT"
-                )
-                == "break"
-            ):
-                break
-            if count >= max_tries:
-                self.output(
-                    "ERROR: Uploading updated Patch Software Title did not succeed after "
-                    f"{max_tries} attempts."
-                )
-                raise ProcessorError("ERROR: Patch Software Title upload failed.")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            "Patch Software Title",
+            patch_softwaretitle_name,
+            "PUT",
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
 
     def upload_patch(
         self,
@@ -228,31 +215,21 @@ class JamfPatchUploaderBase(JamfUploaderBase):
         else:
             url = f"{api_url}/{endpoint}/softwaretitleconfig/id/{patch_softwaretitle_id}"
 
-        count = 0
-        while True:
-            count += 1
-            self.output(f"Patch upload attempt {count}", verbose_level=2)
-            request = "PUT" if patch_id else "POST"
-            r = self.curl(
+        request = "PUT" if patch_id else "POST"
+        r = self.send_with_retry(
+            lambda: self.curl(
                 api_type="classic",
                 request=request,
                 url=url,
                 token=token,
                 data=object_template,
-            )
-            # check HTTP response
-            if self.status_check(r, "Patch", object_name, request) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"WARNING: Patch policy upload did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError("ERROR: Policy upload failed.")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            "Patch",
+            object_name,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
         return r
 
     def execute(self):
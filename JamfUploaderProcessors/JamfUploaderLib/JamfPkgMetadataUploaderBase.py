@@ -27,7 +27,6 @@ import json
 import os.path
 import sys
 
-from time import sleep
 from urllib.parse import quote
 
 from autopkglib import ProcessorError, APLooseVersion  # pylint: disable=import-error
@@ -145,30 +144,17 @@ class JamfPkgMetadataUploaderBase(JamfUploaderBase):
         else:
             url = f"{api_url}/{endpoint}"
 
-        count = 0
-        while True:
-            count += 1
-            self.output(
-                f"Package metadata upload attempt {count}",
-                verbose_level=2,
-            )
-            request = "PUT" if pkg_id else "POST"
-            r = self.curl(
+        request = "PUT" if pkg_id else "POST"
+        r = self.send_with_retry(
+            lambda: self.curl(
                 api_type="jpapi", request=request, url=url, token=token, data=pkg_json
-            )
-            # check HTTP response
-            if self.status_check(r, "Package Metadata", pkg_name, request) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"Package metadata upload did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError("ERROR: Package metadata upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            "Package Metadata",
+            pkg_name,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
         if r.status_code == 201:
             obj = json.loads(json.dumps(r.output))
             self.output(
@@ -20,12 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
-
-from autopkglib import (  # pylint: disable=import-error
-    ProcessorError,
-)
-
 # to use a base module in AutoPkg we need to add this path to the sys.path.
 # this violates flake8 E402 (PEP8 imports) but is unavoidable, so the following
 # imports require noqa comments for E402
@@ -48,23 +42,14 @@ class JamfPolicyDeleterBase(JamfUploaderBase):
         endpoint = self.api_endpoints(object_type, tenant_id=tenant_id)
         url = f"{api_url}/{endpoint}/id/{object_id}"
 
-        count = 0
-        while True:
-            count += 1
-            self.output(f"Policy delete attempt {count}", verbose_level=2)
-            request = "DELETE"
-            r = self.curl(api_type="classic", request=request, url=url, token=token)
-
-            # check HTTP response
-            if self.status_check(r, "Policy", object_id, request) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"WARNING: Policy deletion did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError("ERROR: Policy deletion failed ")
-            sleep(10)
+        request = "DELETE"
+        r = self.send_with_retry(
+            lambda: self.curl(api_type="classic", request=request, url=url, token=token),
+            "Policy",
+            object_id,
+            request,
+            max_tries=max_tries,
+        )
         return r
 
     def execute(self):
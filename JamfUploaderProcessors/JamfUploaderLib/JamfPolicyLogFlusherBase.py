@@ -20,13 +20,8 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
 from urllib.parse import quote
 
-from autopkglib import (  # pylint: disable=import-error
-    ProcessorError,
-)
-
 # to use a base module in AutoPkg we need to add this path to the sys.path.
 # this violates flake8 E402 (PEP8 imports) but is unavoidable, so the following
 # imports require noqa comments for E402
@@ -50,31 +45,20 @@ class JamfPolicyLogFlusherBase(JamfUploaderBase):
         # pylint: disable=line-too-long
         url = f"{api_url}/{endpoint}/policy/id/{object_id}/interval/{quote(interval)}"
 
-        count = 0
-        while True:
-            count += 1
-            self.output(f"Log Flush Request attempt {count}", verbose_level=2)
-            request = "DELETE"
-            r = self.curl(
+        request = "DELETE"
+        r = self.send_with_retry(
+            lambda: self.curl(
                 api_type="classic",
                 request=request,
                 url=url,
                 token=token,
-            )
-
-            # check HTTP response
-            if self.status_check(r, "Log Flush Request", object_id, request) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"WARNING: Log Flush Request did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError("ERROR: Log Flush Request failed")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            "Log Flush Request",
+            object_id,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
         return r
 
     def execute(self):
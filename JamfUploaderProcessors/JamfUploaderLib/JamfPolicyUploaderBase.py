@@ -21,8 +21,6 @@ import os.path
 import sys
 import xml.etree.ElementTree as ElementTree
 
-from time import sleep
-
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
 )
@@ -93,31 +91,21 @@ class JamfPolicyUploaderBase(JamfUploaderBase):
         # if we find an object ID we put, if not, we post
         url = f"{api_url}/{endpoint}/id/{object_id}"
 
-        count = 0
-        while True:
-            count += 1
-            self.output(f"Policy upload attempt {count}", verbose_level=2)
-            request = "PUT" if object_id else "POST"
-            r = self.curl(
+        request = "PUT" if object_id else "POST"
+        r = self.send_with_retry(
+            lambda: self.curl(
                 api_type="classic",
                 request=request,
                 url=url,
                 token=token,
                 data=object_template,
-            )
-            # check HTTP response
-            if self.status_check(r, "Policy", object_name, request) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"WARNING: Policy upload did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError("ERROR: Policy upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+            ),
+            "Policy",
+            object_name,
+            request,
+            max_tries=max_tries,
+            sleep_time=sleep_time,
+        )
         return r
 
     def upload_policy_icon(
@@ -176,33 +164,22 @@ class JamfPolicyUploaderBase(JamfUploaderBase):
 
             self.output("Uploading icon...")
 
-            count = 0
-            while True:
-                count += 1
-                self.output(f"Icon upload attempt {count}", verbose_level=2)
-                request = "POST"
-                r = self.curl(
+            request = "POST"
+            self.send_with_retry(
+                lambda: self.curl(
                     api_type="classic",
                     request=request,
                     url=url,
                     token=token,
                     data=icon_path,
                     endpoint_type="policy_icon",
-                )
-
-                # check HTTP response
-                if self.status_check(r, "Icon", policy_icon_name, request) == "break":
-                    break
-                if count >= max_tries:
-                    print(
-                        f"WARNING: Icon upload did not succeed after {max_tries} attempts"
-                    )
-                    print(f"\nHTTP POST Response Code: {r.status_code}")
-                    raise ProcessorError("ERROR: Icon upload failed")
-                if int(sleep_time) > 10:
-                    sleep(int(sleep_time))
-                else:
-                    sleep(10)
+                ),
+                "Icon",
+                policy_icon_name,
+                request,
+                max_tries=max_tries,
+                sleep_time=sleep_time,
+            )
         else:
             self.output("Not replacing icon. Set replace_icon='True' to enforce...")
         return policy_icon_name
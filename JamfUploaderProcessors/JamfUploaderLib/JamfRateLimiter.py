@@ -0,0 +1,128 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfRateLimiter — client-side rate limiting for JamfUploader.
+
+A token bucket for each Jamf Pro instance, shared by every process on the
+machine. The bucket lives in a small JSON state file which is locked with
+flock() while a token is taken, so parallel AutoPkg runs against the same
+instance stay within one combined request rate instead of each being throttled
+by the server.
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import fcntl
+import json
+import os
+import threading
+import time
+
+STATE_FILE_NAME = "rate_limit.json"
+
+
+class JamfRateLimiter:
+    """Token bucket shared across processes through a locked state file.
+
+    Tokens are added at `rate` per second up to `burst`. Each request takes one
+    token. If the bucket is empty, the token is borrowed and the caller sleeps
+    until it would have been added, so waiting requests are served in the
+    order they asked rather than racing each other for the lock.
+    """
+
+    def __init__(self, state_dir, rate, burst=None, log_fn=None):
+        self.state_file = os.path.join(state_dir, STATE_FILE_NAME)
+        self.rate = float(rate)
+        if self.rate <= 0:
+            raise ValueError("rate must be greater than zero")
+        self.burst = max(1.0, float(burst or self.rate))
+        self._log = log_fn or (lambda msg, verbose_level=2: None)
+        self._lock = threading.Lock()
+        # totals for this process
+        self.stats = {"requests": 0, "throttled": 0, "seconds_waited": 0.0}
+
+    def acquire(self):
+        """Take a token for one request, sleeping until one is available.
+
+        Returns the number of seconds spent waiting. If the state file cannot be
+        used (for example it belongs to another user), the request is not limited.
+        """
+        try:
+            wait = self._reserve()
+        except OSError as e:
+            self._log(f"Rate limiter unavailable ({e}) - not limiting", verbose_level=2)
+            wait = 0.0
+        if wait > 0:
+            time.sleep(wait)
+        with self._lock:
+            self.stats["requests"] += 1
+            if wait > 0:
+                self.stats["throttled"] += 1
+                self.stats["seconds_waited"] += wait
+        return wait
+
+    def shared_stats(self):
+        """Return the totals recorded by all processes using this state file."""
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as fp:
+                state = self._parse(fp.read())
+        except OSError:
+            state = self._parse("")
+        return {
+            key: state[key] for key in ("requests", "throttled", "seconds_waited")
+        }
+
+    def _reserve(self):
+        """Take a token under the file lock and return the seconds until it is due."""
+        fd = os.open(self.state_file, os.O_RDWR | os.O_CREAT, 0o666)
+        with os.fdopen(fd, "r+", encoding="utf-8") as fp:
+            fcntl.flock(fp, fcntl.LOCK_EX)
+            try:
+                state = self._parse(fp.read())
+                now = time.time()
+                # wall-clock time is shared between processes; ignore it going back
+                elapsed = max(0.0, now - state["updated"])
+                tokens = min(self.burst, state["tokens"] + elapsed * self.rate) - 1
+                wait = -tokens / self.rate if tokens < 0 else 0.0
+
+                state["tokens"] = tokens
+                state["updated"] = now
+                state["requests"] += 1
+                if wait > 0:
+                    state["throttled"] += 1
+                    state["seconds_waited"] += wait
+                fp.seek(0)
+                fp.truncate()
+                json.dump(state, fp)
+                fp.flush()
+            finally:
+                fcntl.flock(fp, fcntl.LOCK_UN)
+        return wait
+
+    def _parse(self, text):
+        """Return the bucket state from the state file contents, or a full bucket."""
+        state = {
+            "tokens": self.burst,
+            "updated": 0.0,
+            "requests": 0,
+            "throttled": 0,
+            "seconds_waited": 0.0,
+        }
+        try:
+            state.update(json.loads(text))
+        except ValueError:
+            pass
+        return state
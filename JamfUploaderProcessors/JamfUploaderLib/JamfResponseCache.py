@@ -0,0 +1,191 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfResponseCache — per-run cache of Jamf Pro API GET responses.
+
+Holds the responses to recent GET requests so that repeated lookups of the
+same object or list within a run are answered without another request.
+Concurrent requests for the same key are coalesced into one, and every write
+to a resource invalidates the cached responses for that resource.
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import copy
+import re
+import threading
+
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from JamfSchemaRegistry import (  # pylint: disable=import-error
+    JPAPI_CLASSIC_EQUIVALENTS,
+)
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+def _collection_name(segment):
+    """Return a path segment in lower case with punctuation removed."""
+    return re.sub(r"[\W_]+", "", segment.lower())
+
+
+# Jamf Pro API collection names mapped to the Classic API resource holding the
+# same objects, where the two do not match by name
+RESOURCE_ALIASES = {
+    _collection_name(path.split("/")[1]): resource
+    for path, resource in JPAPI_CLASSIC_EQUIVALENTS.items()
+}
+
+
+def resource_for_url(url):
+    """Return the (host, resource) that a Jamf Pro API URL belongs to, or None.
+
+    The resource is the collection name with punctuation removed, so that the
+    Classic API and Jamf Pro API paths for the same objects match - for example
+    JSSResource/computergroups and api/v1/computer-groups. Collections whose
+    names differ between the APIs are mapped with RESOURCE_ALIASES, so that
+    api/v2/patch-software-title-configurations matches
+    JSSResource/patchsoftwaretitles. Platform gateway paths are recognised too.
+    """
+    parts = urlsplit(url)
+    segments = [s for s in parts.path.split("/") if s]
+    if "JSSResource" in segments:
+        segments = segments[segments.index("JSSResource") + 1 :]
+    elif segments and segments[0] in ("api", "uapi"):
+        segments = segments[1:]
+        if segments and segments[0] in ("pro", "proclassic"):
+            segments = segments[1:]
+        if segments and re.fullmatch(r"v\d+|preview", segments[0]):
+            segments = segments[1:]
+        if len(segments) >= 2 and segments[0] == "tenant":
+            segments = segments[2:]
+    else:
+        return None
+    # icon uploads to JSSResource/fileuploads/policies change the policy
+    if segments and segments[0] == "fileuploads":
+        segments = segments[1:]
+    if not segments:
+        return None
+    resource = _collection_name(segments[0])
+    return parts.netloc.lower(), RESOURCE_ALIASES.get(resource, resource)
+
+
+class _Pending:
+    """A fetch in progress that other callers can wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class JamfResponseCache:
+    """Thread-safe LRU cache of GET responses with request coalescing.
+
+    Values are deep-copied on the way in and out, so callers may modify the
+    response they are given without affecting the cache.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, log_fn=None):
+        self.max_entries = max_entries
+        self._log = log_fn or (lambda msg, verbose_level=2: None)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (resource, value)
+        self._pending = {}  # key -> _Pending
+        self._generations = {}  # resource -> count of invalidations
+        self._epoch = 0  # count of clear() calls
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "invalidations": 0,
+            "evictions": 0,
+        }
+
+    def fetch(self, key, resource, fetch_fn, cacheable_fn=None):
+        """Return the cached value for key, or call fetch_fn() to get and cache it.
+
+        If another thread is already fetching the same key, wait for its result
+        instead of sending a second request. The value is only stored if
+        cacheable_fn(value) is true and the resource was not written to while it
+        was being fetched.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return copy.deepcopy(self._entries[key][1])
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[key] = _Pending()
+                self.stats["misses"] += 1
+                generation = (self._epoch, self._generations.get(resource, 0))
+            else:
+                self.stats["coalesced"] += 1
+
+        if not owner:
+            # another thread is fetching this key already
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return copy.deepcopy(pending.value)
+
+        try:
+            value = fetch_fn()
+        except BaseException as e:
+            pending.error = e
+            with self._lock:
+                del self._pending[key]
+            pending.done.set()
+            raise
+
+        stored = copy.deepcopy(value)
+        pending.value = stored
+        with self._lock:
+            del self._pending[key]
+            if (
+                self.max_entries > 0
+                and (cacheable_fn is None or cacheable_fn(value))
+                and (self._epoch, self._generations.get(resource, 0)) == generation
+            ):
+                self._entries[key] = (resource, stored)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.stats["evictions"] += 1
+        pending.done.set()
+        return value
+
+    def invalidate(self, resource):
+        """Drop every cached response for a resource."""
+        with self._lock:
+            self._generations[resource] = self._generations.get(resource, 0) + 1
+            stale = [k for k, (res, _) in self._entries.items() if res == resource]
+            for key in stale:
+                del self._entries[key]
+            self.stats["invalidations"] += 1
+        if stale:
+            self._log(
+                f"Cleared {len(stale)} cached responses for '{resource[1]}'",
+                verbose_level=3,
+            )
+
+    def clear(self):
+        """Drop every cached response."""
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
@@ -90,6 +90,28 @@ CLASSIC_LIST_KEY_OVERRIDES = {
     "restrictedsoftware": "restricted_software",
 }
 
+# Classic API resources whose objects have a 'general' section that can be
+# fetched on its own with /subset/general. The section holds the id and name.
+CLASSIC_GENERAL_SUBSET_RESOURCES = (
+    "macapplications",
+    "mobiledeviceapplications",
+    "mobiledeviceconfigurationprofiles",
+    "osxconfigurationprofiles",
+    "policies",
+)
+
+# Jamf Pro API collections that hold the same objects or settings as a Classic
+# API resource whose name differs even with punctuation removed, mapped to that
+# resource. Writes through either API change what both return.
+JPAPI_CLASSIC_EQUIVALENTS = {
+    "v3/check-in": "computercheckin",
+    "v1/computer-inventory-collection-settings": "computerinventorycollection",
+    "v1/computers-inventory": "computers",
+    "v1/computers-inventory-detail": "computers",
+    "v2/patch-software-title-configurations": "patchsoftwaretitles",
+    "v1/volume-purchasing-locations": "vppaccounts",
+}
+
 # ---------------------------------------------------------------------------
 # JPAPI alias table: maps JamfUploader internal object_type names to the
 # base_path key used in the parsed JPAPI schema (version/resource form).
@@ -243,6 +265,11 @@ class JamfSchemaRegistry:
             deprecated     bool
             deprecation_date  str or ""
 
+        Classic results also have:
+            has_name_path  bool, true if objects can be fetched by name
+            has_subset_path  bool, true if objects can be fetched by subset
+            subsets        set of subset names in the schema (may be empty)
+
         Returns None if the object_type cannot be resolved.
         """
         self._ensure_loaded()
@@ -448,6 +475,8 @@ class JamfSchemaRegistry:
                     "deprecation_date": "",
                     "has_name_path": False,
                     "has_id_path": False,
+                    "has_subset_path": False,
+                    "subsets": set(),
                 }
 
             for method, details in methods.items():
@@ -465,9 +494,30 @@ class JamfSchemaRegistry:
                 resources[resource_name]["has_id_path"] = True
             if "/name/{name}" in path:
                 resources[resource_name]["has_name_path"] = True
+            if "/id/{id}/subset/" in path:
+                resources[resource_name]["has_subset_path"] = True
+                resources[resource_name]["subsets"].update(
+                    self._classic_subset_names(methods)
+                )
 
         return resources
 
+    def _classic_subset_names(self, path_item):
+        """Return the subset names listed in the enum of a path's subset parameter.
+
+        Not every schema lists them, in which case an empty set is returned.
+        """
+        parameters = list(path_item.get("parameters", []))
+        for method, details in path_item.items():
+            if method in ("get", "post", "put", "delete") and isinstance(details, dict):
+                parameters.extend(details.get("parameters", []))
+        names = set()
+        for parameter in parameters:
+            if isinstance(parameter, dict) and parameter.get("name") == "subset":
+                enum = parameter.get("enum") or parameter.get("items", {}).get("enum")
+                names.update(str(value) for value in enum or [])
+        return names
+
     # ------------------------------------------------------------------
     # JPAPI (OpenAPI 3.0) parsing
     # ------------------------------------------------------------------
@@ -617,6 +667,9 @@ class JamfSchemaRegistry:
             "list_key": list_key,
             "deprecated": info["deprecated"],
             "deprecation_date": info.get("deprecation_date", ""),
+            "has_name_path": info.get("has_name_path", False),
+            "has_subset_path": info.get("has_subset_path", False),
+            "subsets": info.get("subsets", set()),
         }
 
     def _find_jpapi_by_alias(self, alias_path):
@@ -22,8 +22,10 @@ import json
 import os.path
 import pathlib
 import sys
+import time
 
-from time import sleep
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 
 from autopkglib import (  # pylint: disable=import-error
@@ -39,6 +41,11 @@ from JamfUploaderBase import (  # pylint: disable=import-error,wrong-import-posi
     JamfUploaderBase,
 )
 
+DEFAULT_DOWNLOAD_WORKERS = 4
+MAX_DOWNLOAD_WORKERS = 20
+# how often to report progress while scanning objects
+PROGRESS_INTERVAL = 100
+
 
 class Bcolors:
     """Colours for print outs"""
@@ -51,118 +58,151 @@ class Bcolors:
 class JamfUnusedPackageCleanerBase(JamfUploaderBase):
     """Class for functions used removing unused packages from Jamf Pro"""
 
-    def get_packages_in_policies(self, api_url, token, tenant_id=""):
-        """get a list of all packages in all policies"""
+    def scan_objects(
+        self, api_url, object_type, object_path, token, workers, tenant_id=""
+    ):
+        """Yield the value at object_path in every object of a type.
+
+        Objects are read workers at a time as the list of objects arrives, and
+        only the Classic API subset holding the value is requested where there is
+        one. Progress is reported every PROGRESS_INTERVAL objects.
+        """
+        label = self.object_list_types(object_type).replace("_", " ")
+
+        def read(obj):
+            return self.get_api_object_value_from_id(
+                api_url,
+                object_type=object_type,
+                object_id=obj["id"],
+                object_path=object_path,
+                token=token,
+                tenant_id=tenant_id,
+            )
 
-        # get all policies
-        policies = self.get_all_api_objects(api_url, "policy", token=token, tenant_id=tenant_id)
+        start = time.monotonic()
+        count = 0
 
-        # get all package objects from policies and add to a list
-        if policies:
-            # define a new list
-            packages_in_policies = []
-            self.output(
-                (
-                    "Please wait while we gather a list of all packages in all policies "
-                    f"(total {len(policies)})..."
-                ),
-                verbose_level=1,
-            )
-            for policy in policies:
-                generic_info = self.get_api_object_value_from_id(
-                    api_url,
-                    object_type="policy",
-                    object_id=policy["id"],
-                    object_path="",
-                    token=token,
-                    tenant_id=tenant_id,
-                )
-                try:
-                    pkgs = generic_info["package_configuration"]["packages"]
-                    for x in pkgs:
-                        pkg = x["name"]
-                        if pkg not in packages_in_policies:
-                            packages_in_policies.append(pkg)
-                except IndexError:
-                    pass
-            return packages_in_policies
-
-    def get_packages_in_patch_titles(self, api_url, token, tenant_id=""):
-        """get a list of all packages in all patch software titles"""
-
-        # get all patch software titles
-        titles = self.get_all_api_objects(api_url, "patch_software_title", token=token, tenant_id=tenant_id)
-
-        # get all package objects from patch titles and add to a list
-        if titles:
-            # define a new list
-            packages_in_titles = []
-            self.output(
-                (
-                    "Please wait while we gather a list of all packages in all patch titles "
-                    f"(total {len(titles)})..."
-                ),
-                verbose_level=1,
-            )
-            for title in titles:
-                versions = self.get_api_object_value_from_id(
-                    api_url,
-                    object_type="patch_software_title",
-                    object_id=title["id"],
-                    object_path="versions",
-                    token=token,
-                    tenant_id=tenant_id,
+        def finish(future):
+            nonlocal count
+            value = future.result()
+            count += 1
+            if count % PROGRESS_INTERVAL == 0:
+                elapsed = time.monotonic() - start
+                self.output(
+                    f"Checked {count} {label} ({count / elapsed:.1f} per second)",
+                    verbose_level=1,
                 )
+            return value
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            try:
+                for obj in self.iter_all_api_objects(
+                    api_url, object_type, token=token, tenant_id=tenant_id
+                ):
+                    pending.append(executor.submit(read, obj))
+                    # keep a few objects queued so that the workers stay busy
+                    if len(pending) >= workers * 2:
+                        yield finish(pending.popleft())
+                while pending:
+                    yield finish(pending.popleft())
+            finally:
+                # an object that cannot be read stops the scan
+                for future in pending:
+                    future.cancel()
+
+        elapsed = time.monotonic() - start
+        self.output(
+            f"Checked {count} {label} in {elapsed:.1f} seconds "
+            f"({count / elapsed if elapsed else 0:.1f} per second)",
+            verbose_level=1,
+        )
+
+    def get_packages_in_policies(
+        self, api_url, token, workers, package_map, tenant_id=""
+    ):
+        """get the set of all packages in all policies"""
+
+        # get all package objects from the package_configuration of each policy,
+        # reading the policies as the list of policies arrives
+        packages_in_policies = set()
+        self.output(
+            "Please wait while we gather a list of all packages in all policies...",
+            verbose_level=1,
+        )
+        for package_configuration in self.scan_objects(
+            api_url,
+            "policy",
+            "package_configuration",
+            token,
+            workers,
+            tenant_id=tenant_id,
+        ):
+            if package_configuration:
+                for x in package_configuration.get("packages", []):
+                    packages_in_policies.add(
+                        package_map.get(str(x.get("id")), x["name"])
+                    )
+        return packages_in_policies
+
+    def get_packages_in_patch_titles(
+        self, api_url, token, workers, package_map, tenant_id=""
+    ):
+        """get the set of all packages in all patch software titles"""
+
+        # get all package objects from the versions of each patch title, reading
+        # the titles as the list of titles arrives
+        packages_in_titles = set()
+        self.output(
+            "Please wait while we gather a list of all packages in all patch titles...",
+            verbose_level=1,
+        )
+        for versions in self.scan_objects(
+            api_url,
+            "patch_software_title",
+            "versions",
+            token,
+            workers,
+            tenant_id=tenant_id,
+        ):
+            for version in versions or []:
                 try:
-                    if len(versions) > 0:
-                        for i in range(  # pylint: disable=consider-using-enumerate
-                            len(versions)
-                        ):
-                            try:
-                                pkg = versions[i]["package"]["name"]
-                                if pkg:
-                                    if pkg != "None" and pkg not in packages_in_titles:
-                                        packages_in_titles.append(pkg)
-                            except IndexError:
-                                pass
-                            except KeyError:
-                                pass
-                except IndexError:
-                    pass
-            return packages_in_titles
-
-    def get_packages_in_prestages(self, api_url, token, tenant_id=""):
-        """get a list of all packages in all PreStage Enrollments"""
-
-        # get all prestages
-        prestages = self.get_all_api_objects(api_url, "computer_prestage", token=token, tenant_id=tenant_id)
-
-        # get all package objects from prestages and add to a list
-        if prestages:
-            packages_in_prestages = []
-            self.output(
-                (
-                    "Please wait while we gather a list of all packages in all "
-                    f"PreStage Enrollments (total {len(prestages)})..."
-                ),
-                verbose_level=1,
-            )
-            for _, prestage in enumerate(prestages):
-                pkg_ids = prestage["customPackageIds"]
-                if len(pkg_ids) > 0:
-                    for pkg_id in pkg_ids:
-                        pkg = self.get_api_object_value_from_id(
-                            api_url,
-                            object_type="package",
-                            object_id=pkg_id,
-                            object_path="name",
-                            token=token,
-                            tenant_id=tenant_id,
-                        )
-                        if pkg:
-                            if pkg not in packages_in_prestages:
-                                packages_in_prestages.append(pkg)
-            return packages_in_prestages
+                    pkg = package_map.get(
+                        str(version["package"].get("id")), version["package"]["name"]
+                    )
+                except (AttributeError, KeyError, TypeError):
+                    continue
+                if pkg and pkg != "None":
+                    packages_in_titles.add(pkg)
+        return packages_in_titles
+
+    def get_packages_in_prestages(self, api_url, token, package_map, tenant_id=""):
+        """get the set of all packages in all PreStage Enrollments"""
+
+        # get all package objects from prestages, naming them from the package map
+        packages_in_prestages = set()
+        self.output(
+            "Please wait while we gather a list of all packages in all "
+            "PreStage Enrollments...",
+            verbose_level=1,
+        )
+        count = 0
+        for prestage in self.iter_all_api_objects(
+            api_url, "computer_prestage", token=token, tenant_id=tenant_id
+        ):
+            count += 1
+            for pkg_id in prestage["customPackageIds"]:
+                pkg = package_map.get(str(pkg_id))
+                if pkg:
+                    packages_in_prestages.add(pkg)
+                else:
+                    self.output(
+                        f"PreStage '{prestage.get('displayName')}' refers to "
+                        f"package ID {pkg_id}, which does not exist",
+                        verbose_level=2,
+                    )
+        self.output(f"Checked {count} PreStage Enrollments", verbose_level=1)
+        return packages_in_prestages
 
     def delete_local_pkg(self, mount_share, pkg_name):
         """Delete existing package from local DP or mounted share"""
@@ -188,34 +228,6 @@ class JamfUnusedPackageCleanerBase(JamfUploaderBase):
                 verbose_level=2,
             )
 
-    def delete_package(self, api_url, object_id, token, max_tries, tenant_id=""):
-        """Cleaning Packages"""
-
-        self.output("Deleting package...")
-
-        object_type = "package_v1"
-        endpoint = self.api_endpoints(object_type, tenant_id=tenant_id)
-        url = f"{api_url}/{endpoint}/{object_id}"
-
-        count = 0
-        while True:
-            count += 1
-            self.output(f"Package delete attempt {count}", verbose_level=2)
-            request = "DELETE"
-            r = self.curl(api_type="jpapi", request=request, url=url, token=token)
-
-            # check HTTP response
-            if self.status_check(r, "Package", object_id, request) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"WARNING: Package deletion did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP DELETE Response Code: {r.status_code}")
-                raise ProcessorError("ERROR: Package deletion failed")
-            sleep(10)
-        return r
-
     def write_csv_file(self, file, fields, data):
         """dump some text to a file"""
         with open(file, "w", encoding="utf-8") as csvfile:
@@ -237,18 +249,24 @@ class JamfUnusedPackageCleanerBase(JamfUploaderBase):
         api_object_action,
         status_code,
         max_tries,
+        error=None,
     ):
-        """Send a Slack notification"""
+        """Send a Slack notification. Where the action failed, its error is shown
+        in place of the HTTP response."""
 
         if not slack_webhook_url:
             self.output("No Slack webhook URL provided")
             return
 
+        if error:
+            outcome = f"Error: {error}"
+        else:
+            outcome = f"HTTP Response: {status_code}"
         slack_text = (
             f"*API {api_xml_object} {api_object_action} action*\n"
             f"URL: {api_url}\n"
             f"Object Name: *{chosen_api_object_name}*\n"
-            f"HTTP Response: {status_code}"
+            f"{outcome}"
         )
 
         self.output(slack_text, verbose_level=2)
@@ -259,30 +277,20 @@ class JamfUnusedPackageCleanerBase(JamfUploaderBase):
         }
         slack_json = json.dumps(slack_data)
 
-        count = 0
-        while True:
-            count += 1
-            self.output(
-                f"Slack webhook post attempt {count}",
-                verbose_level=2,
-            )
-            r = self.curl(
+        self.send_with_retry(
+            lambda: self.curl(
                 api_type="slack",
                 request="POST",
                 url=slack_webhook_url,
                 data=slack_json,
                 endpoint_type="slack",
-            )
-            # check HTTP response
-            if self.slack_status_check(r) == "break":
-                break
-            if count >= max_tries:
-                self.output(
-                    f"Slack webhook send did not succeed after {max_tries} attempts"
-                )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError("ERROR: Slack webhook failed to send")
-            sleep(10)
+            ),
+            "Slack webhook",
+            None,
+            "POST",
+            max_tries=max_tries,
+            success_fn=lambda r: self.slack_status_check(r) == "break",
+        )
 
     def slack_status_check(self, r):
         """Return a message dependent on the HTTP response"""
@@ -310,6 +318,7 @@ class JamfUnusedPackageCleanerBase(JamfUploaderBase):
         output_dir = self.env.get("output_dir")
         slack_webhook_url = self.env.get("slack_webhook_url")
         max_tries = self.env.get("max_tries")
+        download_workers = self.env.get("download_workers")
 
         # verify that max_tries is an integer greater than zero and less than 10
         try:
@@ -319,6 +328,14 @@ class JamfUnusedPackageCleanerBase(JamfUploaderBase):
         except (ValueError, TypeError):
             max_tries = 5
 
+        # verify that download_workers is an integer between 1 and the maximum
+        try:
+            download_workers = int(download_workers)
+            if download_workers < 1 or download_workers > MAX_DOWNLOAD_WORKERS:
+                raise ValueError
+        except (ValueError, TypeError):
+            download_workers = DEFAULT_DOWNLOAD_WORKERS
+
         object_type = "package_v1"
 
         # Create a list of smb shares in tuples
@@ -411,19 +428,43 @@ class JamfUnusedPackageCleanerBase(JamfUploaderBase):
         else:
             raise ProcessorError("ERROR: Jamf Pro URL not supplied")
 
-        # create empty dictionaries to hold used and unused packages
+        # create empty dictionaries to hold used and unused packages, and lists of
+        # the packages deleted and not deleted
         unused_packages = {}
         used_packages = {}
+        deleted_packages = []
+        failed_packages = []
+
+        # get a list of all packages in Jamf Pro, and a map of their IDs to names
+        # for resolving the packages referred to by other objects
+        packages = self.get_all_api_objects(
+            api_url, "package_v1", token=token, tenant_id=jamf_platform_gw_tenant_id
+        )
+        package_map = {
+            str(package["id"]): package["packageName"] for package in packages or []
+        }
 
         # get a list of packages in prestage enrollments
-        packages_in_prestages = self.get_packages_in_prestages(api_url, token, tenant_id=jamf_platform_gw_tenant_id)
+        packages_in_prestages = self.get_packages_in_prestages(
+            api_url, token, package_map, tenant_id=jamf_platform_gw_tenant_id
+        )
         # get a list of packages in patch software titles
-        packages_in_titles = self.get_packages_in_patch_titles(api_url, token, tenant_id=jamf_platform_gw_tenant_id)
+        packages_in_titles = self.get_packages_in_patch_titles(
+            api_url,
+            token,
+            download_workers,
+            package_map,
+            tenant_id=jamf_platform_gw_tenant_id,
+        )
         # get a list of packages in policies
-        packages_in_policies = self.get_packages_in_policies(api_url, token, tenant_id=jamf_platform_gw_tenant_id)
+        packages_in_policies = self.get_packages_in_policies(
+            api_url,
+            token,
+            download_workers,
+            package_map,
+            tenant_id=jamf_platform_gw_tenant_id,
+        )
 
-        # get a list of all packages in Jamf Pro
-        packages = self.get_all_api_objects(api_url, "package_v1", token=token, tenant_id=jamf_platform_gw_tenant_id)
         if packages:
             csv_fields = ["pkg_id", "pkg_name", "used"]
             csv_data = []
@@ -515,51 +556,72 @@ class JamfUnusedPackageCleanerBase(JamfUploaderBase):
                     f"  {Bcolors.FAIL}{pkg_name}{Bcolors.ENDC}", verbose_level=1
                 )
 
-            deleted_count = 0
             if dry_run:
                 self.output(
                     "Dry run mode enabled. No packages will be deleted.",
                     verbose_level=1,
                 )
             else:
-                # delete the packages
+                # delete the packages. This could take time, so the token is renewed
+                # when it is about to expire
+                self.keep_token(
+                    token,
+                    None
+                    if bearer_token
+                    else {
+                        "jamf_url": jamf_url,
+                        "jamf_user": jamf_user,
+                        "password": jamf_password,
+                        "region": jamf_platform_gw_region,
+                        "tenant_id": jamf_platform_gw_tenant_id,
+                        "client_id": client_id,
+                        "client_secret": client_secret,
+                        "jamf_cli_profile": jamf_cli_profile,
+                    },
+                )
+                outcomes = self.delete_objects(
+                    api_url,
+                    object_type,
+                    list(unused_packages),
+                    tenant_id=jamf_platform_gw_tenant_id,
+                    max_tries=max_tries,
+                )
                 for pkg_id, pkg_name in unused_packages.items():
-                    self.output(f"Deleting {pkg_name}...")
-                    status_code = self.delete_object(
-                        jamf_url, "package_v1", pkg_id, token,
-                        tenant_id=jamf_platform_gw_tenant_id,
-                    )
-                    # Process for SMB shares if defined
-                    if len(smb_shares) > 0:
-                        self.output(
-                            "Number of File Share DPs: " + str(len(smb_shares)),
-                            verbose_level=2,
-                        )
-                    for smb_share in smb_shares:
-                        smb_url, smb_user, smb_password = (
-                            smb_share[0],
-                            smb_share[1],
-                            smb_share[2],
-                        )
-                        self.output(
-                            f"Begin deleting from File Share DP {smb_url}",
-                            verbose_level=1,
-                        )
-                        if "smb://" in smb_url:
-                            # mount the share
-                            self.mount_smb(smb_url, smb_user, smb_password)
-                        # delete existing package from the local folder
-                        self.delete_local_pkg(smb_url, pkg_name)
-                        if "smb://" in smb_url:
-                            # unmount the share
-                            self.umount_smb(smb_url)
-
-                    if status_code == 200:
+                    error = outcomes[pkg_id]
+                    if error:
+                        self.output(f"WARNING: {pkg_name} was not deleted: {error}")
+                        failed_packages.append(pkg_name)
+                    else:
                         self.output(
                             f"Package {pkg_name} deleted successfully",
                             verbose_level=1,
                         )
-                        deleted_count += 1
+                        deleted_packages.append(pkg_name)
+
+                        # Process for SMB shares if defined
+                        if len(smb_shares) > 0:
+                            self.output(
+                                "Number of File Share DPs: " + str(len(smb_shares)),
+                                verbose_level=2,
+                            )
+                        for smb_share in smb_shares:
+                            smb_url, smb_user, smb_password = (
+                                smb_share[0],
+                                smb_share[1],
+                                smb_share[2],
+                            )
+                            self.output(
+                                f"Begin deleting from File Share DP {smb_url}",
+                                verbose_level=1,
+                            )
+                            if "smb://" in smb_url:
+                                # mount the share
+                                self.mount_smb(smb_url, smb_user, smb_password)
+                            # delete existing package from the local folder
+                            self.delete_local_pkg(smb_url, pkg_name)
+                            if "smb://" in smb_url:
+                                # unmount the share
+                                self.umount_smb(smb_url)
 
                     # Send a Slack notification
                     self.send_slack_notification(
@@ -568,8 +630,9 @@ class JamfUnusedPackageCleanerBase(JamfUploaderBase):
                         "package",
                         pkg_name,
                         "delete",
-                        status_code,
+                        None if error else 204,
                         max_tries,
+                        error=error,
                     )
 
         # Save a summary of the package cleaning in the environment
@@ -579,10 +642,16 @@ class JamfUnusedPackageCleanerBase(JamfUploaderBase):
                 "used_packages",
                 "unused_packages",
                 "deleted",
+                "failed",
+                "deleted_packages",
+                "failed_packages",
             ],
             "data": {
                 "used_packages": str(len(used_packages)),
                 "unused_packages": str(len(unused_packages)),
-                "deleted": str(deleted_count),
+                "deleted": str(len(deleted_packages)),
+                "failed": str(len(failed_packages)),
+                "deleted_packages": ", ".join(deleted_packages),
+                "failed_packages": ", ".join(failed_packages),
             },
         }
@@ -17,18 +17,23 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import hashlib
 import json
 import os
+import random
 import re
 import shutil
 import subprocess
 import tempfile
+import threading
 import time
 import xml.etree.ElementTree as ET
 
 from base64 import b64encode
-from collections import abc, namedtuple
+from collections import abc, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 from shutil import rmtree
 from time import sleep
@@ -43,12 +48,77 @@ from autopkglib import (  # pylint: disable=import-error
 
 from JamfSchemaRegistry import (  # pylint: disable=import-error
     CLASSIC_ALIAS_TABLE,
+    CLASSIC_GENERAL_SUBSET_RESOURCES,
     CLASSIC_LIST_KEY_OVERRIDES,
     JPAPI_ALIAS_TABLE,
     JPAPI_KEY_OVERRIDES,
     JamfSchemaRegistry,
 )
 
+from JamfHTTPTransport import (  # pylint: disable=import-error
+    JamfHTTPTransport,
+    TransportError,
+    UnsupportedCurlOption,
+    request_from_curl_args,
+)
+
+from JamfRateLimiter import JamfRateLimiter  # pylint: disable=import-error
+
+from JamfResponseCache import (  # pylint: disable=import-error
+    DEFAULT_MAX_ENTRIES,
+    JamfResponseCache,
+    resource_for_url,
+)
+
+from JamfNameIndex import (  # pylint: disable=import-error
+    DEFAULT_INDEX_TTL,
+    JamfNameIndex,
+    fold,
+    tenant_for_url,
+)
+
+# Responses captured in memory spill to disk above this size (bytes)
+SPILL_THRESHOLD = 10 * 1024 * 1024
+
+# Block size used when copying response bodies
+BUFFER_SIZE = 1024 * 1024
+
+# HTTP status codes that indicate a transient failure worth retrying
+RETRYABLE_STATUS_CODES = (429, 502, 503, 504)
+
+# curl exit codes that indicate a connection failure rather than a bad request:
+# could not resolve proxy/host, could not connect, timeout, SSL connect error,
+# empty reply, send error, receive error
+CURL_CONNECTION_ERRORS = (5, 6, 7, 28, 35, 52, 55, 56)
+
+# Exponential backoff between retries (seconds)
+RETRY_BASE_DELAY = 2
+RETRY_MAX_DELAY = 60
+
+# Resources whose GET responses are never cached
+UNCACHED_RESOURCES = ("auth", "oauth")
+
+# Jamf Pro API pagination: default and largest page size, and the number of
+# pages fetched at once
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 2000
+DEFAULT_PAGE_WORKERS = 4
+
+# Longest URL sent when looking up many objects by name at once
+MAX_FILTER_URL_LENGTH = 2000
+
+# Stored tokens that expire within this many seconds are replaced, so that a
+# token is not used just before it expires
+TOKEN_EXPIRY_MARGIN = 120
+
+# seconds between checks that the token is still valid during long operations
+TOKEN_CHECK_INTERVAL = 60
+
+# objects deleted per request with a delete-multiple endpoint, and the number
+# deleted at once when they are deleted one by one
+DELETE_MULTIPLE_CHUNK_SIZE = 100
+DEFAULT_DELETE_WORKERS = 4
+
 
 class JamfUploaderBase(Processor):
     """Common functions used by at least two JamfUploader processors."""
@@ -59,6 +129,35 @@ class JamfUploaderBase(Processor):
     # Schema registry instance — lazily initialised per processor run
     _registry = None
 
+    # In-process HTTP connection pool — shared by all processors in a run
+    _http_transport = None
+
+    # Client-side rate limiters, keyed by Jamf Pro instance and settings, and the
+    # lock for the wait totals kept by each processor
+    _rate_limiters = {}
+    _rate_limit_lock = threading.Lock()
+
+    # the number of waits for the rate limit by this processor, and seconds waited
+    rate_limit_waits = (0, 0.0)
+
+    # Cache of GET responses — shared by all processors in a run
+    _response_cache = None
+
+    # Classic API name-to-ID indexes, keyed by index directory and TTL, and the
+    # indexes already rebuilt in this run when a refresh is requested
+    _name_indexes = {}
+    _name_indexes_refreshed = set()
+
+    # the token returned by current_token(), and the auth() arguments to renew it
+    token = None
+    token_checked = 0
+    token_auth_args = None
+    _token_lock = threading.Lock()
+
+    # Classic API subsets that did not hold the section they were expected to,
+    # keyed by instance, object type and subset name
+    _unavailable_subsets = set()
+
     def _get_registry(self, jamf_url):
         """Return the shared JamfSchemaRegistry, creating it on first use.
 
@@ -498,7 +597,9 @@ class JamfUploaderBase(Processor):
 
                                 now_datetime = datetime.now(timezone.utc)
 
-                                if expires_datetime > now_datetime:
+                                if expires_datetime > now_datetime + timedelta(
+                                    seconds=TOKEN_EXPIRY_MARGIN
+                                ):
                                     self.output("Existing token is valid")
                                     token = data["token"]
                                 else:
@@ -1002,7 +1103,10 @@ class JamfUploaderBase(Processor):
                                     token_file_expiry_epoch, timezone.utc
                                 ).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
 
-                                if token_file_expiry_epoch > now_epoch:
+                                if (
+                                    token_file_expiry_epoch
+                                    > now_epoch + TOKEN_EXPIRY_MARGIN
+                                ):
                                     self.output(
                                         f"Existing token is valid ({token_file}) - "
                                         f"expires {token_file_expiry_epoch_human}"
@@ -1163,6 +1267,30 @@ class JamfUploaderBase(Processor):
         # return token and classic creds
         return token
 
+    def keep_token(self, token, auth_args=None):
+        """Keep a token for current_token(), with the auth() keyword arguments used
+        to renew it. A token supplied with BEARER_TOKEN cannot be renewed, so no
+        arguments are given for it."""
+        self.token = token
+        self.token_checked = time.monotonic()
+        self.token_auth_args = auth_args
+
+    def current_token(self):
+        """Return a bearer token for the rest of a long operation.
+
+        Every TOKEN_CHECK_INTERVAL seconds the token is checked with auth(), which
+        gets a new one if it is about to expire, rather than before every request.
+        A token that cannot be renewed is always returned as it is.
+        """
+        with self._token_lock:
+            if (
+                self.token_auth_args
+                and time.monotonic() - self.token_checked > TOKEN_CHECK_INTERVAL
+            ):
+                self.token = self.auth(**self.token_auth_args)[0]
+                self.token_checked = time.monotonic()
+            return self.token
+
     def auth(
         self,
         jamf_url,
@@ -1302,6 +1430,7 @@ class JamfUploaderBase(Processor):
         additional_curl_opts="",
         endpoint_type="",
         accept_header="",
+        use_cache=True,
     ):
         """
         Build a curl command based on request type (GET, POST, PUT, PATCH, DELETE).
@@ -1317,21 +1446,82 @@ class JamfUploaderBase(Processor):
         Subsequent requests to the same URL use the bearer token until it expires.
         Jamf Pro versions older than 10.35 use basic auth for all Classic API requests.
         The Jamf Platform API uses OAuth 2.0 for authentication.
+
+        GET responses from the Jamf APIs are cached for the rest of the run, and
+        any other request clears the cached responses for the same resource. Set
+        use_cache to False to send the request directly.
         """
+        resource = None
+        if use_cache and api_type != "none" and endpoint_type != "icon_get":
+            resource = resource_for_url(url)
+        if resource and resource[1] not in UNCACHED_RESOURCES:
+
+            def send():
+                return self.curl(
+                    api_type,
+                    request=request,
+                    url=url,
+                    token=token,
+                    enc_creds=enc_creds,
+                    data=data,
+                    additional_curl_opts=additional_curl_opts,
+                    endpoint_type=endpoint_type,
+                    accept_header=accept_header,
+                    use_cache=False,
+                )
+
+            if request == "GET":
+                cache = self.get_response_cache()
+                if cache is not None:
+                    # the cache is shared by every processor in the run, so the
+                    # key holds the credentials used as well as the format asked for
+                    credentials = hashlib.sha256(
+                        f"{token}:{enc_creds}".encode("utf-8")
+                    ).hexdigest()
+                    key = (
+                        api_type,
+                        url,
+                        self.accept_type(endpoint_type, accept_header),
+                        credentials,
+                    )
+                    return self.cached_get(cache, key, resource, send)
+            elif request in ("POST", "PUT", "PATCH", "DELETE"):
+                r = None
+                try:
+                    r = send()
+                    return r
+                finally:
+                    self.invalidate_cached_responses(url)
+                    self.update_name_index(url, api_type, request, data, r)
+
         tmp_dir = self.make_tmp_dir(jamf_url=url)
-        headers_file = os.path.join(tmp_dir, "curl_headers_from_jamf_upload.txt")
-        output_file = self.init_temp_file(url, suffix=".txt")
+        # requests sent from worker threads each need their own headers file
+        if threading.current_thread() is threading.main_thread():
+            headers_name = "curl_headers_from_jamf_upload.txt"
+        else:
+            headers_name = f"curl_headers_from_jamf_upload_{threading.get_ident()}.txt"
+        headers_file = os.path.join(tmp_dir, headers_name)
         cookie_jar = os.path.join(tmp_dir, "curl_cookies_from_jamf_upload.txt")
 
+        # Responses are captured in memory unless the 'file' response mode is in
+        # use with the curl engine. Binary downloads are always written to a file
+        # because the caller needs a path to it.
+        http_engine = self.http_engine()
+        download_to_file = (
+            endpoint_type == "icon_get" or "ics.services.jamfcloud.com" in url
+        )
+        in_memory = not download_to_file and (
+            http_engine == "pooled" or self.http_response_mode() == "memory"
+        )
+        output_file = None
+        if not in_memory:
+            output_file = self.init_temp_file(url, suffix=".txt")
+
         # build the curl command based on supplied endpoint_types
         if url:
-            curl_cmd = [
-                "/usr/bin/curl",
-                "--location",
-                "--dump-header",
-                headers_file,
-                url,
-            ]
+            curl_cmd = ["/usr/bin/curl", "--location", url]
+            if not in_memory:
+                curl_cmd.extend(["--dump-header", headers_file])
         else:
             raise ProcessorError("No URL supplied")
 
@@ -1404,7 +1594,7 @@ class JamfUploaderBase(Processor):
             # some endpoints (For example the 'patchsoftwaretitle' endpoint)
             # do not return complete json, so we have to get the xml instead.
             elif request == "GET" or request == "DELETE":
-                if endpoint_type == "patch_software_title" or accept_header == "xml":
+                if self.accept_type(endpoint_type, accept_header) == "xml":
                     curl_cmd.extend(["--header", "Accept: application/xml"])
                 else:
                     curl_cmd.extend(["--header", "Accept: application/json"])
@@ -1526,8 +1716,9 @@ class JamfUploaderBase(Processor):
                 )
 
         # direct output to a file
-        curl_cmd.extend(["--output", output_file])
-        self.output(f"Output file is: {output_file}", verbose_level=3)
+        if output_file:
+            curl_cmd.extend(["--output", output_file])
+            self.output(f"Output file is: {output_file}", verbose_level=3)
 
         # write session for jamf API requests
         if "/api/" in url or "/uapi/" in url or "JSSResource" in url:
@@ -1571,6 +1762,20 @@ class JamfUploaderBase(Processor):
 
         self.output(f"curl command: {' '.join(formatted_cmd)}", verbose_level=3)
 
+        # wait for our turn if a client-side rate limit applies to this instance
+        if "/api/" in url or "/uapi/" in url or "JSSResource" in url:
+            self.wait_for_rate_limit(url)
+
+        # send the request in-process if the pooled engine is selected
+        if http_engine == "pooled":
+            r = self.pooled_request(curl_cmd, url, output_file)
+            if r is not None:
+                return r
+
+        # capture the response from curl's stdout rather than via files
+        if in_memory:
+            return self.curl_in_memory(curl_cmd)
+
         # now subprocess the curl command and build the r tuple which contains the
         # headers, status code and outputted data
         subprocess.check_output(curl_cmd)
@@ -1595,30 +1800,423 @@ class JamfUploaderBase(Processor):
                         r.output = output_file
                     else:
                         with open(output_file, "rb") as file:
-                            try:
-                                file.seek(0)  # Reset file pointer to beginning
-                                r.output = json.load(file)
-                            except (json.JSONDecodeError, ValueError):
-                                file.seek(0)  # Reset file pointer to beginning
-                                r.output = file.read()
+                            r.output = self.parse_response_body(file)
                 else:
                     self.output(
                         f"No output from request ({output_file} not found or empty)"
                     )
         return r()
 
-    def status_check(self, r, endpoint_type, object_name, request):
-        """Return a message dependent on the HTTP response"""
+    def http_setting(self, key, default):
+        """Return an HTTP setting from the AutoPkg env or the environment.
+
+        A key such as 'http_engine' can be set in the recipe/preferences, or with
+        the equivalent JAMFUPLOAD_HTTP_ENGINE environment variable.
+        """
+        value = self.env.get(key) or os.environ.get(f"JAMFUPLOAD_{key.upper()}")
+        return value if value else default
+
+    def http_engine(self):
+        """Return the HTTP engine to use for API requests.
+
+        'curl' (the default) runs /usr/bin/curl for each request. 'pooled' sends
+        requests in-process over persistent keep-alive connections.
+        """
+        engine = str(self.http_setting("http_engine", "curl")).lower()
+        if engine not in ("curl", "pooled"):
+            raise ProcessorError(f"ERROR: Unknown HTTP engine {engine}")
+        return engine
+
+    def http_response_mode(self):
+        """Return how curl responses are captured.
+
+        'file' (the default) writes each response body and its headers to files
+        in the tmp directory. 'memory' captures them in memory and parses them
+        directly. The pooled HTTP engine always captures responses in memory.
+        """
+        mode = str(self.http_setting("http_response_mode", "file")).lower()
+        if mode not in ("file", "memory"):
+            raise ProcessorError(f"ERROR: Unknown HTTP response mode {mode}")
+        return mode
+
+    def http_spill_threshold(self):
+        """Return the size (bytes) above which an in-memory response spills to disk."""
+        try:
+            return int(self.http_setting("http_spill_threshold", SPILL_THRESHOLD))
+        except ValueError as e:
+            raise ProcessorError("ERROR: http_spill_threshold must be a number") from e
+
+    def get_rate_limiter(self, url):
+        """Return the rate limiter for a Jamf Pro instance, or None if not limited.
+
+        The limit is set with 'api_rate_limit' (requests per second, default 0 for
+        no limit) and 'api_rate_burst' (requests that may be sent at once, default
+        the same as api_rate_limit), or the JAMFUPLOAD_API_RATE_LIMIT and
+        JAMFUPLOAD_API_RATE_BURST environment variables. The bucket is shared by
+        all processes on this machine that use the same instance.
+        """
+        try:
+            rate = float(self.http_setting("api_rate_limit", 0))
+            burst = float(self.http_setting("api_rate_burst", 0))
+        except ValueError as e:
+            raise ProcessorError(
+                "ERROR: api_rate_limit and api_rate_burst must be numbers"
+            ) from e
+        if rate <= 0:
+            return None
+        instance_id = self.get_netloc(url)
+        key = (instance_id, rate, burst)
+        if key not in JamfUploaderBase._rate_limiters:
+            JamfUploaderBase._rate_limiters[key] = JamfRateLimiter(
+                self.make_url_specific_dir(url),
+                rate,
+                burst,
+                log_fn=lambda msg, verbose_level=2: self.output(
+                    msg, verbose_level=verbose_level
+                ),
+            )
+        return JamfUploaderBase._rate_limiters[key]
+
+    def wait_for_rate_limit(self, url):
+        """Wait until the client-side rate limit allows another request to url.
+
+        The number of waits and the time spent waiting are added to
+        'api_rate_limit_waits' and 'api_rate_limit_seconds_waited' in the
+        environment, and the processor's own totals are reported by process().
+        """
+        limiter = self.get_rate_limiter(url)
+        if limiter is None:
+            return
+        waited = limiter.acquire()
+        if waited > 0:
+            with JamfUploaderBase._rate_limit_lock:
+                waits, seconds = self.rate_limit_waits
+                self.rate_limit_waits = (waits + 1, seconds + waited)
+                self.env["api_rate_limit_waits"] = (
+                    self.env.get("api_rate_limit_waits", 0) + 1
+                )
+                self.env["api_rate_limit_seconds_waited"] = round(
+                    self.env.get("api_rate_limit_seconds_waited", 0.0) + waited, 2
+                )
+            self.output(
+                f"Rate limit: waited {waited:.2f}s "
+                f"({limiter.stats['seconds_waited']:.1f}s over "
+                f"{limiter.stats['throttled']} of {limiter.stats['requests']} requests "
+                "in this run)",
+                verbose_level=2,
+            )
+
+    def report_rate_limit_waits(self):
+        """Report the time this processor spent waiting for the client-side rate
+        limit, if any."""
+        waits, seconds = self.rate_limit_waits
+        if waits:
+            self.output(
+                f"Rate limit: waited {seconds:.1f}s before {waits} requests",
+                verbose_level=1,
+            )
+
+    def process(self):
+        """Run the processor, then report any time spent waiting for the
+        client-side rate limit."""
+        try:
+            return super().process()
+        finally:
+            self.report_rate_limit_waits()
+
+    def get_response_cache(self):
+        """Return the shared GET response cache, or None if caching is turned off.
+
+        The number of responses kept is set with 'http_get_cache_size' (default
+        256, 0 to turn caching off) or the JAMFUPLOAD_HTTP_GET_CACHE_SIZE
+        environment variable. The least recently used responses are dropped first.
+        """
+        try:
+            size = int(self.http_setting("http_get_cache_size", DEFAULT_MAX_ENTRIES))
+        except ValueError as e:
+            raise ProcessorError("ERROR: http_get_cache_size must be a number") from e
+        if size <= 0:
+            return None
+        if JamfUploaderBase._response_cache is None:
+            JamfUploaderBase._response_cache = JamfResponseCache(
+                size,
+                log_fn=lambda msg, verbose_level=2: self.output(
+                    msg, verbose_level=verbose_level
+                ),
+            )
+        JamfUploaderBase._response_cache.max_entries = size
+        return JamfUploaderBase._response_cache
+
+    def accept_type(self, endpoint_type, accept_header):
+        """Return the format asked for in the Accept header of a GET or DELETE
+        request: 'xml' for patch software titles or if accept_header is 'xml',
+        otherwise 'json'."""
+        if endpoint_type == "patch_software_title" or accept_header == "xml":
+            return "xml"
+        return "json"
+
+    def cached_get(self, cache, key, resource, send):
+        """Return a GET response from the cache, sending the request if needed.
+
+        Only successful responses are kept. Identical requests made at the same
+        time from several threads are sent once.
+        """
+
+        def fetch():
+            # file-mode responses hold their fields on the class, so read them
+            # by name rather than unpacking the tuple
+            r = send()
+            return r.headers, r.status_code, r.output
+
+        hits = cache.stats["hits"] + cache.stats["coalesced"]
+        headers, status_code, output = cache.fetch(
+            key,
+            resource,
+            fetch,
+            cacheable_fn=lambda value: value[1] is not None
+            and 200 <= int(value[1]) < 300,
+        )
+        if cache.stats["hits"] + cache.stats["coalesced"] > hits:
+            self.output(
+                f"Using cached response for {key[1]} "
+                f"({hits + 1} hits, {cache.stats['misses']} misses in this run)",
+                verbose_level=2,
+            )
+        r = namedtuple(
+            "r", ["headers", "status_code", "output"], defaults=(None, None, None)
+        )
+        return r(headers, status_code, output)
+
+    def invalidate_cached_responses(self, url):
+        """Clear any cached GET responses for the resource that url belongs to."""
+        resource = resource_for_url(url)
+        if resource and JamfUploaderBase._response_cache is not None:
+            JamfUploaderBase._response_cache.invalidate(resource)
+
+    def get_name_index(self, url):
+        """Return the Classic API name index for the instance that url belongs to,
+        or None if the index is turned off.
+
+        Indexes are kept in /tmp/jamf_upload/<instance>/name_index, and are used for
+        'name_index_ttl' seconds after they are built (default 600, 0 to turn the
+        index off) or the JAMFUPLOAD_NAME_INDEX_TTL environment variable.
+        """
+        try:
+            ttl = float(self.http_setting("name_index_ttl", DEFAULT_INDEX_TTL))
+        except ValueError as e:
+            raise ProcessorError("ERROR: name_index_ttl must be a number") from e
+        if ttl <= 0:
+            return None
+        index_dir = os.path.join(
+            self.make_url_specific_dir(url),
+            "name_index",
+            tenant_for_url(url) or "default",
+        )
+        key = (index_dir, ttl)
+        if key not in JamfUploaderBase._name_indexes:
+            JamfUploaderBase._name_indexes[key] = JamfNameIndex(
+                index_dir,
+                ttl,
+                log_fn=lambda msg, verbose_level=2: self.output(
+                    msg, verbose_level=verbose_level
+                ),
+            )
+        return JamfUploaderBase._name_indexes[key]
+
+    def refresh_name_index(self, index, resource):
+        """Discard a stored name index the first time it is used in this run if
+        'name_index_refresh' (or JAMFUPLOAD_NAME_INDEX_REFRESH) is set, so that it
+        is rebuilt from the server."""
+        if not self.to_bool(self.http_setting("name_index_refresh", False)):
+            return
+        key = (index.index_dir, resource)
+        if key not in JamfUploaderBase._name_indexes_refreshed:
+            JamfUploaderBase._name_indexes_refreshed.add(key)
+            index.invalidate(resource)
+            self.output(f"Rebuilding name index for '{resource}'", verbose_level=2)
+
+    def update_name_index(self, url, api_type, request, data, r):
+        """Bring the name index up to date after a write to url.
+
+        Classic API writes to an object ID update the index in place: a DELETE
+        removes the object, and a POST or PUT records the name that was sent
+        against the ID in the URL or the response. Any other write to the same
+        objects, or a write whose outcome is not known, discards the index.
+        """
+        resource = resource_for_url(url)
+        if not resource:
+            return
+        index = self.get_name_index(url)
+        if index is None:
+            return
+        resource = resource[1]
+        match = re.search(r"/id/(\d+)/?$", urlparse(url).path)
+        if r is not None and r.status_code is not None and int(r.status_code) >= 300:
+            # nothing changed, but a failed write to an ID may mean that the index
+            # is out of date, for example if the object was deleted or renamed
+            # outside JamfUploader. An object that was not found is dropped, and
+            # any other failure discards the index
+            if int(r.status_code) == 404 and match and api_type == "classic":
+                index.remove_id(resource, int(match.group(1)))
+            elif int(r.status_code) >= 400 and match:
+                index.invalidate(resource)
+            return
+
+        if api_type != "classic" or r is None or r.status_code is None or not match:
+            index.invalidate(resource)
+            return
+        object_id = int(match.group(1))
         if request == "DELETE":
-            action = "deletion"
+            index.remove_id(resource, object_id)
+            return
+
+        # find the name that was sent, and the ID of a new object
+        name = None
+        if data and os.path.isfile(data):
+            try:
+                root = ET.parse(data).getroot()
+                name = root.findtext("general/name") or root.findtext("name")
+            except ET.ParseError:
+                pass
+        if object_id == 0:
+            output = r.output
+            if isinstance(output, (bytes, bytearray)):
+                output = output.decode("utf-8", errors="replace")
+            id_match = re.search(r"<id>(\d+)</id>", str(output))
+            object_id = int(id_match.group(1)) if id_match else 0
+        if name and object_id:
+            index.set_name(resource, object_id, name)
+        elif request == "POST":
+            index.invalidate(resource)
+
+    def parse_response_body(self, file):
+        """Return a response body parsed as JSON, or the raw bytes if it is not JSON."""
+        try:
+            file.seek(0)  # Reset file pointer to beginning
+            return json.load(file)
+        except (json.JSONDecodeError, ValueError):
+            file.seek(0)  # Reset file pointer to beginning
+            return file.read()
+
+    def curl_in_memory(self, curl_cmd):
+        """Run a curl command, capturing the response body, status code and any
+        Retry-After header from stdout.
+
+        The body is buffered in memory up to http_spill_threshold bytes, above
+        which it spills to an anonymous temporary file that is removed on close.
+        """
+        curl_cmd = curl_cmd + ["--write-out", "\n%header{retry-after}\n%{http_code}"]
+        r = namedtuple(
+            "r", ["headers", "status_code", "output"], defaults=(None, None, None)
+        )
+        with tempfile.SpooledTemporaryFile(
+            max_size=self.http_spill_threshold(), dir=self.env.get("jamfupload_tmp_dir")
+        ) as body:
+            with subprocess.Popen(curl_cmd, stdout=subprocess.PIPE) as proc:
+                shutil.copyfileobj(proc.stdout, body, BUFFER_SIZE)
+            if proc.returncode:
+                raise subprocess.CalledProcessError(proc.returncode, curl_cmd)
+
+            # --write-out appends the Retry-After header and the status code as
+            # the last two lines (curl before 7.84 leaves the header unexpanded)
+            size = body.tell()
+            body.seek(max(0, size - 128))
+            tail = body.read()
+            trailer_start = tail.rfind(b"\n", 0, tail.rfind(b"\n"))
+            body_size = size - len(tail) + trailer_start
+            retry_after, status_code = tail[trailer_start + 1 :].split(b"\n")
+            status_code = int(status_code or 0)
+            body.truncate(body_size)
+
+            headers = None
+            if retry_after.strip() and not retry_after.startswith(b"%"):
+                headers = [f"Retry-After: {retry_after.decode('utf-8').strip()}"]
+            if not status_code:
+                return r(None, None, None)
+            self.output(f"HTTP response: {status_code}", verbose_level=3)
+            output = None
+            if status_code < 400:
+                if body_size > 0:
+                    output = self.parse_response_body(body)
+                else:
+                    self.output("No output from request (empty response body)")
+        return r(headers, status_code, output)
+
+    def get_http_transport(self):
+        """Return the process-wide JamfHTTPTransport, creating it on first use.
+
+        The transport is stored on the class so that all processors in an
+        AutoPkg run share the same connection pool and session cookies.
+        """
+        if JamfUploaderBase._http_transport is None:
+            JamfUploaderBase._http_transport = JamfHTTPTransport(
+                log_fn=lambda msg, verbose_level=2: self.output(
+                    msg, verbose_level=verbose_level
+                ),
+            )
+        return JamfUploaderBase._http_transport
+
+    def pooled_request(self, curl_cmd, url, output_file=None):
+        """Send the request described by a curl command through the connection pool.
+
+        The response body is written to output_file if one is given (binary
+        downloads), otherwise it is parsed in memory.
+
+        Returns the same r tuple as curl(), or None if the command contains
+        options that cannot be sent in-process (for example from custom_curl_opts),
+        in which case the caller falls back to running curl.
+        """
+        try:
+            request_kwargs = request_from_curl_args(curl_cmd[1:])
+        except UnsupportedCurlOption as e:
+            self.output(
+                f"Unsupported option for pooled HTTP engine: {e} - using curl",
+                verbose_level=2,
+            )
+            return None
+
+        try:
+            result = self.get_http_transport().request(
+                spool_threshold=self.http_spill_threshold(), **request_kwargs
+            )
+        except TransportError as e:
+            raise ProcessorError(f"ERROR: Request to {url} failed: {e}") from e
+
+        r = namedtuple(
+            "r", ["headers", "status_code", "output"], defaults=(None, None, None)
+        )
+        output = None
+        self.output(f"HTTP response: {result.status_code}", verbose_level=3)
+        with result.body as body:
+            body_size = body.seek(0, os.SEEK_END)
+            if result.status_code < 400:
+                if body_size > 0:
+                    if output_file:
+                        body.seek(0)
+                        with open(output_file, "wb") as file:
+                            shutil.copyfileobj(body, file, BUFFER_SIZE)
+                        output = output_file
+                    else:
+                        output = self.parse_response_body(body)
+                else:
+                    self.output("No output from request (empty response body)")
+        return r(result.header_lines, result.status_code, output)
+
+    def http_action(self, request):
+        """Return the word used in messages for an HTTP method"""
+        if request == "DELETE":
+            return "deletion"
         elif request == "PUT" or request == "PATCH":
-            action = "update"
+            return "update"
         elif request == "POST":
-            action = "upload"
+            return "upload"
         elif request == "GET":
-            action = "download"
-        else:
-            action = "unknown"
+            return "download"
+        return "unknown"
+
+    def status_check(self, r, endpoint_type, object_name, request):
+        """Return a message dependent on the HTTP response"""
+        action = self.http_action(request)
 
         self.output(f"HTTP response: {r.status_code}", verbose_level=2)
         if r.status_code < 400:
@@ -1664,6 +2262,137 @@ class JamfUploaderBase(Processor):
                         f"status code {r.status_code}"
                     )
 
+    def is_retryable(self, r):
+        """Return True if a response indicates a transient failure worth retrying"""
+        return r.status_code is None or r.status_code in RETRYABLE_STATUS_CODES
+
+    def is_connection_error(self, error):
+        """Return True if an exception raised by curl() means the server could not
+        be reached, rather than that the request itself was bad"""
+        if isinstance(error, subprocess.CalledProcessError):
+            return error.returncode in CURL_CONNECTION_ERRORS
+        # the pooled HTTP engine raises ProcessorError from a TransportError
+        return isinstance(error.__cause__, TransportError)
+
+    def retry_after(self, r):
+        """Return the number of seconds requested by a Retry-After header, or None"""
+        value = None
+        for header in r.headers or []:
+            name, _, header_value = header.partition(":")
+            if name.strip().lower() == "retry-after":
+                value = header_value.strip()
+        if not value:
+            return None
+        if value.isdigit():
+            return int(value)
+        # Retry-After may also be an HTTP date
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def retry_delay(self, attempt, sleep_time=None, retry_after=None):
+        """Return the number of seconds to wait before retrying after `attempt` tries.
+
+        A Retry-After value from the server is honoured. Otherwise the delay doubles
+        from retry_base_delay (or sleep_time, if larger) with each attempt, up to
+        retry_max_delay, with random jitter so that parallel runs do not retry in step.
+        """
+        if retry_after is not None:
+            return retry_after
+        try:
+            base = max(
+                float(self.http_setting("retry_base_delay", RETRY_BASE_DELAY)),
+                float(sleep_time or 0),
+            )
+            cap = max(float(self.http_setting("retry_max_delay", RETRY_MAX_DELAY)), base)
+        except ValueError as e:
+            raise ProcessorError(
+                "ERROR: retry_base_delay and retry_max_delay must be numbers"
+            ) from e
+        delay = min(cap, base * 2 ** (attempt - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def send_with_retry(
+        self,
+        send_fn,
+        endpoint_type,
+        object_name,
+        request,
+        max_tries=5,
+        sleep_time=None,
+        success_fn=None,
+        raise_on_failure=True,
+    ):
+        """Send a request until it succeeds, retrying only transient failures.
+
+        send_fn takes no arguments and returns the r tuple from curl(). The response
+        is checked with status_check(), or with success_fn(r) if given. Rate limiting
+        (429), gateway errors (502, 503, 504) and connection failures are retried up
+        to max_tries times; any other failure is not retried, since sending the same
+        request again will not change the result.
+
+        Returns the successful response. On failure a ProcessorError is raised, or
+        the last response is returned if raise_on_failure is False.
+        """
+        action = self.http_action(request)
+        count = 0
+        while True:
+            count += 1
+            self.output(f"{endpoint_type} {action} attempt {count}", verbose_level=2)
+            try:
+                r = send_fn()
+            except (subprocess.CalledProcessError, ProcessorError) as e:
+                if not self.is_connection_error(e):
+                    raise
+                if count >= max_tries:
+                    raise ProcessorError(
+                        f"ERROR: {endpoint_type} {action} failed - could not connect "
+                        f"after {max_tries} attempts"
+                    ) from e
+                delay = self.retry_delay(count, sleep_time)
+                self.output(
+                    f"WARNING: {endpoint_type} {action} could not connect - "
+                    f"retrying in {delay:.1f} seconds"
+                )
+                sleep(delay)
+                continue
+
+            # transient failures are retried before status_check() sees them, as it
+            # raises immediately on an error page
+            if self.is_retryable(r) and count < max_tries:
+                delay = self.retry_delay(count, sleep_time, self.retry_after(r))
+                self.output(
+                    f"{endpoint_type} {action} returned HTTP {r.status_code} - "
+                    f"retrying in {delay:.1f} seconds"
+                )
+                sleep(delay)
+                continue
+
+            if r.status_code is not None:
+                if success_fn:
+                    succeeded = success_fn(r)
+                else:
+                    succeeded = (
+                        self.status_check(r, endpoint_type, object_name, request)
+                        == "break"
+                    )
+                if succeeded:
+                    return r
+
+            if self.is_retryable(r):
+                self.output(
+                    f"WARNING: {endpoint_type} {action} did not succeed after "
+                    f"{max_tries} attempts"
+                )
+            self.output(f"\nHTTP {request} Response Code: {r.status_code}")
+            if raise_on_failure:
+                raise ProcessorError(f"ERROR: {endpoint_type} {action} failed ")
+            return r
+
     def get_jamf_pro_version(self, jamf_url, token, tenant_id=""):
         """get the Jamf Pro version so that we can figure out which auth method to use for the
         Classic API"""
@@ -1699,6 +2428,41 @@ class JamfUploaderBase(Processor):
         if api_type == "classic":
             # do XML stuff
             url = jamf_url + "/" + self.api_endpoints(object_type, tenant_id=tenant_id)
+
+            # use the name index if the object is in it. Accounts are not indexed,
+            # as users and groups share one list
+            index = None
+            resource = resource_for_url(url)
+            if resource and object_type not in ("account_user", "account_group"):
+                index = self.get_name_index(url)
+                resource = resource[1]
+            if index:
+                self.refresh_name_index(index, resource)
+                object_id = index.lookup(resource, object_name)
+                if object_id:
+                    self.output(
+                        f"Object ID for '{object_name}' is: {object_id} (from name index)",
+                        verbose_level=2,
+                    )
+                    return object_id
+
+            # then ask for the object by name, which returns one object rather
+            # than the whole list, where the resource has a /name/ path. The list
+            # is only needed if that is not conclusive, for example if the name
+            # contains a slash
+            if object_type not in (
+                "account_user",
+                "account_group",
+            ) and self.classic_has_name_path(jamf_url, object_type):
+                object_id = self.get_classic_object_id_by_name(url, object_name, token)
+                if object_id is not None:
+                    if object_id and index:
+                        index.set_name(resource, object_id, object_name)
+                    self.output(
+                        f"Object ID for '{object_name}' is: {object_id}", verbose_level=2
+                    )
+                    return object_id
+
             r = self.curl(api_type=api_type, request="GET", url=url, token=token)
 
             if r.status_code == 200:
@@ -1718,6 +2482,8 @@ class JamfUploaderBase(Processor):
                     object_list,
                     verbose_level=4,
                 )
+                if index:
+                    index.replace(resource, object_list)
                 object_id = 0
                 for obj in object_list:
                     self.output(
@@ -1769,6 +2535,125 @@ class JamfUploaderBase(Processor):
                     f"status code {r.status_code}"
                 )
 
+    def rsql_quote(self, value):
+        """Return a value quoted for use in an RSQL filter"""
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        return f'"{escaped}"'
+
+    def rsql_in_chunks(self, url, filter_name, values):
+        """Yield lists of values whose filter=<filter_name>=in=(...) query keeps the
+        whole URL within MAX_FILTER_URL_LENGTH. A value that is too long on its own
+        is sent alone."""
+        base_length = len(url) + len(quote(f"&filter={filter_name}=in=()"))
+        chunk = []
+        length = base_length
+        for value in values:
+            value_length = len(quote(self.rsql_quote(value), safe="")) + len("%2C")
+            if chunk and length + value_length > MAX_FILTER_URL_LENGTH:
+                yield chunk
+                chunk = []
+                length = base_length
+            chunk.append(value)
+            length += value_length
+        if chunk:
+            yield chunk
+
+    def get_api_object_ids_from_names(
+        self,
+        jamf_url,
+        object_type,
+        object_names,
+        token,
+        tenant_id="",
+        filter_name="name",
+        id_key="id",
+    ):
+        """Return a dict of the IDs of several objects of one type, keyed by name.
+
+        Jamf Pro API objects are looked up a chunk of names at a time with an RSQL
+        'in' filter, so that many names take a few requests. Names must match
+        exactly. Classic API objects are looked up one by one with
+        get_api_object_id_from_name(). Names that are not found map to 0.
+        """
+        names = list(dict.fromkeys(name for name in object_names if name))
+        object_ids = dict.fromkeys(names, 0)
+        if not names:
+            return object_ids
+
+        api_type = self.api_type(object_type)
+        if api_type == "classic":
+            for name in names:
+                object_ids[name] = self.get_api_object_id_from_name(
+                    jamf_url, object_type, name, token, tenant_id=tenant_id
+                )
+            return object_ids
+
+        url = jamf_url + "/" + self.api_endpoints(object_type, tenant_id=tenant_id)
+        url = f"{url}?page=0&page-size={MAX_PAGE_SIZE}&sort={id_key}"
+        requests = 0
+        for chunk in self.rsql_in_chunks(url, filter_name, names):
+            rsql = f"{filter_name}=in=({','.join(self.rsql_quote(n) for n in chunk)})"
+            r = self.curl(
+                api_type=api_type,
+                request="GET",
+                url=f"{url}&filter={quote(rsql, safe='')}",
+                token=token,
+            )
+            requests += 1
+            if r.status_code != 200:
+                raise ProcessorError(
+                    f"ERROR: Unable to get {object_type} list from server - "
+                    f"status code {r.status_code}"
+                )
+            for obj in r.output["results"]:
+                name = obj.get(filter_name)
+                # the first match is kept, as in get_api_object_id_from_name()
+                if name in object_ids and not object_ids[name]:
+                    object_ids[name] = obj[id_key]
+
+        found = sum(1 for object_id in object_ids.values() if object_id)
+        self.output(
+            f"Found {found} of {len(names)} {object_type} objects in {requests} requests",
+            verbose_level=2,
+        )
+        return object_ids
+
+    def get_classic_object_id_by_name(self, url, object_name, token):
+        """Return the ID of a Classic API object using its /name/ endpoint, 0 if
+        the server reports that there is no object with that name, or None if the
+        lookup was not conclusive.
+
+        url is the list endpoint for the object type, which must have a /name/
+        path (see classic_has_name_path()). Where the objects have a 'general'
+        section, only that subset is requested. Classic API name lookups ignore
+        case, so a 404 is trusted to mean that the object does not exist.
+        """
+        # an encoded slash is not accepted in the path
+        if not object_name or "/" in object_name:
+            return None
+        lookup_url = f"{url}/name/{quote(object_name, safe='')}"
+        if url.rstrip("/").rsplit("/", 1)[-1] in CLASSIC_GENERAL_SUBSET_RESOURCES:
+            lookup_url += "/subset/general"
+        r = self.curl(api_type="classic", request="GET", url=lookup_url, token=token)
+        if r.status_code == 404:
+            self.output(f"'{object_name}' not found by name", verbose_level=3)
+            return 0
+        if r.status_code != 200 or not isinstance(r.output, dict) or not r.output:
+            self.output(
+                f"'{object_name}' not found by name (HTTP {r.status_code})",
+                verbose_level=3,
+            )
+            return None
+        obj = next(iter(r.output.values()))
+        if not isinstance(obj, dict):
+            return None
+        general = obj.get("general", obj)
+        if not isinstance(general, dict) or not general.get("id"):
+            return None
+        if "name" in general and fold(general["name"]) != fold(object_name):
+            return None
+        return general["id"]
+
     def substitute_assignable_keys(self, data, xml_escape=False):
         """substitutes any key in the inputted text using the %MY_KEY% nomenclature"""
         # if JSS_INVENTORY_NAME is not given, make it equivalent to %NAME%.app
@@ -1964,6 +2849,163 @@ class JamfUploaderBase(Processor):
                         return matched_filepath
         raise ProcessorError(f"File '{filename}' not found")
 
+    def api_page_size(self):
+        """Return the number of objects to request per page from the Jamf Pro API.
+
+        Set with 'api_page_size' (default 500, at most 2000) or the
+        JAMFUPLOAD_API_PAGE_SIZE environment variable.
+        """
+        try:
+            page_size = int(self.http_setting("api_page_size", DEFAULT_PAGE_SIZE))
+        except ValueError as e:
+            raise ProcessorError("ERROR: api_page_size must be a number") from e
+        return min(max(page_size, 1), MAX_PAGE_SIZE)
+
+    def api_page_workers(self):
+        """Return the number of pages to fetch at once from the Jamf Pro API.
+
+        Set with 'api_page_workers' (default 4, 1 to fetch pages one at a time)
+        or the JAMFUPLOAD_API_PAGE_WORKERS environment variable.
+        """
+        try:
+            workers = int(self.http_setting("api_page_workers", DEFAULT_PAGE_WORKERS))
+        except ValueError as e:
+            raise ProcessorError("ERROR: api_page_workers must be a number") from e
+        return max(workers, 1)
+
+    def fetch_page(
+        self,
+        api_type,
+        url,
+        token,
+        object_type,
+        namekey,
+        page,
+        page_size,
+        use_cache=True,
+        rsql_filter="",
+        sort="",
+    ):
+        """Get one page of a Jamf Pro API list.
+
+        The list is sorted by sort if it is given, in the form of the API's sort
+        parameter, e.g. "id:desc", or else by namekey in ascending order. If
+        rsql_filter is given, only the objects matching it are listed. Rate limiting
+        and gateway errors are retried. Returns the r tuple from curl().
+        """
+        url_filter = f"?page={page}&page-size={page_size}"
+        if sort:
+            url_filter += f"&sort={sort}"
+        else:
+            url_filter += f"&sort={namekey}&sort-order=asc"
+        if rsql_filter:
+            url_filter += f"&filter={quote(rsql_filter)}"
+        self.output(f"Getting page {page} of objects", verbose_level=2)
+        return self.send_with_retry(
+            lambda: self.curl(
+                api_type=api_type,
+                request="GET",
+                url=f"{url}{url_filter}",
+                token=token,
+                use_cache=use_cache,
+            ),
+            object_type,
+            "",
+            "GET",
+            success_fn=lambda r: r.status_code == 200,
+            raise_on_failure=False,
+        )
+
+    def page_objects(self, r, object_type, domain):
+        """Return the objects in a page of a Jamf Pro API list"""
+        if r.status_code != 200:
+            raise ProcessorError(
+                f"ERROR: Unable to get list of {object_type} from {domain}"
+            )
+        self.output(f"Output:\n{r.output}", verbose_level=4)
+        # parse the output to get the list of objects
+        if object_type == "managed_software_updates_available_updates":
+            objects = r.output["availableUpdates"]
+        elif object_type == "managed_software_updates_plans_events":
+            objects = r.output["events"]
+        else:
+            objects = r.output["results"]
+        # any null values in the output should be converted to empty strings
+        # this is to avoid problems outputting to XML later
+        for obj in objects:
+            for key, value in obj.items():
+                if value is None:
+                    obj[key] = ""
+        return objects
+
+    def iter_pages(
+        self,
+        api_type,
+        url,
+        token,
+        object_type,
+        namekey,
+        domain,
+        total_objects,
+        page_size,
+        first_count,
+        use_cache=True,
+        rsql_filter="",
+        sort="",
+    ):
+        """Yield the objects in each page of a Jamf Pro API list after the first.
+
+        total_objects is the totalCount given with page 0, and first_count the
+        number of objects that page held. Pages are fetched api_page_workers at a
+        time but yielded in order, and no more than that number are held waiting
+        to be yielded.
+        """
+        if first_count >= total_objects:
+            return
+        # the server may return fewer objects per page than we asked for
+        if 0 < first_count < page_size:
+            page_size = first_count
+        pages = range(1, (total_objects + page_size - 1) // page_size)
+
+        def get_page(page):
+            return self.fetch_page(
+                api_type,
+                url,
+                token,
+                object_type,
+                namekey,
+                page,
+                page_size,
+                use_cache,
+                rsql_filter,
+                sort,
+            )
+
+        workers = min(self.api_page_workers(), len(pages))
+        if workers <= 1:
+            for page in pages:
+                yield self.page_objects(get_page(page), object_type, domain)
+            return
+
+        self.output(
+            f"Getting {len(pages)} more pages, {workers} at a time", verbose_level=2
+        )
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            try:
+                for page in pages:
+                    pending.append(executor.submit(get_page, page))
+                    if len(pending) >= workers:
+                        r = pending.popleft().result()
+                        yield self.page_objects(r, object_type, domain)
+                while pending:
+                    r = pending.popleft().result()
+                    yield self.page_objects(r, object_type, domain)
+            finally:
+                # the caller may stop early
+                for future in pending:
+                    future.cancel()
+
     def paginated_get(
         self,
         api_type,
@@ -1974,57 +3016,130 @@ class JamfUploaderBase(Processor):
         domain,
     ):
         """get a list of all objects of a particular type, handling pagination if needed.
-        For JPAPI endpoints only, as Classic API endpoints do not paginate."""
+        For JPAPI endpoints only, as Classic API endpoints do not paginate.
 
-        url_filter = "?page=0&page-size=1"
-        r = self.curl(
-            api_type=api_type, request="GET", url=f"{url}{url_filter}", token=token
-        )
-        self.output(f"Output:\n{r.output}", verbose_level=4)
+        The first page gives the total number of objects. The remaining pages are
+        then fetched api_page_workers at a time. Pages are paced by the client-side
+        rate limit if one is set (see get_rate_limiter()), and pages that are
+        throttled by the server are retried after the time it asks for."""
+
+        page_size = self.api_page_size()
+        r = self.fetch_page(api_type, url, token, object_type, namekey, 0, page_size)
         # check if there is a totalCount value in the output
         try:
             total_objects = int(r.output["totalCount"])
-            self.output(f"Total objects: {total_objects}", verbose_level=2)
-            # if total count is 0, return empty list
-            if total_objects == 0:
-                return []
-            # now get all objects in a loop, paginating per 100 objects
-            object_list = []
-
-            for page in range(0, (total_objects + 99) // 100):
-                url_filter = f"?page={page}&page-size=100&sort={namekey}&sort-order=asc"
-                self.output(f"Getting page {page} of objects", verbose_level=2)
-                if page > 0:
-                    time.sleep(0.5)  # be nice to the server
-                r = self.curl(
-                    api_type=api_type,
-                    request="GET",
-                    url=f"{url}{url_filter}",
-                    token=token,
-                )
-                if r.status_code != 200:
-                    raise ProcessorError(
-                        f"ERROR: Unable to get list of {object_type} from {domain}"
-                    )
-                self.output(f"Output:\n{r.output}", verbose_level=4)
-                # parse the output to get the list of objects
-                if object_type == "managed_software_updates_available_updates":
-                    object_list.extend(r.output["availableUpdates"])
-                elif object_type == "managed_software_updates_plans_events":
-                    object_list.extend(r.output["events"])
-                else:
-                    object_list.extend(r.output["results"])
-                # any null values in the output should be converted to empty strings
-                # this is to avoid problems outputting to XML later
-                for obj in object_list:
-                    for key, value in obj.items():
-                        if value is None:
-                            obj[key] = ""
         except (KeyError, TypeError):
             # if not, we're not dealing with a paginated endpoint, so just return the
             # results list
-            object_list = r.output
+            return r.output
+        self.output(f"Total objects: {total_objects}", verbose_level=2)
+
+        object_list = list(self.page_objects(r, object_type, domain))
+        for objects in self.iter_pages(
+            api_type,
+            url,
+            token,
+            object_type,
+            namekey,
+            domain,
+            total_objects,
+            page_size,
+            len(object_list),
+        ):
+            object_list.extend(objects)
+        return object_list
+
+    def iter_paginated(
+        self,
+        api_type,
+        url,
+        token,
+        object_type,
+        namekey,
+        domain,
+        rsql_filter="",
+        sort="",
+    ):
+        """Yield all objects of a particular type page by page.
+
+        The streaming form of paginated_get(): processing can start as soon as the
+        first page arrives, and only a few pages are held in memory at once. Pages
+        are not kept in the GET response cache. If rsql_filter is given, only the
+        objects matching it are fetched. The objects are sorted as fetch_page()
+        sorts them, by sort if it is given or else by namekey.
+        """
+        page_size = self.api_page_size()
+        r = self.fetch_page(
+            api_type,
+            url,
+            token,
+            object_type,
+            namekey,
+            0,
+            page_size,
+            use_cache=False,
+            rsql_filter=rsql_filter,
+            sort=sort,
+        )
+        try:
+            total_objects = int(r.output["totalCount"])
+        except (KeyError, TypeError):
+            # not a paginated endpoint
+            if r.status_code != 200 or not isinstance(r.output, list):
+                raise ProcessorError(
+                    f"ERROR: Unable to get list of {object_type} from {domain}"
+                ) from None
+            yield from r.output
+            return
+        self.output(f"Total objects: {total_objects}", verbose_level=2)
+
+        objects = self.page_objects(r, object_type, domain)
+        first_count = len(objects)
+        yield from objects
+        for objects in self.iter_pages(
+            api_type,
+            url,
+            token,
+            object_type,
+            namekey,
+            domain,
+            total_objects,
+            page_size,
+            first_count,
+            use_cache=False,
+            rsql_filter=rsql_filter,
+            sort=sort,
+        ):
+            yield from objects
 
+    def sort_objects(self, object_list, sort):
+        """Return a list of objects sorted as the Jamf Pro API sorts them.
+
+        sort is in the form of the API's sort parameter: a key with an optional
+        ":asc" or ":desc", or several of these separated by commas. Whole numbers
+        are compared as numbers and everything else without regard to case. If the
+        objects cannot be sorted, the list is returned as it is.
+        """
+
+        def sort_value(value):
+            if isinstance(value, int) and not isinstance(value, bool):
+                return (0, value, "")
+            if isinstance(value, str) and value.isdigit():
+                return (0, int(value), "")
+            return (1, 0, str(value).lower())
+
+        try:
+            # sort by the last key first, as sorted() keeps the order of equal items
+            for field in reversed(sort.split(",")):
+                key, _, direction = field.strip().partition(":")
+                object_list = sorted(
+                    object_list,
+                    key=lambda x, k=key: sort_value(x.get(k, "")),
+                    reverse=direction.lower() == "desc",
+                )
+        except AttributeError:
+            # if not, just leave the list as is
+            pass
         return object_list
 
     def get_all_api_objects(
@@ -2070,15 +3185,54 @@ class JamfUploaderBase(Processor):
             raise ProcessorError(f"ERROR: Unknown API type {api_type}")
 
         # ensure the list is sorted by namekey if possible
-        try:
-            object_list = sorted(object_list, key=lambda x: x.get(namekey, "").lower())
-        except (KeyError, TypeError, AttributeError):
-            # if not, just leave the list as is
-            pass
+        object_list = self.sort_objects(object_list, namekey)
         self.output(f"List of objects:\n{object_list}", verbose_level=3)
 
         return object_list
 
+    def iter_all_api_objects(
+        self,
+        domain,
+        object_type,
+        tenant_id="",
+        uuid="",
+        token="",
+        namekey="",
+        rsql_filter="",
+        sort="",
+    ):
+        """Yield all objects of a particular type, without collecting them in a list.
+
+        The objects are sorted by sort if it is given, in the form of the Jamf Pro
+        API's sort parameter (e.g. "id:desc"), or else by namekey. Jamf Pro API
+        objects are fetched page by page with iter_paginated() and come in the
+        order the server sorts them, limited to those matching rsql_filter if it is
+        given. Classic API endpoints do not paginate or filter, so their list is
+        fetched at once and sorted here with sort_objects().
+        """
+        if not namekey:
+            namekey = self.get_namekey(object_type)
+
+        self.output(
+            f"Getting all {self.api_endpoints(object_type, tenant_id=tenant_id)} from {domain}"
+        )
+        api_type = self.api_type(object_type)
+        url = f"{domain}/{self.api_endpoints(object_type, uuid=uuid, tenant_id=tenant_id)}"
+        if api_type == "classic":
+            r = self.curl(api_type=api_type, request="GET", url=url, token=token)
+            if r.status_code != 200:
+                raise ProcessorError(
+                    f"ERROR: Unable to get list of {object_type} from {domain}"
+                )
+            object_list = r.output[self.object_list_types(object_type)]
+            yield from self.sort_objects(object_list, sort or namekey)
+        elif api_type == "jpapi" or api_type == "platform":
+            yield from self.iter_paginated(
+                api_type, url, token, object_type, namekey, domain, rsql_filter, sort
+            )
+        else:
+            raise ProcessorError(f"ERROR: Unknown API type {api_type}")
+
     def get_settings_object(self, jamf_url, object_type, token="", tenant_id=""):
         """get the content of a settings-style endpoint"""
         # Get results from Jamf Pro as JSON object
@@ -2194,6 +3348,69 @@ class JamfUploaderBase(Processor):
                 )
                 return object_content
 
+    def classic_has_name_path(self, jamf_url, object_type):
+        """Return True if the schema registry lists a /name/ path for a Classic
+        API object type. Some resources, such as patchsoftwaretitles, have none."""
+        try:
+            resolved = self._ensure_registry_loaded(jamf_url).resolve(object_type)
+        except (KeyError, ProcessorError) as e:
+            self.output(
+                f"WARNING: Schema registry name path lookup failed: {e}",
+                verbose_level=2,
+            )
+            return False
+        return bool(resolved and resolved.get("has_name_path"))
+
+    def classic_subset_for_path(self, jamf_url, object_type, key):
+        """Return the name of the Classic API subset holding a top-level key of
+        an object, or None if the schema registry does not list one.
+
+        Subset names are the keys in CamelCase, e.g. self_service is SelfService.
+        Where the schema lists the subsets, the key must match one of them.
+        """
+        if not key:
+            return None
+        try:
+            resolved = self._ensure_registry_loaded(jamf_url).resolve(object_type)
+        except (KeyError, ProcessorError) as e:
+            self.output(
+                f"WARNING: Schema registry subset lookup failed: {e}",
+                verbose_level=2,
+            )
+            return None
+        if not resolved or not resolved.get("has_subset_path"):
+            return None
+        folded = key.replace("_", "").lower()
+        if resolved["subsets"]:
+            subset = next(
+                (s for s in sorted(resolved["subsets"]) if s.lower() == folded), None
+            )
+        else:
+            subset = "".join(word.capitalize() for word in key.split("_"))
+        unavailable = (self.get_netloc(jamf_url), object_type, subset)
+        if unavailable in self._unavailable_subsets:
+            return None
+        return subset
+
+    def parse_classic_json(self, output):
+        """Return a Classic API JSON response as a dict."""
+        # Handle both pre-parsed JSON (dict) and raw JSON string responses
+        if isinstance(output, dict):
+            return output
+        return json.loads(output)
+
+    def value_from_path(self, content, xpath_list):
+        """Return the value at a path of keys in an object, or an empty string."""
+        value = content
+        for xpath in xpath_list:
+            if xpath:
+                try:
+                    value = value[xpath]
+                    self.output(value, verbose_level=3)
+                except KeyError:
+                    return ""
+        return value
+
     def get_api_object_value_from_id(
         self, domain, object_type, object_id, object_path, token, tenant_id=""
     ):
@@ -2207,34 +3424,54 @@ class JamfUploaderBase(Processor):
         # if we find an object ID or it's an endpoint without IDs, we PUT or PATCH
         # if we're creating a new object, we POST
         value = ""
+        xpath_list = object_path.split("/")
         if api_type == "classic":
             # do XML stuff
-            url = f"{domain}/{self.api_endpoints(object_type, tenant_id=tenant_id)}/id/{object_id}"
-            r = self.curl(api_type=api_type, request="GET", url=url, token=token)
-            if r.status_code == 200:
-                # Handle both pre-parsed JSON (dict) and raw JSON string responses
-                if isinstance(r.output, dict):
-                    object_content = r.output
-                else:
-                    object_content = json.loads(r.output)
-                self.output(object_content, verbose_level=4)
-
-                # convert an xpath to json
-                xpath_list = object_path.split("/")
-                value = object_content[object_type]
-
-                for _, xpath in enumerate(xpath_list):
-                    if xpath:
-                        try:
-                            value = value[xpath]
-                            self.output(value, verbose_level=3)
-                        except KeyError:
-                            value = ""
-                            break
-            else:
-                raise ProcessorError(
-                    f"ERROR: {object_type} of ID {object_id} not found."
+            endpoint = self.api_endpoints(object_type, tenant_id=tenant_id)
+            url = f"{domain}/{endpoint}/id/{object_id}"
+
+            # fetch only the section of the object holding the value if we can,
+            # falling back to the whole object
+            object_content = None
+            subset = self.classic_subset_for_path(domain, object_type, xpath_list[0])
+            if subset:
+                r = self.curl(
+                    api_type=api_type,
+                    request="GET",
+                    url=f"{url}/subset/{subset}",
+                    token=token,
                 )
+                # the subset is only remembered as unavailable if the server
+                # rejected it or left out the section, not for a missing object
+                # or a transient error
+                unavailable = r.status_code == 400
+                if r.status_code == 200:
+                    object_content = self.parse_classic_json(r.output)
+                    if xpath_list[0] not in object_content.get(object_type, {}):
+                        object_content = None
+                        unavailable = True
+                if object_content is None:
+                    self.output(
+                        f"Subset {subset} of {object_type} not available "
+                        f"(HTTP {r.status_code}), getting the whole object",
+                        verbose_level=2,
+                    )
+                if unavailable:
+                    self._unavailable_subsets.add(
+                        (self.get_netloc(domain), object_type, subset)
+                    )
+
+            if object_content is None:
+                r = self.curl(api_type=api_type, request="GET", url=url, token=token)
+                if r.status_code != 200:
+                    raise ProcessorError(
+                        f"ERROR: {object_type} of ID {object_id} not found."
+                    )
+                object_content = self.parse_classic_json(r.output)
+            self.output(object_content, verbose_level=4)
+
+            # convert an xpath to json
+            value = self.value_from_path(object_content[object_type], xpath_list)
         elif api_type == "jpapi" or api_type == "platform":
             url = f"{domain}/{self.api_endpoints(object_type, tenant_id=tenant_id)}/{object_id}"
             r = self.curl(api_type=api_type, request="GET", url=url, token=token)
@@ -2243,18 +3480,7 @@ class JamfUploaderBase(Processor):
                 self.output(object_content, verbose_level=4)
 
                 # convert an xpath to json
-                xpath_list = object_path.split("/")
-                value = object_content
-
-                for _, xpath in enumerate(xpath_list):
-                    if xpath:
-                        try:
-                            value = value[xpath]
-                            self.output(value, verbose_level=3)
-                        except KeyError:
-                            value = ""
-                            break
-
+                value = self.value_from_path(object_content, xpath_list)
             else:
                 raise ProcessorError(
                     f"ERROR: {object_type} of ID {object_id} not found."
@@ -2287,23 +3513,102 @@ class JamfUploaderBase(Processor):
         else:
             url = f"{jamf_url}/{self.api_endpoints(object_type, tenant_id=tenant_id)}/{object_id}"
 
-        count = 0
-        while True:
-            count += 1
-            self.output(f"{object_type} delete attempt {count}", verbose_level=2)
-            r = self.curl(api_type=api_type, request="DELETE", url=url, token=token)
+        r = self.send_with_retry(
+            lambda: self.curl(api_type=api_type, request="DELETE", url=url, token=token),
+            object_type,
+            object_id,
+            "DELETE",
+            max_tries=max_tries,
+        )
+        return r.status_code
 
-            # check HTTP response
-            if self.status_check(r, object_type, object_id, "DELETE") == "break":
-                break
-            if count >= max_tries:
+    def delete_objects(
+        self,
+        jamf_url,
+        object_type,
+        object_ids,
+        tenant_id="",
+        max_tries=5,
+        workers=DEFAULT_DELETE_WORKERS,
+    ):
+        """Delete many Jamf Pro API objects and return {object_id: error}, where
+        error is None for each object that was deleted.
+
+        Objects are deleted DELETE_MULTIPLE_CHUNK_SIZE at a time with the type's
+        delete-multiple endpoint. Where a chunk cannot be deleted at once (e.g. one
+        of its objects has already gone), its objects are deleted one by one,
+        workers at a time, so that each has its own outcome. If the endpoint is
+        not allowed (405), the remaining chunks are deleted one by one too. The token is taken from current_token(), so keep_token() must
+        be called first.
+        """
+        endpoint = self.api_endpoints(object_type, tenant_id=tenant_id)
+        url = f"{jamf_url}/{endpoint}/delete-multiple"
+        object_ids = list(object_ids)
+        outcomes = {}
+        multiple_available = True
+
+        def delete_one(object_id):
+            try:
+                self.delete_object(
+                    jamf_url,
+                    object_type,
+                    object_id,
+                    self.current_token(),
+                    tenant_id=tenant_id,
+                    max_tries=max_tries,
+                )
+            except ProcessorError as e:
+                return str(e)
+            return None
+
+        for start in range(0, len(object_ids), DELETE_MULTIPLE_CHUNK_SIZE):
+            chunk = object_ids[start : start + DELETE_MULTIPLE_CHUNK_SIZE]
+            if multiple_available:
                 self.output(
-                    f"WARNING: {object_type} deletion did not succeed after {max_tries} attempts"
+                    f"Deleting {len(chunk)} {object_type} objects", verbose_level=1
                 )
-                self.output(f"\nHTTP POST Response Code: {r.status_code}")
-                raise ProcessorError(f"ERROR: {object_type} deletion failed ")
-            sleep(10)
-        return r.status_code
+                try:
+                    r = self.send_with_retry(
+                        lambda chunk=chunk: self.curl(
+                            api_type="jpapi",
+                            request="POST",
+                            url=url,
+                            token=self.current_token(),
+                            data=self.write_json_file(
+                                jamf_url, {"ids": [str(i) for i in chunk]}
+                            ),
+                        ),
+                        object_type,
+                        "",
+                        "POST",
+                        max_tries=max_tries,
+                        success_fn=lambda r: r.status_code in (200, 204),
+                        raise_on_failure=False,
+                    )
+                except ProcessorError as e:
+                    self.output(f"WARNING: {e}", verbose_level=1)
+                else:
+                    if r.status_code in (200, 204):
+                        outcomes.update((object_id, None) for object_id in chunk)
+                        continue
+                    # only a 405 shows that there is no such endpoint; a 404 may
+                    # just mean that one of the objects has already gone
+                    if r.status_code == 405:
+                        multiple_available = False
+                self.output(
+                    f"Could not delete {len(chunk)} {object_type} objects at once, "
+                    "deleting them one by one",
+                    verbose_level=1,
+                )
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                outcomes.update(zip(chunk, executor.map(delete_one, chunk)))
+
+        failed = sum(1 for error in outcomes.values() if error)
+        self.output(
+            f"Deleted {len(outcomes) - failed} {object_type} objects, {failed} failed",
+            verbose_level=1,
+        )
+        return outcomes
 
     def pretty_print_xml(self, xml):
         """prettifies XML"""
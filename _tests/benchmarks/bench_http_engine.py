@@ -0,0 +1,67 @@
+#!/usr/local/autopkg/python
+"""Benchmark JamfUploaderBase.curl() with each HTTP engine and response mode.
+
+Times the same sequence of Classic API GET requests through curl() with the
+curl engine in both response modes ('file' and 'memory') and with the pooled
+engine, and counts the files each leaves behind in the run's tmp directory.
+The GET response cache is bypassed so that every request is sent.
+"""
+
+import os
+import shutil
+
+from common import (  # pylint: disable=import-error
+    Timer,
+    fake_server,
+    get_token,
+    make_processor,
+)
+from fake_jamf_server import seed  # pylint: disable=import-error
+from JamfUploaderBase import JamfUploaderBase  # pylint: disable=import-error
+
+NAME = "http_engine"
+
+CONFIGS = {
+    "curl_file": {"http_engine": "curl", "http_response_mode": "file"},
+    "curl_memory": {"http_engine": "curl", "http_response_mode": "memory"},
+    "pooled": {"http_engine": "pooled"},
+}
+
+
+class Benchmark(JamfUploaderBase):
+    """Minimal processor used only to call curl()."""
+
+    description = __doc__
+    input_variables = {}
+    output_variables = {}
+
+
+def run(settings):
+    """Return timings for each engine configuration."""
+    count = settings["scale"]["http_requests"]
+    results = {"requests": count}
+    with fake_server(settings) as server:
+        seed(server, categories=50)
+        url = f"{server.url}/JSSResource/categories"
+        for name, env in CONFIGS.items():
+            processor = make_processor(Benchmark, server, settings, **env)
+            token = get_token(processor, server)
+            with Timer() as timer:
+                for _ in range(count):
+                    r = processor.curl(
+                        api_type="classic",
+                        request="GET",
+                        url=url,
+                        token=token,
+                        use_cache=False,
+                    )
+                    assert r.status_code == 200, r.status_code
+            tmp_dir = processor.env["jamfupload_tmp_dir"]
+            results[name] = {
+                "seconds": timer.seconds,
+                "ms_per_request": timer.seconds / count * 1000,
+                "files_left": len(os.listdir(tmp_dir)),
+            }
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    results["seconds"] = sum(results[name]["seconds"] for name in CONFIGS)
+    return results
@@ -0,0 +1,40 @@
+#!/usr/local/autopkg/python
+"""Benchmark JamfObjectReader downloading every policy with all_objects."""
+
+import os
+
+from common import (  # pylint: disable=import-error
+    Timer,
+    fake_server,
+    make_processor,
+    temp_dir,
+)
+from fake_jamf_server import seed  # pylint: disable=import-error
+from JamfObjectReader import JamfObjectReader  # pylint: disable=import-error
+
+NAME = "object_reader_all_objects"
+
+
+def run(settings):
+    """Run JamfObjectReader with all_objects against a seeded server."""
+    count = settings["scale"]["reader_policies"]
+    with fake_server(settings) as server, temp_dir() as output_dir:
+        seed(server, policies=count, packages=50, categories=10)
+        processor = make_processor(
+            JamfObjectReader,
+            server,
+            settings,
+            object_type="policy",
+            all_objects=True,
+            output_dir=output_dir,
+        )
+        with Timer() as timer:
+            processor.execute()
+        files = len(os.listdir(output_dir))
+        assert files >= count, files
+        return {
+            "seconds": timer.seconds,
+            "objects": count,
+            "files_written": files,
+            "requests": server.stats["requests"],
+        }
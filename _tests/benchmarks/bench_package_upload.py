@@ -0,0 +1,53 @@
+#!/usr/local/autopkg/python
+"""Benchmark JamfPackageUploader hashing and uploading a large package.
+
+The package is a sparse file, so creating it is instant and reading it is not
+limited by disk speed. Hashing time is measured separately from the full
+processor run (check, metadata, upload and inventory refresh), for each digest
+on its own and for SHA3-512 and MD5 together in one read.
+"""
+
+import os
+
+from common import (  # pylint: disable=import-error
+    Timer,
+    fake_server,
+    make_processor,
+    temp_dir,
+)
+from fake_jamf_server import seed  # pylint: disable=import-error
+from JamfPackageUploader import JamfPackageUploader  # pylint: disable=import-error
+
+NAME = "package_upload"
+
+
+def run(settings):
+    """Hash and upload a sparse package of the configured size."""
+    size = settings["scale"]["package_size"]
+    with fake_server(settings) as server, temp_dir() as pkg_dir:
+        seed(server)
+        pkg_path = os.path.join(pkg_dir, "Benchmark-1.0.pkg")
+        with open(pkg_path, "wb") as fp:
+            fp.truncate(size)
+
+        processor = make_processor(
+            JamfPackageUploader, server, settings, pkg_path=pkg_path
+        )
+        with Timer() as sha3_timer:
+            processor.sha3sum(pkg_path)
+        with Timer() as md5_timer:
+            processor.md5sum(pkg_path)
+        with Timer() as digests_timer:
+            processor.file_digests(pkg_path, ["sha3_512", "md5"])
+        with Timer() as timer:
+            processor.execute()
+        assert processor.env["pkg_uploaded"]
+        assert list(server.uploads.values()) and max(server.uploads.values()) > size
+        return {
+            "seconds": timer.seconds,
+            "bytes": size,
+            "sha3_seconds": sha3_timer.seconds,
+            "md5_seconds": md5_timer.seconds,
+            "sha3_and_md5_seconds": digests_timer.seconds,
+            "upload_mb_per_second": size / 1024 / 1024 / timer.seconds,
+        }
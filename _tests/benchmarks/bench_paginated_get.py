@@ -0,0 +1,46 @@
+#!/usr/local/autopkg/python
+"""Benchmark JamfUploaderBase.paginated_get over a large JPAPI collection."""
+
+from common import (  # pylint: disable=import-error
+    Timer,
+    fake_server,
+    get_token,
+    make_processor,
+)
+from fake_jamf_server import seed  # pylint: disable=import-error
+from JamfUploaderBase import JamfUploaderBase  # pylint: disable=import-error
+
+NAME = "paginated_get"
+
+
+class Benchmark(JamfUploaderBase):
+    """Minimal processor used only to call paginated_get()."""
+
+    description = __doc__
+    input_variables = {}
+    output_variables = {}
+
+
+def run(settings):
+    """Fetch every package through paginated_get()."""
+    count = settings["scale"]["paginated_objects"]
+    with fake_server(settings) as server:
+        seed(server, packages=count)
+        processor = make_processor(Benchmark, server, settings)
+        token = get_token(processor, server)
+        requests_before = server.stats["requests"]
+        with Timer() as timer:
+            objects = processor.paginated_get(
+                "jpapi",
+                f"{server.url}/api/v1/packages",
+                token,
+                "package_v1",
+                "packageName",
+                server.url,
+            )
+        assert len(objects) == count, len(objects)
+        return {
+            "seconds": timer.seconds,
+            "objects": count,
+            "requests": server.stats["requests"] - requests_before,
+        }
@@ -0,0 +1,60 @@
+#!/usr/local/autopkg/python
+"""Benchmark loading the API schemas into JamfSchemaRegistry, cold and warm.
+
+Cold: the schema cache is empty, so both schemas are downloaded and parsed.
+Warm: a new processor loads the schemas from the on-disk cache.
+"""
+
+import os
+import shutil
+
+from common import (  # pylint: disable=import-error
+    Timer,
+    fake_server,
+    make_processor,
+)
+from JamfUploaderBase import JamfUploaderBase  # pylint: disable=import-error
+
+NAME = "schema_registry"
+
+# roughly the number of resources in a current Jamf Pro instance
+CLASSIC_RESOURCES = 100
+JPAPI_RESOURCES = 600
+
+
+class Benchmark(JamfUploaderBase):
+    """Minimal processor used only to load the schema registry."""
+
+    description = __doc__
+    input_variables = {}
+    output_variables = {}
+
+
+def run(settings):
+    """Time a cold and a warm schema load."""
+    with fake_server(settings) as server:
+        for i in range(CLASSIC_RESOURCES):
+            server.classic[f"resource{i:03d}"] = {}
+        for i in range(JPAPI_RESOURCES):
+            server.jpapi[f"resource-{i:03d}"] = {}
+
+        cold = make_processor(Benchmark, server, settings)
+        cache_dir = os.path.join(
+            "/tmp/jamf_upload", "schema_cache", cold.get_netloc(server.url)
+        )
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        with Timer() as cold_timer:
+            registry = cold._ensure_registry_loaded(server.url)  # pylint: disable=protected-access
+        assert len(registry.get_classic_resources()) >= CLASSIC_RESOURCES
+
+        warm = make_processor(Benchmark, server, settings)
+        with Timer() as warm_timer:
+            registry = warm._ensure_registry_loaded(server.url)  # pylint: disable=protected-access
+        assert len(registry.get_jpapi_resources()) >= JPAPI_RESOURCES
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+        return {
+            "seconds": cold_timer.seconds + warm_timer.seconds,
+            "cold_seconds": cold_timer.seconds,
+            "warm_seconds": warm_timer.seconds,
+        }
@@ -0,0 +1,35 @@
+#!/usr/local/autopkg/python
+"""Benchmark JamfUploaderBase.substitute_assignable_keys on a large template."""
+
+from common import Timer  # pylint: disable=import-error
+from JamfUploaderBase import JamfUploaderBase  # pylint: disable=import-error
+
+NAME = "substitute_assignable_keys"
+
+
+class Benchmark(JamfUploaderBase):
+    """Minimal processor used only to substitute keys."""
+
+    description = __doc__
+    input_variables = {}
+    output_variables = {}
+
+
+def run(settings):
+    """Substitute a template with many keys, some used many times and some nested."""
+    count = settings["scale"]["template_keys"]
+    env = {"verbose": 0, "NAME": "Benchmark"}
+    lines = ["<policy>"]
+    for i in range(count):
+        env[f"KEY_{i}"] = f"value & {i}"
+        lines.append(f"  <item{i}>%KEY_{i}% %KEY_{i % 10}% %NESTED_{i % 50}%</item{i}>")
+    for i in range(50):
+        env[f"NESTED_{i}"] = f"%KEY_{i}%-nested"
+    lines.append("</policy>")
+    template = "\n".join(lines)
+
+    processor = Benchmark(env=env)
+    with Timer() as timer:
+        result = processor.substitute_assignable_keys(template, xml_escape=True)
+    assert "%" not in result
+    return {"seconds": timer.seconds, "keys": count, "template_bytes": len(template)}
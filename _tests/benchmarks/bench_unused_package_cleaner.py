@@ -0,0 +1,45 @@
+#!/usr/local/autopkg/python
+"""Benchmark JamfUnusedPackageCleaner scanning policies, PreStages and patch titles."""
+
+from common import (  # pylint: disable=import-error
+    Timer,
+    fake_server,
+    make_processor,
+    temp_dir,
+)
+from fake_jamf_server import seed  # pylint: disable=import-error
+from JamfUnusedPackageCleaner import (  # pylint: disable=import-error
+    JamfUnusedPackageCleaner,
+)
+
+NAME = "unused_package_cleaner"
+
+
+def run(settings):
+    """Run JamfUnusedPackageCleaner in dry-run mode against a seeded server."""
+    policies = settings["scale"]["cleaner_policies"]
+    packages = settings["scale"]["cleaner_packages"]
+    with fake_server(settings) as server, temp_dir() as output_dir:
+        seed(
+            server,
+            policies=policies,
+            packages=packages,
+            categories=10,
+            prestages=20,
+            patch_titles=50,
+        )
+        processor = make_processor(
+            JamfUnusedPackageCleaner,
+            server,
+            settings,
+            dry_run=True,
+            output_dir=output_dir,
+        )
+        with Timer() as timer:
+            processor.execute()
+        return {
+            "seconds": timer.seconds,
+            "policies": policies,
+            "packages": packages,
+            "requests": server.stats["requests"],
+        }
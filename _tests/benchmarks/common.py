@@ -0,0 +1,116 @@
+#!/usr/local/autopkg/python
+"""Shared helpers for the JamfUploader benchmark suite."""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from contextlib import contextmanager
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+TESTS_DIR = os.path.dirname(BENCHMARKS_DIR)
+PROCESSORS_DIR = os.path.join(TESTS_DIR, "..", "JamfUploaderProcessors")
+LIB_DIR = os.path.join(PROCESSORS_DIR, "JamfUploaderLib")
+
+# autopkglib lives here in a standard AutoPkg installation
+sys.path.insert(0, "/Library/AutoPkg")
+for path in (LIB_DIR, PROCESSORS_DIR, TESTS_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from fake_jamf_server import (  # pylint: disable=import-error, wrong-import-position
+    DEFAULT_PASSWORD,
+    DEFAULT_USER,
+    FakeJamfServer,
+)
+
+# Workload sizes for each scale. 'full' matches the sizes that hurt in
+# production; 'quick' is for a fast sanity run.
+SCALES = {
+    "quick": {
+        "paginated_objects": 1000,
+        "reader_policies": 100,
+        "cleaner_policies": 200,
+        "cleaner_packages": 100,
+        "package_size": 64 * 1024 * 1024,
+        "template_keys": 500,
+        "http_requests": 100,
+    },
+    "full": {
+        "paginated_objects": 10000,
+        "reader_policies": 1000,
+        "cleaner_policies": 2000,
+        "cleaner_packages": 500,
+        "package_size": 5 * 1024 * 1024 * 1024,
+        "template_keys": 5000,
+        "http_requests": 500,
+    },
+}
+
+
+@contextmanager
+def fake_server(settings, **kwargs):
+    """Run a FakeJamfServer with the suite's latency settings."""
+    server = FakeJamfServer(latency=settings.get("latency", 0.0), **kwargs)
+    server.start()
+    try:
+        yield server
+    finally:
+        server.stop()
+
+
+@contextmanager
+def temp_dir():
+    """Yield a temporary directory that is removed afterwards."""
+    path = tempfile.mkdtemp(prefix="jamf_upload_bench_")
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def make_processor(processor_class, server, settings, **env):
+    """Return a processor instance configured to talk to the fake server.
+
+    Input variable defaults are applied as AutoPkg does before execute().
+    """
+    processor_env = {
+        key: spec["default"]
+        for key, spec in getattr(processor_class, "input_variables", {}).items()
+        if "default" in spec
+    }
+    processor_env.update({
+        "JSS_URL": server.url,
+        "API_USERNAME": DEFAULT_USER,
+        "API_PASSWORD": DEFAULT_PASSWORD,
+        "verbose": settings.get("verbose", 0),
+        "http_engine": settings.get("http_engine", "curl"),
+        "http_get_cache_size": str(settings.get("get_cache_size", 256)),
+        "max_tries": 1,
+    })
+    processor_env.update(env)
+    return processor_class(env=processor_env)
+
+
+def get_token(processor, server):
+    """Return a bearer token from the fake server."""
+    return processor.get_api_token_from_basic_auth(
+        server.url, DEFAULT_USER, DEFAULT_PASSWORD
+    )
+
+
+class Timer:
+    """Context manager that records elapsed wall-clock seconds."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self._start
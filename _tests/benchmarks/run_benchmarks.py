@@ -0,0 +1,155 @@
+#!/usr/local/autopkg/python
+"""Run the JamfUploader benchmark suite against a local fake Jamf Pro server.
+
+Each bench_*.py module in this directory defines NAME and run(settings), which
+returns a dict of metrics including "seconds". Results are printed and can be
+written as JSON so that runs can be compared before and after a change:
+
+    ./run_benchmarks.py --scale full --output before.json
+    ./run_benchmarks.py --scale full --compare before.json
+
+With --compare, the exit status is non-zero if any benchmark's median time is
+slower than the baseline by more than --threshold (default 10%).
+"""
+
+import argparse
+import datetime
+import glob
+import importlib
+import json
+import os
+import platform
+import statistics
+import sys
+
+from common import BENCHMARKS_DIR, SCALES  # pylint: disable=import-error
+
+from JamfUploaderBase import JamfUploaderBase  # pylint: disable=import-error
+
+
+def load_benchmarks():
+    """Return the benchmark modules in this directory, keyed by NAME."""
+    modules = {}
+    for path in sorted(glob.glob(os.path.join(BENCHMARKS_DIR, "bench_*.py"))):
+        module = importlib.import_module(os.path.splitext(os.path.basename(path))[0])
+        modules[module.NAME] = module
+    return modules
+
+
+def run_benchmark(module, settings, repeat):
+    """Run a benchmark `repeat` times and summarise the timings."""
+    runs = [module.run(settings) for _ in range(repeat)]
+    seconds = [run["seconds"] for run in runs]
+    result = {
+        "median_seconds": statistics.median(seconds),
+        "min_seconds": min(seconds),
+        "runs": seconds,
+    }
+    # report the metrics of the median run
+    median_run = sorted(runs, key=lambda run: run["seconds"])[len(runs) // 2]
+    result["metrics"] = {k: v for k, v in median_run.items() if k != "seconds"}
+    return result
+
+
+def compare(results, baseline, threshold):
+    """Print the change against a baseline and return the names that regressed."""
+    regressions = []
+    print(f"\n{'benchmark':<30} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in results["benchmarks"].items():
+        before = baseline.get("benchmarks", {}).get(name)
+        if not before:
+            print(f"{name:<30} {'-':>10} {result['median_seconds']:>10.3f}")
+            continue
+        ratio = result["median_seconds"] / before["median_seconds"]
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<30} {before['median_seconds']:>10.3f} "
+            f"{result['median_seconds']:>10.3f} {ratio - 1:>+8.1%}{flag}"
+        )
+    return regressions
+
+
+def main():
+    """Parse arguments, run the selected benchmarks and report."""
+    benchmarks = load_benchmarks()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="quick")
+    parser.add_argument(
+        "--only",
+        action="append",
+        choices=sorted(benchmarks),
+        help="run only this benchmark (may be repeated)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--http-engine", choices=("curl", "pooled"), default="curl")
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="seconds of latency the fake server adds to each request",
+    )
+    parser.add_argument(
+        "--get-cache-size",
+        type=int,
+        default=256,
+        help="GET responses cached per run (0 turns the cache off)",
+    )
+    parser.add_argument("--verbose", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="fractional slow-down treated as a regression (default 0.10)",
+    )
+    args = parser.parse_args()
+
+    settings = {
+        "scale_name": args.scale,
+        "scale": SCALES[args.scale],
+        "http_engine": args.http_engine,
+        "latency": args.latency,
+        "get_cache_size": args.get_cache_size,
+        "verbose": args.verbose,
+    }
+    results = {
+        "jamf_upload_version": JamfUploaderBase.__version__,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {k: v for k, v in settings.items() if k != "scale"},
+        "scale": settings["scale"],
+        "benchmarks": {},
+    }
+
+    for name in args.only or sorted(benchmarks):
+        print(f"Running {name}...", flush=True)
+        result = run_benchmark(benchmarks[name], settings, args.repeat)
+        results["benchmarks"][name] = result
+        print(f"  median {result['median_seconds']:.3f}s  min {result['min_seconds']:.3f}s")
+        for key, value in result["metrics"].items():
+            print(f"  {key}: {value}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(results, fp, indent=2)
+        print(f"\nWrote results to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fp:
+            baseline = json.load(fp)
+        if baseline.get("scale") != results["scale"]:
+            print("WARNING: baseline was run at a different scale")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
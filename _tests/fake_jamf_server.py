@@ -0,0 +1,1104 @@
+#!/usr/local/autopkg/python
+"""A local stand-in for a Jamf Pro server, for offline testing and benchmarking.
+
+Implements enough of the Jamf Pro APIs for JamfUploaderBase to run end-to-end:
+
+* Token endpoints: api/v1/auth/token (basic auth), api/v1/oauth/token
+  (client credentials), api/v1/auth, keep-alive and invalidate-token.
+* Classic API: JSSResource/<resource> lists, and /id/<id>, /name/<name> and
+  /subset/<subsets> objects, with GET/POST/PUT/DELETE in JSON or XML. Patch
+  titles and patch policies have no /name/<name> path, as in Jamf Pro.
+* Jamf Pro API: api/v1..vN/<resource> with page, page-size, sort, RSQL filter
+  and totalCount, object GET/POST/PUT/PATCH/DELETE, package uploads and
+  delete-multiple, the v1/jcds/files list of uploaded package files, plus
+  singleton (settings) endpoints.
+* Schemas: api/schema (OpenAPI JSON) and classicapi/doc/swagger.yaml, generated
+  from the resources held by the server.
+
+Latency, random or scheduled error responses and 429 rate limiting can be
+configured, so that throughput can be measured reproducibly with no network.
+
+Use it from Python:
+
+    server = FakeJamfServer(latency=0.02, rate_limit=50)
+    server.start()
+    server.add_classic_object("policies", {"general": {"name": "Firefox"}})
+    ... point JamfUploader at server.url ...
+    server.stop()
+
+or run it standalone:
+
+    ./fake_jamf_server.py --port 8080 --policies 2000 --packages 500
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+import xml.etree.ElementTree as ET
+
+from base64 import b64decode
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "..",
+        "JamfUploaderProcessors",
+        "JamfUploaderLib",
+    ),
+)
+
+from JamfSchemaRegistry import (  # pylint: disable=import-error, wrong-import-position
+    CLASSIC_LIST_KEY_OVERRIDES,
+)
+
+DEFAULT_USER = "jamfadmin"
+DEFAULT_PASSWORD = "password"
+DEFAULT_CLIENT_ID = "00000000-0000-0000-0000-000000000000"
+DEFAULT_CLIENT_SECRET = "secret"
+
+# Jamf Pro rejects page sizes above this
+MAX_PAGE_SIZE = 2000
+
+# Classic API resources that, as in Jamf Pro, cannot be looked up by name
+NO_NAME_PATH_RESOURCES = ("patchpolicies", "patchsoftwaretitles")
+
+# Paths that never get latency, errors or rate limiting applied
+_EXEMPT_PATHS = (
+    "api/v1/auth",
+    "api/v1/oauth/token",
+    "api/schema",
+    "classicapi/doc/swagger.yaml",
+)
+
+
+def singular(list_key):
+    """Return the Classic API object element name for a list key."""
+    if list_key.endswith("ies"):
+        return list_key[:-3] + "y"
+    if list_key.endswith("s"):
+        return list_key[:-1]
+    return list_key
+
+
+def classic_list_key(resource):
+    """Return the Classic API list wrapper key for a resource name."""
+    return CLASSIC_LIST_KEY_OVERRIDES.get(resource, resource)
+
+
+def dict_to_xml(tag, value):
+    """Convert a Classic API JSON-style object into an XML Element."""
+    elem = ET.Element(tag)
+    if isinstance(value, dict):
+        for key, child in value.items():
+            elem.append(dict_to_xml(key, child))
+    elif isinstance(value, list):
+        ET.SubElement(elem, "size").text = str(len(value))
+        for child in value:
+            elem.append(dict_to_xml(singular(tag), child))
+    elif isinstance(value, bool):
+        elem.text = "true" if value else "false"
+    elif value is not None:
+        elem.text = str(value)
+    return elem
+
+
+def xml_to_dict(elem):
+    """Convert a Classic API XML Element into a JSON-style value."""
+    children = [child for child in elem if child.tag != "size"]
+    if not children:
+        if len(elem):
+            return []  # a list that only contained <size>
+        text = (elem.text or "").strip()
+        if re.fullmatch(r"-?\d+", text):
+            return int(text)
+        if text in ("true", "false"):
+            return text == "true"
+        return text
+    tags = [child.tag for child in children]
+    if len(set(tags)) == 1 and (len(tags) > 1 or tags[0] == singular(elem.tag)):
+        return [xml_to_dict(child) for child in children]
+    return {child.tag: xml_to_dict(child) for child in children}
+
+
+def get_field(obj, path):
+    """Return a (dotted) field from a JPAPI object, or None."""
+    for key in path.split("."):
+        if not isinstance(obj, dict):
+            return None
+        obj = obj.get(key)
+    return obj
+
+
+def _split_top_level(text, separator):
+    """Split an RSQL expression on a separator outside quotes and brackets."""
+    parts, depth, quote, start = [], 0, "", 0
+    for i, char in enumerate(text):
+        if quote:
+            if char == quote and text[i - 1] != "\\":
+                quote = ""
+        elif char in "\"'":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _unquote_rsql(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        value = value[1:-1].replace('\\"', '"').replace("\\'", "'")
+    return value
+
+
+def _rsql_compare(actual, operator, expected):
+    """Evaluate a single RSQL comparison against a field value."""
+    if operator in ("=in=", "=out="):
+        values = [_unquote_rsql(v) for v in _split_top_level(expected.strip()[1:-1], ",")]
+        found = any(_rsql_compare(actual, "==", v) for v in values)
+        return found if operator == "=in=" else not found
+    if operator in ("==", "!="):
+        actual_str = "" if actual is None else str(actual)
+        if isinstance(actual, bool):
+            actual_str = str(actual).lower()
+        pattern = "^" + ".*".join(re.escape(p) for p in expected.split("*")) + "$"
+        matched = re.match(pattern, actual_str, re.IGNORECASE | re.DOTALL) is not None
+        return matched if operator == "==" else not matched
+    try:
+        actual_num, expected_num = float(actual), float(expected)
+    except (TypeError, ValueError):
+        actual_num, expected_num = str(actual), expected
+    return {
+        "=lt=": actual_num < expected_num,
+        "=le=": actual_num <= expected_num,
+        "=gt=": actual_num > expected_num,
+        "=ge=": actual_num >= expected_num,
+    }[operator]
+
+
+def rsql_match(obj, expression):
+    """Return True if a JPAPI object matches an RSQL filter expression.
+
+    Supports ==, != (with * wildcards), =in=, =out=, =lt=, =le=, =gt=, =ge=,
+    ';' (and), ',' (or) and parentheses.
+    """
+    expression = expression.strip()
+    if not expression:
+        return True
+    or_parts = _split_top_level(expression, ",")
+    if len(or_parts) > 1:
+        return any(rsql_match(obj, part) for part in or_parts)
+    and_parts = _split_top_level(expression, ";")
+    if len(and_parts) > 1:
+        return all(rsql_match(obj, part) for part in and_parts)
+    if expression.startswith("(") and expression.endswith(")"):
+        return rsql_match(obj, expression[1:-1])
+    match = re.match(r"^([\w.]+)(==|!=|=in=|=out=|=lt=|=le=|=gt=|=ge=)(.*)$", expression, re.S)
+    if not match:
+        raise ValueError(f"Invalid RSQL expression: {expression}")
+    field, operator, value = match.groups()
+    if operator not in ("=in=", "=out="):
+        value = _unquote_rsql(value)
+    return _rsql_compare(get_field(obj, field), operator, value)
+
+
+def _sort_key(value):
+    """Sort numbers numerically and everything else case-insensitively."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value, "")
+    if isinstance(value, str) and re.fullmatch(r"-?\d+", value):
+        return (0, int(value), "")
+    return (1, 0, "" if value is None else str(value).lower())
+
+
+class FakeJamfServer:
+    """A threaded HTTP server that behaves like a (small) Jamf Pro instance.
+
+    Args:
+        host, port:        Address to listen on (port 0 picks a free port).
+        latency:           Seconds added to every API response.
+        latency_jitter:    Random extra latency, up to this many seconds.
+        error_rate:        Probability (0-1) that an API request fails.
+        error_statuses:    HTTP status codes used for random failures.
+        rate_limit:        Requests per second allowed before 429 responses.
+        rate_limit_burst:  Requests that may be made in a burst.
+        retry_after:       Retry-After value (seconds) sent with 429 responses.
+        token_lifetime:    Bearer token lifetime in seconds.
+        jamf_pro_version:  Version string returned by api/v1/jamf-pro-version.
+        seed:              Random seed, for reproducible error injection.
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        latency=0.0,
+        latency_jitter=0.0,
+        error_rate=0.0,
+        error_statuses=(500,),
+        rate_limit=None,
+        rate_limit_burst=None,
+        retry_after=1,
+        token_lifetime=1200,
+        jamf_pro_version="11.20.0-t1700000000000",
+        seed=0,
+    ):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.rate_limit = rate_limit
+        self.rate_limit_burst = rate_limit_burst or rate_limit
+        self.retry_after = retry_after
+        self.token_lifetime = token_lifetime
+        self.users = {DEFAULT_USER: DEFAULT_PASSWORD}
+        self.clients = {DEFAULT_CLIENT_ID: DEFAULT_CLIENT_SECRET}
+        self.tokens = {}
+        self.classic = {}
+        self.jpapi = {}
+        self.singletons = {
+            "v1/jamf-pro-version": {"version": jamf_pro_version},
+        }
+        self.actions = {
+            "v1/cloud-distribution-point/refresh-inventory": 204,
+        }
+        self.uploads = {}
+        self.jcds_files = {}
+        self.stats = {"requests": 0, "errors_injected": 0, "rate_limited": 0}
+        self.request_log = []
+        self.log_requests = False
+        self._forced_errors = []
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._next_id = 1
+        self._bucket_tokens = float(self.rate_limit_burst or 0)
+        self._bucket_time = time.monotonic()
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    @property
+    def url(self):
+        """The base URL of the server, e.g. http://127.0.0.1:54321"""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the listening socket."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Data
+    # ------------------------------------------------------------------
+
+    def _new_id(self):
+        with self._lock:
+            new_id = self._next_id
+            self._next_id += 1
+        return new_id
+
+    def add_classic_object(self, resource, obj):
+        """Add an object to a Classic API resource (e.g. 'policies') and return its id.
+
+        The object is given in the JSON form returned by the Classic API, without
+        the outer element, e.g. {"general": {"name": "Firefox"}, "scope": {...}}.
+        The id is assigned by the server unless one is set.
+        """
+        with self._lock:
+            target = obj["general"] if isinstance(obj.get("general"), dict) else obj
+            object_id = int(target.get("id") or self._new_id())
+            self._next_id = max(self._next_id, object_id + 1)
+            target["id"] = object_id
+            self.classic.setdefault(resource, {})[object_id] = obj
+        return object_id
+
+    def add_jpapi_object(self, resource, obj):
+        """Add an object to a Jamf Pro API resource (e.g. 'packages') and return its id.
+
+        The resource is the path without the version, e.g. 'computer-prestages'.
+        """
+        with self._lock:
+            object_id = str(obj.get("id") or self._new_id())
+            self._next_id = max(self._next_id, int(object_id) + 1)
+            obj["id"] = object_id
+            self.jpapi.setdefault(resource, {})[object_id] = obj
+        return object_id
+
+    def set_singleton(self, path, obj):
+        """Set the object returned by a settings endpoint such as 'v1/sso'."""
+        with self._lock:
+            self.singletons[path] = obj
+
+    def fail_next(self, count=1, status=500, retry_after=None):
+        """Make the next count API requests fail with the given status."""
+        with self._lock:
+            self._forced_errors.extend([(status, retry_after)] * count)
+
+    # ------------------------------------------------------------------
+    # Authentication
+    # ------------------------------------------------------------------
+
+    def issue_token(self):
+        """Create a bearer token and return (token, expiry datetime)."""
+        token = uuid.uuid4().hex
+        expires = datetime.now(timezone.utc) + timedelta(seconds=self.token_lifetime)
+        with self._lock:
+            self.tokens[token] = expires
+        return token, expires
+
+    def check_auth(self, header):
+        """Return True if an Authorization header holds valid credentials."""
+        if not header:
+            return False
+        scheme, _, value = header.partition(" ")
+        if scheme.lower() == "bearer":
+            expires = self.tokens.get(value.strip())
+            return bool(expires and expires > datetime.now(timezone.utc))
+        if scheme.lower() == "basic":
+            try:
+                user, _, password = b64decode(value).decode("utf-8").partition(":")
+            except ValueError:
+                return False
+            return self.users.get(user) == password
+        return False
+
+    # ------------------------------------------------------------------
+    # Fault injection
+    # ------------------------------------------------------------------
+
+    def injected_fault(self):
+        """Return (status, retry_after) for an injected failure, or None."""
+        with self._lock:
+            if self.rate_limit:
+                now = time.monotonic()
+                self._bucket_tokens = min(
+                    float(self.rate_limit_burst),
+                    self._bucket_tokens + (now - self._bucket_time) * self.rate_limit,
+                )
+                self._bucket_time = now
+                if self._bucket_tokens < 1:
+                    self.stats["rate_limited"] += 1
+                    return 429, self.retry_after
+                self._bucket_tokens -= 1
+            if self._forced_errors:
+                self.stats["errors_injected"] += 1
+                return self._forced_errors.pop(0)
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.stats["errors_injected"] += 1
+                return self._random.choice(self.error_statuses), None
+        return None
+
+    def delay(self):
+        """Sleep for the configured latency."""
+        latency = self.latency
+        if self.latency_jitter:
+            with self._lock:
+                latency += self._random.uniform(0, self.latency_jitter)
+        if latency:
+            time.sleep(latency)
+
+    # ------------------------------------------------------------------
+    # Schemas
+    # ------------------------------------------------------------------
+
+    def jpapi_schema(self):
+        """Return an OpenAPI 3 document describing the JPAPI resources."""
+        paths = {}
+        for resource in sorted(self.jpapi):
+            base = f"/v1/{resource}"
+            paths[base] = {
+                "get": {"responses": {"200": {}}},
+                "post": {"responses": {"201": {}}},
+            }
+            paths[base + "/{id}"] = {
+                "get": {"responses": {"200": {}}},
+                "put": {"responses": {"200": {}}},
+                "delete": {"responses": {"204": {}}},
+            }
+        for path in sorted(self.singletons):
+            paths[f"/{path}"] = {
+                "get": {"responses": {"200": {}}},
+                "put": {"responses": {"200": {}}},
+            }
+        return {"openapi": "3.0.1", "info": {"title": "Jamf Pro API"}, "paths": paths}
+
+    def classic_schema(self):
+        """Return a Swagger 2.0 document (as YAML) describing the Classic resources.
+
+        JSON is a subset of YAML, so the document is serialised as JSON.
+        """
+        paths = {}
+        for resource in sorted(self.classic):
+            paths[f"/{resource}"] = {
+                "get": {"tags": [resource], "responses": {"200": {}}},
+            }
+            keys = ["id/{id}"]
+            if resource not in NO_NAME_PATH_RESOURCES:
+                keys.append("name/{name}")
+            for key in keys:
+                paths[f"/{resource}/{key}"] = {
+                    method: {"tags": [resource], "responses": {"200": {}}}
+                    for method in ("get", "post", "put", "delete")
+                }
+                paths[f"/{resource}/{key}/subset/{{subset}}"] = {
+                    "get": {"tags": [resource], "responses": {"200": {}}}
+                }
+        return json.dumps(
+            {"swagger": "2.0", "basePath": "/JSSResource/", "paths": paths}, indent=1
+        )
+
+
+def _make_handler(server):
+    """Return a request handler class bound to a FakeJamfServer."""
+
+    class Handler(_FakeJamfHandler):
+        fake = server
+
+    return Handler
+
+
+class _FakeJamfHandler(BaseHTTPRequestHandler):
+    """Routes requests to the Classic API, Jamf Pro API and token endpoints."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    fake = None
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Silence request logging."""
+
+    # ------------------------------------------------------------------
+    # Response helpers
+    # ------------------------------------------------------------------
+
+    def send(self, status, body=b"", content_type="application/json", headers=None):
+        """Send a complete response."""
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode("utf-8")
+        elif isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def send_error_page(self, status, message, headers=None):
+        """Send an HTML error page like Jamf Pro's, with an <p>Error: line."""
+        self.send(
+            status,
+            f"<html><body><p>Error: {message}</p></body></html>",
+            content_type="text/html",
+            headers=headers,
+        )
+
+    def read_body(self):
+        """Read the request body."""
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def discard_body(self):
+        """Read and discard the request body, returning its size."""
+        remaining = int(self.headers.get("Content-Length") or 0)
+        size = remaining
+        while remaining:
+            chunk = self.rfile.read(min(remaining, 1024 * 1024))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+        return size
+
+    def receive_upload(self):
+        """Read a multipart/form-data upload of one file, returning the size of
+        the request body and the MD5 hash of the file in it."""
+        remaining = int(self.headers.get("Content-Length") or 0)
+        size = remaining
+        boundary = self.headers.get_param("boundary")
+        # the file is followed by \r\n--<boundary>--\r\n
+        tail_length = len(boundary) + 8 if boundary else 0
+        md5 = hashlib.md5()
+        head = b""
+        held = b""
+        in_file = not boundary
+        while remaining:
+            chunk = self.rfile.read(min(remaining, 1024 * 1024))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            if not in_file:
+                head += chunk
+                if b"\r\n\r\n" not in head:
+                    continue
+                chunk = head.partition(b"\r\n\r\n")[2]
+                in_file = True
+            held += chunk
+            if len(held) > tail_length:
+                md5.update(held[: len(held) - tail_length])
+                held = held[len(held) - tail_length :]
+        return size, md5.hexdigest()
+
+    def wants_xml(self):
+        """True if the client asked for an XML response."""
+        return "xml" in (self.headers.get("Accept") or "")
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+
+    def handle_any(self):
+        """Handle a request of any method."""
+        fake = self.fake
+        parts = urlsplit(self.path)
+        path = unquote(parts.path).strip("/")
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        with fake._lock:  # pylint: disable=protected-access
+            fake.stats["requests"] += 1
+            if fake.log_requests:
+                fake.request_log.append((self.command, self.path))
+
+        if not path.startswith(_EXEMPT_PATHS):
+            fake.delay()
+            fault = fake.injected_fault()
+            if fault:
+                status, retry_after = fault
+                self.discard_body()
+                headers = {"Retry-After": retry_after} if retry_after else None
+                if status == 429:
+                    self.send(429, {"httpStatus": 429, "errors": []}, headers=headers)
+                else:
+                    self.send_error_page(status, "Injected failure", headers=headers)
+                return
+
+        try:
+            if path == "api/schema":
+                self.send(200, fake.jpapi_schema())
+            elif path == "classicapi/doc/swagger.yaml":
+                self.send(200, fake.classic_schema(), content_type="application/x-yaml")
+            elif path.startswith("api/v1/auth") or path == "api/v1/oauth/token":
+                self.handle_auth(path)
+            elif not fake.check_auth(self.headers.get("Authorization")):
+                self.discard_body()
+                self.send(401, {"httpStatus": 401, "errors": []})
+            elif path.startswith("JSSResource/"):
+                self.handle_classic(path[len("JSSResource/") :])
+            elif path.startswith("api/"):
+                self.handle_jpapi(path[len("api/") :], query)
+            else:
+                self.send_error_page(404, "Not Found")
+        except (ValueError, ET.ParseError) as e:
+            self.send(400, {"httpStatus": 400, "errors": [{"description": str(e)}]})
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = handle_any  # pylint: disable=invalid-name
+
+    # ------------------------------------------------------------------
+    # Token endpoints
+    # ------------------------------------------------------------------
+
+    def handle_auth(self, path):
+        """api/v1/auth/token, api/v1/oauth/token and api/v1/auth."""
+        fake = self.fake
+        body = self.read_body()
+        if path == "api/v1/auth/token" and self.command == "POST":
+            auth = self.headers.get("Authorization") or ""
+            if not auth.lower().startswith("basic") or not fake.check_auth(auth):
+                self.send(401, {"httpStatus": 401, "errors": []})
+                return
+            token, expires = fake.issue_token()
+            self.send(
+                200,
+                {"token": token, "expires": expires.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"},
+            )
+        elif path == "api/v1/oauth/token" and self.command == "POST":
+            form = {k: v[-1] for k, v in parse_qs(body.decode("utf-8")).items()}
+            if fake.clients.get(form.get("client_id")) != form.get("client_secret"):
+                self.send(401, {"error": "invalid_client"})
+                return
+            token, _ = fake.issue_token()
+            self.send(
+                200,
+                {
+                    "access_token": token,
+                    "scope": "api-role:1",
+                    "token_type": "Bearer",
+                    "expires_in": fake.token_lifetime - 1,
+                },
+            )
+        elif not fake.check_auth(self.headers.get("Authorization")):
+            self.send(401, {"httpStatus": 401, "errors": []})
+        elif path == "api/v1/auth":
+            self.send(200, {"account": {"username": DEFAULT_USER}})
+        elif path == "api/v1/auth/keep-alive":
+            token, expires = fake.issue_token()
+            self.send(200, {"token": token, "expires": expires.isoformat()})
+        elif path == "api/v1/auth/invalidate-token":
+            bearer = self.headers.get("Authorization", "").partition(" ")[2]
+            with fake._lock:  # pylint: disable=protected-access
+                fake.tokens.pop(bearer, None)
+            self.send(204)
+        else:
+            self.send_error_page(404, "Not Found")
+
+    # ------------------------------------------------------------------
+    # Classic API
+    # ------------------------------------------------------------------
+
+    def classic_response(self, status, resource, obj):
+        """Send a Classic object in JSON or XML as requested."""
+        element = singular(classic_list_key(resource))
+        if self.wants_xml() or self.command != "GET":
+            xml = ET.tostring(dict_to_xml(element, obj), encoding="unicode")
+            self.send(
+                status,
+                f'<?xml version="1.0" encoding="UTF-8"?>{xml}',
+                content_type="application/xml",
+            )
+        else:
+            self.send(status, {element: obj})
+
+    def handle_classic(self, path):
+        """JSSResource/<resource>[/id|name/<key>[/subset/<subsets>]]"""
+        fake = self.fake
+        segments = path.split("/")
+        resource = segments[0]
+        store = fake.classic.get(resource)
+        if len(segments) == 1:
+            if self.command != "GET" or store is None:
+                self.send_error_page(404, "Not Found")
+                return
+            with fake._lock:  # pylint: disable=protected-access
+                items = [
+                    {"id": obj_id, "name": _classic_name(obj)}
+                    for obj_id, obj in store.items()
+                ]
+            list_key = classic_list_key(resource)
+            if self.wants_xml():
+                xml = ET.tostring(dict_to_xml(list_key, items), encoding="unicode")
+                self.send(
+                    200,
+                    f'<?xml version="1.0" encoding="UTF-8"?>{xml}',
+                    content_type="application/xml",
+                )
+            else:
+                self.send(200, {list_key: items})
+            return
+
+        if len(segments) < 3 or segments[1] not in ("id", "name"):
+            self.send_error_page(404, "Not Found")
+            return
+        if segments[1] == "name" and resource in NO_NAME_PATH_RESOURCES:
+            self.send_error_page(404, "Not Found")
+            return
+        lookup, key = segments[1], "/".join(segments[2:])
+        subsets = []
+        if "/subset/" in f"/{key}":
+            key, _, subset_str = key.partition("/subset/")
+            subsets = [s.lower() for s in re.split(r"[&,]", subset_str) if s]
+
+        # creating a new object
+        if self.command == "POST":
+            new_obj = xml_to_dict(ET.fromstring(self.read_body()))
+            target = new_obj.get("general", new_obj)
+            if lookup == "name":
+                target["name"] = key
+            target.pop("id", None)
+            obj_id = fake.add_classic_object(resource, new_obj)
+            self.classic_response(201, resource, {"id": obj_id})
+            return
+
+        obj_id, obj = _find_classic(fake, store or {}, lookup, key)
+        if obj is None:
+            self.discard_body()
+            self.send_error_page(404, "Not Found")
+            return
+
+        if self.command == "GET":
+            if subsets:
+                obj = {
+                    k: v
+                    for k, v in obj.items()
+                    if k.replace("_", "").lower() in subsets
+                }
+            self.classic_response(200, resource, obj)
+        elif self.command == "PUT":
+            new_obj = xml_to_dict(ET.fromstring(self.read_body()))
+            target = new_obj.get("general", new_obj)
+            target["id"] = obj_id
+            with fake._lock:  # pylint: disable=protected-access
+                store[obj_id] = _deep_merge(obj, new_obj)
+            self.classic_response(201, resource, {"id": obj_id})
+        elif self.command == "DELETE":
+            with fake._lock:  # pylint: disable=protected-access
+                store.pop(obj_id, None)
+            self.classic_response(200, resource, {"id": obj_id})
+        else:
+            self.send_error_page(405, "Method Not Allowed")
+
+    # ------------------------------------------------------------------
+    # Jamf Pro API
+    # ------------------------------------------------------------------
+
+    def handle_jpapi(self, path, query):
+        """api/vN/<resource>[/<id>[/<action>]] and singleton endpoints."""
+        fake = self.fake
+        if path in fake.singletons:
+            self.handle_singleton(path)
+            return
+        if path == "v1/jcds/files" and self.command == "GET":
+            with fake._lock:  # pylint: disable=protected-access
+                files = list(fake.jcds_files.values())
+            self.send(200, files)
+            return
+        if path in fake.actions and self.command == "POST":
+            self.discard_body()
+            self.send(fake.actions[path])
+            return
+        match = re.match(r"^(v\d+|preview)/(.+)$", path)
+        if not match:
+            self.send_error_page(404, "Not Found")
+            return
+        rest = match.group(2)
+
+        # find the longest known resource path that prefixes the request
+        segments = rest.split("/")
+        resource = None
+        for i in range(len(segments), 0, -1):
+            candidate = "/".join(segments[:i])
+            if candidate in fake.jpapi:
+                resource, remainder = candidate, segments[i:]
+                break
+        if resource is None:
+            if self.command == "POST":
+                resource, remainder = rest, []
+            else:
+                self.send_error_page(404, "Not Found")
+                return
+        store = fake.jpapi.setdefault(resource, {})
+
+        if not remainder:
+            if self.command == "GET":
+                self.jpapi_list(store, query)
+            elif self.command == "POST":
+                obj = json.loads(self.read_body() or b"{}")
+                obj.pop("id", None)
+                obj_id = fake.add_jpapi_object(resource, obj)
+                self.send(201, {"id": obj_id, "href": f"{fake.url}/api/{path}/{obj_id}"})
+            else:
+                self.send_error_page(405, "Method Not Allowed")
+            return
+
+        if remainder == ["delete-multiple"] and self.command == "POST":
+            ids = [str(i) for i in json.loads(self.read_body() or b"{}").get("ids", [])]
+            with fake._lock:  # pylint: disable=protected-access
+                missing = [i for i in ids if i not in store]
+                if missing:
+                    self.send(
+                        404,
+                        {"httpStatus": 404, "errors": [{"id": i} for i in missing]},
+                    )
+                    return
+                for obj_id in ids:
+                    store.pop(obj_id, None)
+            self.send(204)
+            return
+
+        obj_id = remainder[0]
+        obj = store.get(obj_id)
+        if obj is None:
+            self.discard_body()
+            self.send(404, {"httpStatus": 404, "errors": []})
+            return
+
+        if len(remainder) > 1:
+            if remainder[1] == "upload" and self.command == "POST":
+                size, md5 = self.receive_upload()
+                file_name = obj.get("fileName") or obj.get("packageName")
+                with fake._lock:  # pylint: disable=protected-access
+                    fake.uploads[obj_id] = size
+                    fake.jcds_files[file_name] = {
+                        "fileName": file_name,
+                        "length": size,
+                        "md5": md5,
+                        "region": "us-east-1",
+                    }
+                self.send(201, {"id": obj_id, "href": f"{fake.url}/api/{path}"})
+            else:
+                self.send(200, obj.get(remainder[1], {}))
+            return
+
+        if self.command == "GET":
+            self.send(200, obj)
+        elif self.command in ("PUT", "PATCH"):
+            update = json.loads(self.read_body() or b"{}")
+            with fake._lock:  # pylint: disable=protected-access
+                if self.command == "PUT":
+                    obj = update
+                else:
+                    obj = _deep_merge(obj, update)
+                obj["id"] = obj_id
+                store[obj_id] = obj
+            self.send(200, obj)
+        elif self.command == "DELETE":
+            with fake._lock:  # pylint: disable=protected-access
+                store.pop(obj_id, None)
+            self.send(204)
+        else:
+            self.send_error_page(405, "Method Not Allowed")
+
+    def jpapi_list(self, store, query):
+        """Send a page of results with totalCount."""
+        page = int(query.get("page", 0))
+        page_size = int(query.get("page-size", query.get("pageSize", 100)))
+        if page_size > MAX_PAGE_SIZE:
+            raise ValueError(f"page-size must not exceed {MAX_PAGE_SIZE}")
+        with self.fake._lock:  # pylint: disable=protected-access
+            results = list(store.values())
+        if query.get("filter"):
+            results = [obj for obj in results if rsql_match(obj, query["filter"])]
+        for sort in reversed((query.get("sort") or "id:asc").split(",")):
+            field, _, direction = sort.partition(":")
+            results.sort(
+                key=lambda obj, f=field: _sort_key(get_field(obj, f)),
+                reverse=direction.lower() == "desc",
+            )
+        start = page * page_size
+        self.send(
+            200,
+            {"totalCount": len(results), "results": results[start : start + page_size]},
+        )
+
+    def handle_singleton(self, path):
+        """GET/PUT/PATCH a settings endpoint."""
+        fake = self.fake
+        with fake._lock:  # pylint: disable=protected-access
+            obj = fake.singletons[path]
+            if self.command == "GET":
+                pass
+            elif self.command == "PUT":
+                obj = json.loads(self.read_body() or b"{}")
+            elif self.command == "PATCH":
+                obj = _deep_merge(obj, json.loads(self.read_body() or b"{}"))
+            else:
+                self.send_error_page(405, "Method Not Allowed")
+                return
+            fake.singletons[path] = obj
+        self.send(200, obj)
+
+
+def _classic_name(obj):
+    """Return the name of a Classic object."""
+    if isinstance(obj.get("general"), dict):
+        return obj["general"].get("name", "")
+    return obj.get("name", "")
+
+
+def _find_classic(fake, store, lookup, key):
+    """Find a Classic object by id or (case-insensitive) name."""
+    with fake._lock:  # pylint: disable=protected-access
+        if lookup == "id":
+            try:
+                obj_id = int(key)
+            except ValueError:
+                return None, None
+            return obj_id, store.get(obj_id)
+        for obj_id, obj in store.items():
+            if _classic_name(obj).lower() == key.lower():
+                return obj_id, obj
+    return None, None
+
+
+def _deep_merge(base, update):
+    """Return base updated recursively with update."""
+    merged = dict(base)
+    for key, value in update.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def seed(
+    server,
+    policies=0,
+    packages=0,
+    categories=0,
+    computer_groups=0,
+    prestages=0,
+    patch_titles=0,
+):  # pylint: disable=too-many-arguments
+    """Populate a server with sample objects.
+
+    Packages exist in both the Classic API and the Jamf Pro API with the same
+    ids. Each policy references one package and one category, and each
+    PreStage and patch title references a package. The policy, package,
+    PreStage and patch title resources always exist, even if empty.
+    """
+    for resource in ("policies", "packages", "patchsoftwaretitles"):
+        server.classic.setdefault(resource, {})
+    for resource in ("packages", "computer-prestages"):
+        server.jpapi.setdefault(resource, {})
+    category_names = [f"Category {i:05d}" for i in range(categories)]
+    for name in category_names:
+        cat_id = server.add_classic_object("categories", {"name": name, "priority": 9})
+        server.add_jpapi_object("categories", {"id": cat_id, "name": name, "priority": 9})
+    package_ids = []
+    for i in range(packages):
+        name = f"Package-{i:05d}.pkg"
+        pkg_id = server.add_jpapi_object(
+            "packages",
+            {
+                "packageName": name,
+                "fileName": name,
+                "categoryId": "-1",
+                "priority": 10,
+                "hashType": "SHA3_512",
+                "hashValue": "",
+            },
+        )
+        server.add_classic_object(
+            "packages", {"id": int(pkg_id), "name": name, "filename": name}
+        )
+        package_ids.append((int(pkg_id), name))
+    for i in range(prestages):
+        server.add_jpapi_object(
+            "computer-prestages",
+            {
+                "displayName": f"PreStage {i:05d}",
+                "customPackageIds": (
+                    [str(package_ids[i % len(package_ids)][0])] if package_ids else []
+                ),
+            },
+        )
+    for i in range(patch_titles):
+        versions = []
+        if package_ids:
+            pkg_id, pkg_name = package_ids[-1 - (i % len(package_ids))]
+            versions = [
+                {"software_version": "1.0", "package": {"id": pkg_id, "name": pkg_name}},
+                {"software_version": "0.9"},
+            ]
+        server.add_classic_object(
+            "patchsoftwaretitles",
+            {"name": f"Patch Title {i:05d}", "name_id": f"TITLE{i}", "versions": versions},
+        )
+    for i in range(computer_groups):
+        server.add_classic_object(
+            "computergroups",
+            {"name": f"Group {i:05d}", "is_smart": False, "computers": []},
+        )
+    for i in range(policies):
+        pkg_refs = []
+        if package_ids:
+            pkg_id, pkg_name = package_ids[i % len(package_ids)]
+            pkg_refs = [{"id": pkg_id, "name": pkg_name, "action": "Install"}]
+        server.add_classic_object(
+            "policies",
+            {
+                "general": {
+                    "name": f"Policy {i:05d}",
+                    "enabled": True,
+                    "category": {
+                        "id": -1,
+                        "name": category_names[i % len(category_names)]
+                        if category_names
+                        else "No category assigned",
+                    },
+                },
+                "scope": {"all_computers": False, "computer_groups": []},
+                "package_configuration": {"packages": pkg_refs},
+                "scripts": [],
+            },
+        )
+
+
+def main():
+    """Run the server in the foreground."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--error-status", type=int, action="append", help="may be repeated (default 500)"
+    )
+    parser.add_argument("--rate-limit", type=float, help="requests per second")
+    parser.add_argument("--rate-limit-burst", type=float)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policies", type=int, default=0)
+    parser.add_argument("--packages", type=int, default=0)
+    parser.add_argument("--categories", type=int, default=0)
+    parser.add_argument("--computer-groups", type=int, default=0)
+    parser.add_argument("--prestages", type=int, default=0)
+    parser.add_argument("--patch-titles", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeJamfServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        error_statuses=args.error_status or (500,),
+        rate_limit=args.rate_limit,
+        rate_limit_burst=args.rate_limit_burst,
+        seed=args.seed,
+    )
+    seed(
+        server,
+        policies=args.policies,
+        packages=args.packages,
+        categories=args.categories,
+        computer_groups=args.computer_groups,
+        prestages=args.prestages,
+        patch_titles=args.patch_titles,
+    )
+    print(f"Fake Jamf Pro server listening on {server.url}")
+    print(f"User: {DEFAULT_USER} / {DEFAULT_PASSWORD}")
+    print(f"API client: {DEFAULT_CLIENT_ID} / {DEFAULT_CLIENT_SECRET}")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/local/autopkg/python
+"""Test script for JamfExportArchive — single-file JSON Lines and tar exports."""
+
+import gzip
+import json
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "..",
+        "JamfUploaderProcessors",
+        "JamfUploaderLib",
+    ),
+)
+
+from JamfExportArchive import (  # pylint: disable=import-error, wrong-import-position
+    JamfExportArchive,
+    index_path,
+    read_record,
+)
+
+OBJECTS = [
+    ("1", "Firefox", {"name": "Firefox", "scriptContents": "#!/bin/sh"}),
+    ("2", "Zoom", {"name": "Zoom", "scriptContents": "#!/bin/zsh"}),
+    ("3", "Firefox", {"name": "Firefox", "scriptContents": "#!/bin/bash"}),
+    ("4", "Ünïcode", "<policy><general><name>Ünïcode</name></general></policy>"),
+]
+
+
+def write_archive(path, archive_format):
+    """Write OBJECTS to an archive."""
+    with JamfExportArchive(path, archive_format, "script") as archive:
+        for object_id, name, content in OBJECTS:
+            archive.add(object_id, name, content, f"test-scripts-{name}.json")
+
+
+if __name__ == "__main__":
+    output_dir = tempfile.mkdtemp()
+
+    # --- Test 1: JSON Lines archives can be read in full and by name ---
+    path = os.path.join(output_dir, "test-scripts.jsonl.gz")
+    write_archive(path, "jsonl")
+    with gzip.open(path, "rt", encoding="utf-8") as fp:
+        records = [json.loads(line) for line in fp]
+    assert [r["id"] for r in records] == ["1", "2", "3", "4"], records
+    assert records[1] == {
+        "id": "2",
+        "name": "Zoom",
+        "type": "script",
+        "content": OBJECTS[1][2],
+    }, records[1]
+    firefox = read_record(path, "Firefox")
+    assert [r["content"] for r in firefox] == [OBJECTS[0][2], OBJECTS[2][2]], firefox
+    assert read_record(path, "Ünïcode")[0]["content"] == OBJECTS[3][2]
+    assert read_record(path, "Missing") == []
+    print("PASS: JSON Lines archive and index")
+
+    # --- Test 2: tar archives hold the export files, found by name ---
+    path = os.path.join(output_dir, "test-scripts.tar")
+    write_archive(path, "tar")
+    with tarfile.open(path) as tar:
+        members = tar.getmembers()
+        assert members[1].name == "test-scripts-Zoom.json", members[1].name
+        assert members[1].pax_headers["JAMF.id"] == "2", members[1].pax_headers
+        assert json.load(tar.extractfile(members[1])) == OBJECTS[1][2]
+    zoom = read_record(path, "Zoom")
+    assert json.loads(zoom[0]["content"]) == OBJECTS[1][2], zoom
+    assert read_record(path, "Ünïcode")[0]["content"] == OBJECTS[3][2]
+    assert [r["id"] for r in read_record(path, "Firefox")] == ["1", "3"]
+    print("PASS: tar archive and index")
+
+    # --- Test 3: a failed export leaves the previous archive in place ---
+    try:
+        with JamfExportArchive(path, "tar", "script") as archive:
+            archive.add("5", "Partial", "{}", "test-scripts-Partial.json")
+            raise RuntimeError("interrupted")
+    except RuntimeError:
+        pass
+    assert read_record(path, "Partial") == [] and read_record(path, "Zoom")
+    assert sorted(os.listdir(output_dir)) == sorted(
+        [
+            "test-scripts.jsonl.gz",
+            "test-scripts.tar",
+            os.path.basename(index_path(path)),
+            "test-scripts.jsonl.gz.index.json",
+        ]
+    ), os.listdir(output_dir)
+    print("PASS: interrupted export discarded")
+
+    shutil.rmtree(output_dir)
+    print("\nAll tests passed.")
@@ -0,0 +1,167 @@
+#!/usr/local/autopkg/python
+"""Test script for fake_jamf_server — the local stand-in Jamf Pro server."""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import urllib.error
+import urllib.request
+
+from base64 import b64encode
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "..",
+        "JamfUploaderProcessors",
+        "JamfUploaderLib",
+    ),
+)
+
+from fake_jamf_server import (  # pylint: disable=import-error, wrong-import-position
+    DEFAULT_PASSWORD,
+    DEFAULT_USER,
+    FakeJamfServer,
+    rsql_match,
+    seed,
+)
+from JamfSchemaRegistry import (  # pylint: disable=import-error, wrong-import-position
+    JamfSchemaRegistry,
+)
+
+
+def call(method, path, token=None, body=None, headers=None):
+    """Make a request and return (status, headers, body)."""
+    req = urllib.request.Request(f"{server.url}/{path}", data=body, method=method)
+    if token:
+        req.add_header("Authorization", f"Bearer {token}")
+    for name, value in (headers or {}).items():
+        req.add_header(name, value)
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return resp.status, resp.headers, resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+server = FakeJamfServer().start()
+seed(server, policies=25, packages=250, categories=3)
+
+# --- Test 1: RSQL matching ---
+pkg = {"id": "7", "packageName": "Firefox-120.pkg", "priority": 10}
+assert rsql_match(pkg, 'packageName=="Firefox-120.pkg"')
+assert rsql_match(pkg, "packageName==firefox*")
+assert rsql_match(pkg, "packageName=in=(Chrome.pkg,Firefox-120.pkg)")
+assert not rsql_match(pkg, "packageName=out=(Chrome.pkg,Firefox-120.pkg)")
+assert rsql_match(pkg, "priority=gt=5;id==7")
+assert rsql_match(pkg, "priority=lt=5,id==7")
+print("PASS: RSQL filters")
+
+# --- Test 2: authentication ---
+status, _, _ = call("GET", "api/v1/packages")
+assert status == 401, status
+creds = b64encode(f"{DEFAULT_USER}:{DEFAULT_PASSWORD}".encode()).decode()
+status, _, body = call(
+    "POST", "api/v1/auth/token", headers={"Authorization": f"Basic {creds}"}
+)
+assert status == 200, status
+token = json.loads(body)["token"]
+assert json.loads(body)["expires"].endswith("Z")
+print("PASS: token endpoint")
+
+# --- Test 3: JPAPI pagination, sort and filter ---
+status, _, body = call("GET", "api/v1/packages?page=2&page-size=100&sort=id:desc", token)
+data = json.loads(body)
+assert data["totalCount"] == 250
+assert len(data["results"]) == 50
+assert int(data["results"][0]["id"]) > int(data["results"][-1]["id"])
+status, _, body = call(
+    "GET", "api/v1/packages?filter=packageName%3D%3D%22Package-00042.pkg%22", token
+)
+assert [r["packageName"] for r in json.loads(body)["results"]] == ["Package-00042.pkg"]
+pkg_id = json.loads(body)["results"][0]["id"]
+print("PASS: JPAPI pagination, sort and filter")
+
+# --- Test 4: package uploads are listed in v1/jcds/files ---
+content = os.urandom(100000)
+boundary = "------------------------testboundary"
+body = (
+    f"--{boundary}\r\n"
+    'Content-Disposition: form-data; name="file"; filename="Package-00042.pkg"\r\n'
+    "Content-Type: application/octet-stream\r\n\r\n"
+).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+status, _, _ = call(
+    "POST",
+    f"api/v1/packages/{pkg_id}/upload",
+    token,
+    body=body,
+    headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+)
+assert status == 201, status
+status, _, body = call("GET", "api/v1/jcds/files", token)
+files = json.loads(body)
+assert [f["fileName"] for f in files] == ["Package-00042.pkg"], files
+assert files[0]["md5"] == hashlib.md5(content).hexdigest(), files
+print("PASS: package uploads listed with their MD5 hash")
+
+# --- Test 5: Classic API objects, subsets and XML ---
+status, _, body = call("GET", "JSSResource/policies", token)
+policies = json.loads(body)["policies"]
+assert len(policies) == 25
+policy_id = policies[0]["id"]
+status, _, body = call("GET", f"JSSResource/policies/id/{policy_id}/subset/General", token)
+assert list(json.loads(body)["policy"]) == ["general"]
+status, _, body = call(
+    "GET",
+    "JSSResource/policies/name/Policy%2000001",
+    token,
+    headers={"Accept": "application/xml"},
+)
+assert b"<policy><general>" in body
+status, _, body = call(
+    "POST",
+    "JSSResource/categories/id/0",
+    token,
+    body=b"<category><name>New</name><priority>5</priority></category>",
+)
+assert status == 201 and b"<id>" in body
+status, _, body = call("GET", "JSSResource/categories/name/new", token)
+assert json.loads(body)["category"]["priority"] == 5
+print("PASS: Classic API objects")
+
+# --- Test 6: fault injection and rate limiting ---
+server.fail_next(2, status=503)
+assert call("GET", "api/v1/packages", token)[0] == 503
+assert call("GET", "api/v1/packages", token)[0] == 503
+assert call("GET", "api/v1/packages", token)[0] == 200
+server.rate_limit, server.rate_limit_burst = 1, 1
+statuses = [call("GET", "api/v1/packages", token)[:2] for _ in range(3)]
+assert [s for s, _ in statuses].count(429) >= 1, statuses
+assert [h for s, h in statuses if s == 429][0]["Retry-After"] == "1"
+server.rate_limit = None
+print("PASS: fault injection and rate limiting")
+
+# --- Test 7: schemas load into the registry ---
+cache_dir = tempfile.mkdtemp()
+registry = JamfSchemaRegistry(server.url, cache_dir)
+
+
+def fetch(url):
+    """Fetch a schema without authentication."""
+    status, _, body = call("GET", url[len(server.url) + 1 :])
+    return status, body.decode("utf-8")
+
+
+registry.load_schemas(fetch)
+assert "policies" in registry.get_classic_resources()
+assert registry.resolve("policy")["api_type"] == "classic"
+shutil.rmtree(cache_dir)
+print("PASS: schemas")
+
+server.stop()
+print("\nAll tests passed.")
@@ -0,0 +1,130 @@
+#!/usr/local/autopkg/python
+"""Test script for JamfFileDigests — several hashes of a file in one read, and the
+persistent digest cache."""
+
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "..",
+        "JamfUploaderProcessors",
+        "JamfUploaderLib",
+    ),
+)
+
+import JamfFileDigests  # pylint: disable=import-error, wrong-import-position
+from JamfFileDigests import (  # pylint: disable=import-error, wrong-import-position
+    DIGEST_ALGORITHMS,
+    HASH_BUFFER_SIZE,
+    JamfDigestCache,
+    file_digests,
+)
+
+
+def expected(data, algorithms):
+    """Return the digests of data calculated with hashlib directly."""
+    return {name: hashlib.new(name, data).hexdigest() for name in algorithms}
+
+
+if __name__ == "__main__":
+    work_dir = tempfile.mkdtemp()
+    files = {
+        "empty": b"",
+        "small": b"Jamf",
+        # spans several reads, ending part way through one
+        "large": os.urandom(2 * HASH_BUFFER_SIZE + 12345),
+    }
+    for name, data in files.items():
+        with open(os.path.join(work_dir, name), "wb") as fp:
+            fp.write(data)
+
+    # --- Test 1: each digest matches hashlib ---
+    for name, data in files.items():
+        for algorithm in DIGEST_ALGORITHMS:
+            path = os.path.join(work_dir, name)
+            assert file_digests(path, [algorithm]) == expected(data, [algorithm])
+    print("PASS: single digests")
+
+    # --- Test 2: several digests in one pass, with and without threads ---
+    for cpu_count in (1, 4):
+        JamfFileDigests.os.cpu_count = lambda n=cpu_count: n
+        for name, data in files.items():
+            path = os.path.join(work_dir, name)
+            digests = file_digests(path, DIGEST_ALGORITHMS + ("md5",))
+            assert digests == expected(data, DIGEST_ALGORITHMS), name
+    print("PASS: multiple digests")
+
+    # --- Test 3: unknown algorithms are refused ---
+    try:
+        file_digests(os.path.join(work_dir, "small"), ["crc32"])
+        raise AssertionError("crc32 accepted")
+    except ValueError:
+        pass
+    print("PASS: unknown algorithm refused")
+
+    # --- Test 4: the cache is used until the file changes ---
+    messages = []
+    cache = JamfDigestCache(
+        os.path.join(work_dir, "cache"),
+        log_fn=lambda msg, verbose_level=2: messages.append(msg),
+    )
+    path = os.path.join(work_dir, "large")
+    data = files["large"]
+
+    def hashed(algorithms):
+        """Return the digests from the cache, and whether the file was read."""
+        messages.clear()
+        digests = cache.file_digests(path, algorithms)
+        return digests, any(m.startswith("Calculated") for m in messages)
+
+    assert hashed(["sha3_512"]) == (expected(data, ["sha3_512"]), True)
+    assert hashed(["sha3_512"]) == (expected(data, ["sha3_512"]), False)
+    # only the missing digest is calculated
+    assert hashed(["sha3_512", "md5"]) == (expected(data, ["sha3_512", "md5"]), True)
+    assert messages[0].startswith("Calculated md5 "), messages
+    assert hashed(["md5"]) == (expected(data, ["md5"]), False)
+    # the same size, rewritten in place
+    time.sleep(0.01)
+    data = data[:-1] + bytes([data[-1] ^ 1])
+    with open(path, "r+b") as fp:
+        fp.seek(len(data) - 1)
+        fp.write(data[-1:])
+    assert hashed(["md5"]) == (expected(data, ["md5"]), True)
+    # replaced by another file
+    os.replace(os.path.join(work_dir, "small"), path)
+    assert hashed(["md5"]) == (expected(files["small"], ["md5"]), True)
+    print("PASS: digest cache hits and invalidation")
+
+    # --- Test 5: runs sharing a cache don't see each other's partial writes ---
+    errors = []
+
+    def run():
+        try:
+            for _ in range(20):
+                other = JamfDigestCache(cache.cache_dir)
+                assert other.file_digests(path, ["sha256", "md5"]) == expected(
+                    files["small"], ["sha256", "md5"]
+                )
+                os.utime(path)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors, errors
+    assert os.listdir(cache.cache_dir) == [os.path.basename(cache.path(path))]
+    print("PASS: concurrent use of a cache")
+
+    shutil.rmtree(work_dir)
+    print("\nAll tests passed.")
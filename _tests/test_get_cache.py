@@ -0,0 +1,157 @@
+#!/usr/local/autopkg/python
+"""Test script for the per-run GET response cache in JamfUploaderBase.curl().
+
+Requires AutoPkg (autopkglib), so run it directly rather than through pytest.
+"""
+
+import os
+import sys
+import threading
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def main():
+    """Run the tests."""
+    sys.path.insert(0, "/Library/AutoPkg")
+    sys.path.insert(0, TESTS_DIR)
+    sys.path.insert(
+        0, os.path.join(TESTS_DIR, "..", "JamfUploaderProcessors", "JamfUploaderLib")
+    )
+    # pylint: disable=import-error, import-outside-toplevel
+    from fake_jamf_server import DEFAULT_PASSWORD, DEFAULT_USER, FakeJamfServer
+    from JamfUploaderBase import JamfUploaderBase
+
+    class Reader(JamfUploaderBase):
+        """Minimal processor used to send requests."""
+
+        description = __doc__
+        input_variables = {}
+        output_variables = {}
+
+    server = FakeJamfServer(latency=0.2).start()
+    processor = Reader(
+        env={
+            "JSS_URL": server.url,
+            "verbose": 0,
+            "http_get_cache_size": "2",
+            "http_engine": os.environ.get("JAMFUPLOAD_HTTP_ENGINE", "curl"),
+        }
+    )
+    token = processor.get_api_token_from_basic_auth(
+        server.url, DEFAULT_USER, DEFAULT_PASSWORD
+    )
+    server.add_jpapi_object("categories", {"name": "Testing", "priority": 9})
+    classic_url = f"{server.url}/JSSResource/categories"
+    jpapi_url = f"{server.url}/api/v1/categories"
+
+    def get(url, api_type="classic"):
+        return processor.curl(api_type=api_type, request="GET", url=url, token=token)
+
+    def sent(action):
+        before = server.stats["requests"]
+        result = action()
+        return result, server.stats["requests"] - before
+
+    # --- Test 1: repeated GETs are answered from the cache ---
+    r, count = sent(lambda: get(jpapi_url, "jpapi"))
+    assert r.status_code == 200 and count == 1, (r.status_code, count)
+    r.output["results"].clear()
+    r, count = sent(lambda: get(jpapi_url, "jpapi"))
+    assert count == 0 and r.output["results"], (count, r.output)
+    print("PASS: repeated GET served from cache, and callers get a copy")
+
+    # --- Test 2: a write clears the resource across both APIs ---
+    get(classic_url)
+    processor.curl(
+        api_type="jpapi",
+        request="POST",
+        url=jpapi_url,
+        token=token,
+        data=processor.write_json_file(server.url, {"name": "New", "priority": 9}),
+    )
+    _, count = sent(lambda: get(classic_url))
+    assert count == 1, count
+    _, count = sent(lambda: get(jpapi_url, "jpapi"))
+    assert count == 1, count
+    print("PASS: POST invalidates Classic and Jamf Pro API responses")
+
+    # --- Test 3: least recently used responses are dropped ---
+    get(f"{jpapi_url}/1", "jpapi")
+    _, count = sent(lambda: get(classic_url))
+    assert count == 1, count
+    print("PASS: LRU bound respected")
+
+    # --- Test 4: failed responses are not cached ---
+    server.fail_next(1, status=500)
+    url = f"{server.url}/api/v1/categories/2"
+    assert get(url, "jpapi").status_code == 500
+    r, count = sent(lambda: get(url, "jpapi"))
+    assert r.status_code == 200 and count == 1, (r.status_code, count)
+    print("PASS: errors not cached")
+
+    # --- Test 5: concurrent identical GETs are sent once ---
+    object_id = server.add_classic_object("categories", {"name": "Classic"})
+    url = f"{server.url}/JSSResource/categories/id/{object_id}"
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(get(url))) for _ in range(5)
+    ]
+    before = server.stats["requests"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert server.stats["requests"] - before == 1, server.stats["requests"] - before
+    assert all(r.status_code == 200 for r in results)
+    print("PASS: concurrent requests coalesced")
+
+    # --- Test 6: collections named differently in the two APIs are aliased ---
+    patch_url = f"{server.url}/JSSResource/patchsoftwaretitles"
+    get(patch_url)
+    processor.curl(
+        api_type="jpapi",
+        request="POST",
+        url=f"{server.url}/api/v2/patch-software-title-configurations",
+        token=token,
+        data=processor.write_json_file(server.url, {"displayName": "Firefox"}),
+    )
+    _, count = sent(lambda: get(patch_url))
+    assert count == 1, count
+    print("PASS: Jamf Pro API write clears the aliased Classic API resource")
+
+    # --- Test 7: responses are kept apart by format and credentials ---
+    object_id = server.add_classic_object("patchsoftwaretitles", {"name": "Zoom"})
+    url = f"{patch_url}/id/{object_id}"
+    assert isinstance(get(url).output, dict)
+    r, count = sent(
+        lambda: processor.curl(
+            api_type="classic",
+            request="GET",
+            url=url,
+            token=token,
+            endpoint_type="patch_software_title",
+        )
+    )
+    assert count == 1 and not isinstance(r.output, dict), (count, r.output)
+    other_token = processor.get_api_token_from_basic_auth(
+        server.url, DEFAULT_USER, DEFAULT_PASSWORD
+    )
+    _, count = sent(
+        lambda: processor.curl(
+            api_type="classic", request="GET", url=url, token=other_token
+        )
+    )
+    assert count == 1, count
+    print("PASS: XML and JSON responses, and other tokens, are cached separately")
+
+    stats = JamfUploaderBase._response_cache.stats  # pylint: disable=protected-access
+    assert stats["hits"] >= 1 and stats["coalesced"] >= 1 and stats["evictions"] >= 1
+    print(f"Cache stats: {stats}")
+
+    server.stop()
+    print("\nAll tests passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/local/autopkg/python
+"""Test script for JamfHTTPTransport — curl argument translation and pooling."""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "..",
+        "JamfUploaderProcessors",
+        "JamfUploaderLib",
+    ),
+)
+
+from JamfHTTPTransport import (  # pylint: disable=import-error, wrong-import-position
+    JamfHTTPTransport,
+    UnsupportedCurlOption,
+    request_from_curl_args,
+)
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Echo the request back as JSON."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _reply(self):
+        if self.path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/echo")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length).decode("utf-8", "replace")
+        payload = json.dumps(
+            {
+                "method": self.command,
+                "path": self.path,
+                "headers": dict(self.headers.items()),
+                "body": body,
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Set-Cookie", "session=abc; Path=/")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _reply  # pylint: disable=invalid-name
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Silence request logging."""
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+base = f"http://127.0.0.1:{server.server_port}"
+transport = JamfHTTPTransport()
+
+# --- Test 1: curl argument translation ---
+kwargs = request_from_curl_args(
+    [
+        "--location",
+        "--dump-header",
+        "/tmp/h.txt",
+        f"{base}/echo",
+        "--header",
+        "Accept: application/json",
+        "--silent",
+        "--data-urlencode",
+        "client_id=a b",
+        "--data-urlencode",
+        "grant_type=client_credentials",
+    ]
+)
+assert kwargs["method"] == "POST", kwargs
+assert kwargs["follow_redirects"] is True
+assert kwargs["body"] == ("bytes", b"client_id=a+b&grant_type=client_credentials")
+assert ("Content-Type", "application/x-www-form-urlencoded") in kwargs["headers"]
+print("PASS: curl argument translation")
+
+try:
+    request_from_curl_args([f"{base}/echo", "--max-time", "5"])
+    raise AssertionError("unsupported option was accepted")
+except UnsupportedCurlOption:
+    print("PASS: unsupported options are rejected")
+
+# --- Test 2: GET over a reused connection, cookies returned ---
+r = transport.request("GET", f"{base}/echo", headers=[("Accept", "application/json")])
+assert r.status_code == 200
+assert r.header_lines[0] == "HTTP/1.1 200 OK", r.header_lines[0]
+r = transport.request("GET", f"{base}/echo")
+assert json.loads(r.body)["headers"].get("Cookie") == "session=abc"
+assert transport.stats["connections_opened"] == 1, transport.stats
+assert transport.stats["connections_reused"] == 1, transport.stats
+print("PASS: keep-alive connection reuse and cookies")
+
+# --- Test 3: upload-file and multipart form bodies ---
+with tempfile.NamedTemporaryFile("w", suffix=".xml", delete=False) as fp:
+    fp.write("<category><name>Test</name></category>")
+r = transport.request(**request_from_curl_args([f"{base}/echo", "--upload-file", fp.name]))
+echo = json.loads(r.body)
+assert echo["method"] == "PUT"
+assert echo["body"] == "<category><name>Test</name></category>"
+
+r = transport.request(
+    **request_from_curl_args(
+        [
+            f"{base}/echo",
+            "--header",
+            "Content-type: multipart/form-data",
+            "--form",
+            f"file=@{fp.name};type=image/png",
+        ]
+    )
+)
+echo = json.loads(r.body)
+assert echo["method"] == "POST"
+assert echo["headers"]["Content-Type"].startswith("multipart/form-data; boundary=")
+assert 'filename="' + os.path.basename(fp.name) + '"' in echo["body"]
+assert "Content-Type: image/png" in echo["body"]
+assert "<category><name>Test</name></category>" in echo["body"]
+os.remove(fp.name)
+print("PASS: upload-file and multipart bodies")
+
+# --- Test 4: redirects ---
+r = transport.request("GET", f"{base}/redirect", follow_redirects=True)
+assert r.status_code == 200
+assert json.loads(r.body)["path"] == "/echo"
+assert r.header_lines[0].startswith("HTTP/1.1 302")
+print("PASS: redirects are followed")
+
+transport.close()
+server.shutdown()
+print("\nAll tests passed.")
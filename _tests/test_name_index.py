@@ -0,0 +1,173 @@
+#!/usr/local/autopkg/python
+"""Test script for name lookups: the name endpoint and persistent name index used
+for Classic API objects by get_api_object_id_from_name(), and the bulk lookups
+of get_api_object_ids_from_names().
+
+Requires AutoPkg (autopkglib), so run it directly rather than through pytest.
+"""
+
+import os
+import shutil
+import sys
+import time
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+POLICY_XML = "<policy><general><name>{}</name></general></policy>"
+
+
+def main():
+    """Run the tests."""
+    sys.path.insert(0, "/Library/AutoPkg")
+    sys.path.insert(0, TESTS_DIR)
+    sys.path.insert(
+        0, os.path.join(TESTS_DIR, "..", "JamfUploaderProcessors", "JamfUploaderLib")
+    )
+    # pylint: disable=import-error, import-outside-toplevel
+    from fake_jamf_server import DEFAULT_PASSWORD, DEFAULT_USER, FakeJamfServer
+    from JamfUploaderBase import JamfUploaderBase
+
+    class Uploader(JamfUploaderBase):
+        """Minimal processor used to send requests."""
+
+        description = __doc__
+        input_variables = {}
+        output_variables = {}
+
+    server = FakeJamfServer().start()
+    server.add_classic_object("policies", {"general": {"name": "Firefox"}})
+    server.add_classic_object("policies", {"general": {"name": "Google Chrome"}})
+    server.add_classic_object("computergroups", {"name": "Testers"})
+    patch_title_id = server.add_classic_object("patchsoftwaretitles", {"name": "Zoom"})
+
+    def new_processor(**env):
+        # each processor starts as in a new run
+        # pylint: disable=protected-access
+        JamfUploaderBase._response_cache = None
+        JamfUploaderBase._name_indexes_refreshed.clear()
+        return Uploader(
+            env={
+                "JSS_URL": server.url,
+                "verbose": 0,
+                "http_engine": os.environ.get("JAMFUPLOAD_HTTP_ENGINE", "curl"),
+                **env,
+            }
+        )
+
+    processor = new_processor()
+    token = processor.get_api_token_from_basic_auth(
+        server.url, DEFAULT_USER, DEFAULT_PASSWORD
+    )
+    policies_url = f"{server.url}/JSSResource/policies"
+
+    def lookup(proc, name, object_type="policy"):
+        """Return the ID found, and whether each Classic API request sent was an
+        id, name or list request."""
+        server.request_log.clear()
+        object_id = proc.get_api_object_id_from_name(
+            server.url, object_type, name, token
+        )
+        requests = [
+            "id" if "/id/" in path else "name" if "/name/" in path else "list"
+            for _, path in server.request_log
+            if "/JSSResource/" in path
+        ]
+        return object_id, requests
+
+    def write(request, url, name=None):
+        data = ""
+        if name:
+            data = processor.write_temp_file(server.url, POLICY_XML.format(name))
+        return processor.curl(
+            api_type="classic", request=request, url=url, token=token, data=data
+        )
+
+    server.log_requests = True
+
+    # --- Test 1: objects are looked up by name rather than in the full list ---
+    firefox_id, requests = lookup(processor, "Firefox")
+    assert firefox_id and requests == ["name"], (firefox_id, requests)
+    object_id, requests = lookup(processor, "Testers", "computer_group")
+    assert object_id and requests == ["name"], (object_id, requests)
+    print("PASS: direct name lookup, with and without a general subset")
+
+    # --- Test 2: resources without a name path are found in the list ---
+    object_id, requests = lookup(processor, "Zoom", "patch_software_title")
+    assert object_id == patch_title_id and requests == ["list"], (object_id, requests)
+    print("PASS: list lookup where the schema has no name path")
+
+    # --- Test 3: a 404 from the name endpoint means the object does not exist ---
+    assert lookup(processor, "Missing") == (0, ["name"])
+    assert lookup(processor, "FIREFOX") == (firefox_id, ["name"])
+    print("PASS: missing name found without the list, ignoring case")
+
+    # --- Test 4: a name the name endpoint cannot take builds the index ---
+    assert lookup(processor, "Missing/Slash") == (0, ["list"])
+    assert lookup(new_processor(), "FIREFOX") == (firefox_id, [])
+    print("PASS: later lookups answered from the persistent index, ignoring case")
+
+    # --- Test 5: creates, renames and deletes update the index in place ---
+    write("POST", f"{policies_url}/id/0", "Zoom")
+    zoom_id, requests = lookup(new_processor(), "zoom")
+    assert zoom_id and requests == [], (zoom_id, requests)
+    write("PUT", f"{policies_url}/id/{zoom_id}", "Zoom Client")
+    assert lookup(new_processor(), "Zoom Client") == (zoom_id, [])
+    assert lookup(new_processor(), "Zoom") == (0, ["name"])
+    write("DELETE", f"{policies_url}/id/{zoom_id}")
+    assert lookup(new_processor(), "Zoom Client") == (0, ["name"])
+    print("PASS: create, rename and delete keep the index current")
+
+    # --- Test 6: names the index does not know are checked on the server ---
+    server.add_classic_object("policies", {"general": {"name": "Made in the GUI"}})
+    object_id, requests = lookup(new_processor(), "Made in the GUI")
+    assert object_id and requests == ["name"], (object_id, requests)
+    print("PASS: index misses fall back to the server")
+
+    # --- Test 7: a failed write drops an entry for an object deleted elsewhere ---
+    del server.classic["policies"][firefox_id]
+    assert lookup(new_processor(), "Firefox") == (firefox_id, [])
+    assert write("PUT", f"{policies_url}/id/{firefox_id}", "Firefox").status_code == 404
+    assert lookup(new_processor(), "Firefox") == (0, ["name"])
+    firefox_id = server.add_classic_object("policies", {"general": {"name": "Firefox"}})
+    assert lookup(new_processor(), "Firefox") == (firefox_id, ["name"])
+    assert lookup(new_processor(), "Firefox") == (firefox_id, [])
+    print("PASS: failed writes keep the index current")
+
+    # --- Test 8: refresh and TTL ---
+    index_file = processor.get_name_index(policies_url).path("policies")
+    assert lookup(new_processor(name_index_refresh="True"), "Firefox")[1] == ["name"]
+    assert not os.path.exists(index_file)
+    lookup(processor, "Missing/Slash")
+    assert lookup(new_processor(), "Firefox")[1] == []
+    processor_short_ttl = new_processor(name_index_ttl="0.5")
+    time.sleep(0.6)
+    assert lookup(processor_short_ttl, "Firefox")[1] == ["name"]
+    assert lookup(new_processor(name_index_ttl="0"), "Firefox")[1] == ["name"]
+    print("PASS: refresh option and TTL expiry")
+
+    # --- Test 9: many Jamf Pro API names are resolved in a few requests ---
+    names = [f'Category "{i}" with a longer name' for i in range(200)]
+    category_ids = {
+        name: server.add_jpapi_object("categories", {"name": name, "priority": 9})
+        for name in names
+    }
+    before = server.stats["requests"]
+    object_ids = processor.get_api_object_ids_from_names(
+        server.url, "category", names + ["Missing", names[0]], token
+    )
+    count = server.stats["requests"] - before
+    assert 1 < count < 20, count
+    assert object_ids == {**category_ids, "Missing": 0}, object_ids
+    object_ids = processor.get_api_object_ids_from_names(
+        server.url, "policy", ["Firefox", "Missing"], token
+    )
+    assert object_ids == {"Firefox": firefox_id, "Missing": 0}, object_ids
+    print(f"PASS: bulk lookup of {len(names)} names in {count} requests")
+
+    server.stop()
+    shutil.rmtree(processor.make_url_specific_dir(server.url), ignore_errors=True)
+    print("\nAll tests passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/local/autopkg/python
+"""Test script for all_objects exports by JamfObjectReader against the fake Jamf
+Pro server: resuming an interrupted export, incremental exports, and objects that
+share a name.
+
+Requires AutoPkg (autopkglib), so run it directly rather than through pytest.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def main():
+    """Run the tests."""
+    sys.path.insert(0, "/Library/AutoPkg")
+    sys.path.insert(0, TESTS_DIR)
+    sys.path.insert(
+        0, os.path.join(TESTS_DIR, "..", "JamfUploaderProcessors", "JamfUploaderLib")
+    )
+    # pylint: disable=import-error, import-outside-toplevel
+    from fake_jamf_server import DEFAULT_PASSWORD, DEFAULT_USER, FakeJamfServer
+    from JamfObjectReaderBase import JamfObjectReaderBase
+    from JamfUploaderBase import JamfUploaderBase
+
+    class Reader(JamfObjectReaderBase):
+        """Object reader that can be stopped part way through an export."""
+
+        description = __doc__
+        input_variables = {}
+        output_variables = {}
+        interrupt_after = None
+
+        def read_object(self, *args, **kwargs):
+            if self.interrupt_after is not None:
+                if self.interrupt_after == 0:
+                    raise KeyboardInterrupt
+                self.interrupt_after -= 1
+            return super().read_object(*args, **kwargs)
+
+    server = FakeJamfServer().start()
+    script_ids = {}
+    for i in range(1, 13):
+        name = f"Script {i:02d}"
+        script_ids[name] = server.add_jpapi_object(
+            "scripts", {"name": name, "scriptContents": f"#!/bin/sh\necho {i}\n"}
+        )
+    subdomain = server.url.partition("://")[2].partition(".")[0]
+
+    def export(output_dir, interrupt_after=None, **env):
+        """Export all scripts, and return the processor and the IDs downloaded."""
+        # each export starts as in a new run
+        # pylint: disable=protected-access
+        JamfUploaderBase._response_cache = None
+        reader = Reader(
+            env={
+                "JSS_URL": server.url,
+                "API_USERNAME": DEFAULT_USER,
+                "API_PASSWORD": DEFAULT_PASSWORD,
+                "verbose": 0,
+                "http_engine": os.environ.get("JAMFUPLOAD_HTTP_ENGINE", "curl"),
+                "object_type": "script",
+                "all_objects": True,
+                "output_dir": output_dir,
+                "download_workers": 1,
+                **env,
+            }
+        )
+        reader.interrupt_after = interrupt_after
+        server.request_log.clear()
+        try:
+            reader.execute()
+        except KeyboardInterrupt:
+            if interrupt_after is None:
+                raise
+        downloaded = [
+            path.partition("?")[0].rpartition("/")[2]
+            for method, path in server.request_log
+            if method == "GET" and "/api/v1/scripts/" in path
+        ]
+        return reader, downloaded
+
+    def script_files(name):
+        return [
+            f"{subdomain}-scripts-{name}.json",
+            f"{subdomain}-scripts-{name}.sh",
+        ]
+
+    def exported_files(output_dir):
+        return sorted(f for f in os.listdir(output_dir) if not f.startswith("."))
+
+    server.log_requests = True
+
+    # --- Test 1: an interrupted export is resumed where it stopped ---
+    output_dir = tempfile.mkdtemp()
+    checkpoint = os.path.join(output_dir, f".{subdomain}-scripts-checkpoint.json")
+    _, downloaded = export(output_dir, interrupt_after=5)
+    assert os.path.isfile(checkpoint), os.listdir(output_dir)
+    with open(checkpoint, "r", encoding="utf-8") as fp:
+        completed = json.load(fp)["completed"]
+    assert completed and len(completed) < len(script_ids), completed
+    assert set(completed) <= set(downloaded), (completed, downloaded)
+    _, downloaded = export(output_dir, resume=True)
+    assert not set(downloaded) & set(completed), (completed, downloaded)
+    assert set(downloaded) | set(completed) == set(script_ids.values()), downloaded
+    assert exported_files(output_dir) == sorted(
+        f for name in script_ids for f in script_files(name)
+    ), exported_files(output_dir)
+    assert not os.path.exists(checkpoint), os.listdir(output_dir)
+    # without resume, the checkpoint of an interrupted export is not used
+    export(output_dir, interrupt_after=3)
+    _, downloaded = export(output_dir)
+    assert sorted(downloaded) == sorted(script_ids.values()), downloaded
+    shutil.rmtree(output_dir)
+    print("PASS: interrupted export resumed from the checkpoint")
+
+    # --- Test 2: incremental exports download only added and changed objects ---
+    output_dir = tempfile.mkdtemp()
+    manifest = os.path.join(output_dir, f".{subdomain}-scripts-manifest.json")
+    reader, downloaded = export(output_dir, incremental=True)
+    assert len(downloaded) == len(script_ids), downloaded
+    assert reader.env["export_changes"] == {
+        "added": len(script_ids),
+        "changed": 0,
+        "removed": 0,
+        "unchanged": 0,
+    }, reader.env["export_changes"]
+
+    added_id = server.add_jpapi_object(
+        "scripts", {"name": "Script 13", "scriptContents": "#!/bin/sh\necho 13\n"}
+    )
+    changed_id = script_ids["Script 04"]
+    server.jpapi["scripts"][changed_id]["scriptContents"] = "#!/bin/sh\necho four\n"
+    removed_id = script_ids.pop("Script 07")
+    del server.jpapi["scripts"][removed_id]
+    script_ids["Script 13"] = added_id
+
+    reader, downloaded = export(output_dir, incremental=True)
+    assert sorted(downloaded) == sorted([added_id, changed_id]), downloaded
+    assert reader.env["export_changes"] == {
+        "added": 1,
+        "changed": 1,
+        "removed": 1,
+        "unchanged": len(script_ids) - 2,
+    }, reader.env["export_changes"]
+    with open(manifest, "r", encoding="utf-8") as fp:
+        objects = json.load(fp)["objects"]
+    assert sorted(objects) == sorted(script_ids.values()), objects
+    assert objects[added_id]["files"] == script_files("Script 13"), objects[added_id]
+    assert exported_files(output_dir) == sorted(
+        f for name in script_ids for f in script_files(name)
+    ), exported_files(output_dir)
+    with open(
+        os.path.join(output_dir, script_files("Script 04")[1]), "r", encoding="utf-8"
+    ) as fp:
+        assert fp.read() == "#!/bin/sh\necho four\n"
+
+    # an export with nothing changed downloads nothing
+    reader, downloaded = export(output_dir, incremental=True)
+    assert downloaded == [] and reader.env["export_changes"]["unchanged"] == len(
+        script_ids
+    ), (downloaded, reader.env["export_changes"])
+    shutil.rmtree(output_dir)
+    print("PASS: incremental export of added, changed and removed objects")
+
+    # --- Test 3: the last of several objects with the same name is kept ---
+    duplicate_ids = [
+        server.add_jpapi_object(
+            "scripts", {"name": "Duplicate", "scriptContents": f"#!/bin/sh\necho {i}\n"}
+        )
+        for i in range(6)
+    ]
+    output_dir = tempfile.mkdtemp()
+    _, downloaded = export(output_dir, download_workers=4)
+    assert set(duplicate_ids) <= set(downloaded), downloaded
+    json_file, payload_file = script_files("Duplicate")
+    with open(os.path.join(output_dir, json_file), "r", encoding="utf-8") as fp:
+        assert json.load(fp)["scriptContents"] == "#!/bin/sh\necho 5\n"
+    with open(os.path.join(output_dir, payload_file), "r", encoding="utf-8") as fp:
+        assert fp.read() == "#!/bin/sh\necho 5\n"
+    shutil.rmtree(output_dir)
+    print("PASS: last object with a duplicate name written")
+
+    server.stop()
+    print("\nAll tests passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/local/autopkg/python
+"""Test script for JamfPackageUploader's skip_unchanged_pkg option, which skips
+replacing a package whose hash matches that of the existing package object and
+whose file is on the Cloud DP.
+
+Requires AutoPkg (autopkglib), so run it directly rather than through pytest.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def main():
+    """Run the tests."""
+    sys.path.insert(0, "/Library/AutoPkg")
+    sys.path.insert(0, TESTS_DIR)
+    sys.path.insert(0, os.path.join(TESTS_DIR, "..", "JamfUploaderProcessors"))
+    sys.path.insert(
+        0, os.path.join(TESTS_DIR, "..", "JamfUploaderProcessors", "JamfUploaderLib")
+    )
+    # pylint: disable=import-error, import-outside-toplevel
+    from fake_jamf_server import DEFAULT_PASSWORD, DEFAULT_USER, FakeJamfServer, seed
+    from JamfPackageUploader import JamfPackageUploader
+
+    server = FakeJamfServer().start()
+    seed(server)
+    work_dir = tempfile.mkdtemp()
+    pkg_path = os.path.join(work_dir, "Dedup-1.0.pkg")
+    with open(pkg_path, "wb") as fp:
+        fp.write(os.urandom(1024 * 1024))
+
+    def run(**env):
+        """Run the processor, and return its outputs and the number of uploads."""
+        processor_env = {
+            key: spec["default"]
+            for key, spec in JamfPackageUploader.input_variables.items()
+            if "default" in spec
+        }
+        processor_env.update(
+            {
+                "JSS_URL": server.url,
+                "API_USERNAME": DEFAULT_USER,
+                "API_PASSWORD": DEFAULT_PASSWORD,
+                "RECIPE_CACHE_DIR": work_dir,
+                "pkg_path": pkg_path,
+                "verbose": 0,
+                "max_tries": 1,
+                **env,
+            }
+        )
+        processor = JamfPackageUploader(env=processor_env)
+        server.uploads.clear()
+        processor.execute()
+        summary = processor.env.get("jamfpackageuploader_summary_result", {})
+        return (
+            processor.env["pkg_uploaded"],
+            processor.env["pkg_metadata_updated"],
+            processor.env["pkg_deduplicated"],
+            len(server.uploads),
+            summary.get("data", {}).get("upload_deduplicated"),
+        )
+
+    # --- Test 1: without the option, a matching package is uploaded again ---
+    assert run() == (True, True, False, 1, "False")
+    assert run(replace_pkg="True")[:4] == (True, True, False, 1)
+    print("PASS: replace_pkg uploads again by default")
+
+    # --- Test 2: with the option, a matching package is not uploaded ---
+    result = run(replace_pkg="True", skip_unchanged_pkg="True")
+    assert result == (False, False, True, 0, "True"), result
+    result = run(
+        replace_pkg="True", skip_unchanged_pkg="True", replace_pkg_metadata="True"
+    )
+    assert result == (False, True, True, 0, "True"), result
+    print("PASS: unchanged package not uploaded, metadata replaced if requested")
+
+    # --- Test 3: a changed package is uploaded ---
+    with open(pkg_path, "ab") as fp:
+        fp.write(b"changed")
+    result = run(replace_pkg="True", skip_unchanged_pkg="True")
+    assert result == (True, True, False, 1, "False"), result
+    print("PASS: changed package uploaded")
+
+    # --- Test 4: an MD5 hash on the server is compared with the MD5 hash ---
+    assert run(replace_pkg="True", md5="True")[:4] == (True, True, False, 1)
+    result = run(replace_pkg="True", skip_unchanged_pkg="True")
+    assert result == (False, False, True, 0, "True"), result
+    print("PASS: MD5 hash compared")
+
+    # --- Test 5: matching metadata is not enough if the file is not on the DP ---
+    server.jcds_files.clear()
+    result = run(replace_pkg="True", skip_unchanged_pkg="True")
+    assert result == (True, True, False, 1, "False"), result
+    for jcds_file in server.jcds_files.values():
+        jcds_file["md5"] = "0" * 32
+    result = run(replace_pkg="True", skip_unchanged_pkg="True")
+    assert result == (True, True, False, 1, "False"), result
+    result = run(replace_pkg="True", skip_unchanged_pkg="True")
+    assert result == (False, False, True, 0, "True"), result
+    print("PASS: package uploaded if its file is missing or differs on the DP")
+
+    server.stop()
+    shutil.rmtree(work_dir)
+    print("\nAll tests passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/local/autopkg/python
+"""Test script for JamfRateLimiter — a token bucket shared between processes."""
+
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "..",
+        "JamfUploaderProcessors",
+        "JamfUploaderLib",
+    ),
+)
+
+from JamfRateLimiter import (  # pylint: disable=import-error, wrong-import-position
+    JamfRateLimiter,
+)
+
+RATE = 20
+BURST = 5
+
+
+def worker(state_dir, count):
+    """Take count tokens from the shared bucket."""
+    limiter = JamfRateLimiter(state_dir, RATE, BURST)
+    for _ in range(count):
+        limiter.acquire()
+
+
+if __name__ == "__main__":
+    state_dir = tempfile.mkdtemp()
+
+    # --- Test 1: burst is allowed, then requests are spaced at the rate ---
+    limiter = JamfRateLimiter(state_dir, RATE, BURST)
+    start = time.monotonic()
+    waits = [limiter.acquire() for _ in range(BURST + 10)]
+    elapsed = time.monotonic() - start
+    assert waits[:BURST] == [0.0] * BURST, waits
+    assert all(w > 0 for w in waits[BURST:]), waits
+    assert 10 / RATE * 0.9 <= elapsed <= 10 / RATE + 0.25, elapsed
+    assert limiter.stats["throttled"] == 10
+    print("PASS: burst then steady rate")
+
+    # --- Test 2: the bucket is shared between processes ---
+    time.sleep(BURST / RATE)  # refill
+    processes = [
+        multiprocessing.Process(target=worker, args=(state_dir, 10)) for _ in range(4)
+    ]
+    start = time.monotonic()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = time.monotonic() - start
+    # 40 requests at 20/s with a burst of 5 take at least 35 / 20 seconds
+    assert elapsed >= (40 - BURST) / RATE * 0.9, elapsed
+    shared = limiter.shared_stats()
+    assert shared["requests"] == BURST + 10 + 40, shared
+    assert shared["seconds_waited"] > 0
+    print("PASS: shared across processes")
+
+    shutil.rmtree(state_dir)
+    print("\nAll tests passed.")
@@ -0,0 +1,105 @@
+#!/usr/local/autopkg/python
+"""Test script for JamfUploaderBase.send_with_retry() against the fake Jamf Pro server.
+
+Requires AutoPkg (autopkglib), so run it directly rather than through pytest.
+"""
+
+import os
+import sys
+import time
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def post_category(processor, server, token, name, max_tries=5):
+    """POST a category through send_with_retry() and return the response."""
+    url = f"{server.url}/api/v1/categories"
+    data = processor.write_json_file(server.url, {"name": name, "priority": 5})
+    return processor.send_with_retry(
+        lambda: processor.curl(
+            api_type="jpapi", request="POST", url=url, token=token, data=data
+        ),
+        "Category",
+        name,
+        "POST",
+        max_tries=max_tries,
+    )
+
+
+def main():
+    """Run the tests."""
+    sys.path.insert(0, "/Library/AutoPkg")
+    sys.path.insert(0, TESTS_DIR)
+    sys.path.insert(
+        0, os.path.join(TESTS_DIR, "..", "JamfUploaderProcessors", "JamfUploaderLib")
+    )
+    # pylint: disable=import-error, import-outside-toplevel
+    from autopkglib import ProcessorError
+    from fake_jamf_server import DEFAULT_PASSWORD, DEFAULT_USER, FakeJamfServer
+    from JamfUploaderBase import JamfUploaderBase
+
+    class Uploader(JamfUploaderBase):
+        """Minimal processor used to send requests."""
+
+        description = __doc__
+        input_variables = {}
+        output_variables = {}
+
+    server = FakeJamfServer().start()
+    processor = Uploader(
+        env={
+            "JSS_URL": server.url,
+            "verbose": 0,
+            "retry_base_delay": "0.05",
+            "http_engine": os.environ.get("JAMFUPLOAD_HTTP_ENGINE", "curl"),
+        }
+    )
+    token = processor.get_api_token_from_basic_auth(
+        server.url, DEFAULT_USER, DEFAULT_PASSWORD
+    )
+
+    # --- Test 1: transient failures are retried, honouring Retry-After ---
+    server.fail_next(2, status=503, retry_after=1)
+    start = time.monotonic()
+    r = post_category(processor, server, token, "Retry-After")
+    assert r.status_code == 201, r.status_code
+    assert time.monotonic() - start >= 2
+    server.fail_next(1, status=429)
+    assert post_category(processor, server, token, "Rate limited").status_code == 201
+    print("PASS: 429/503 retried with Retry-After")
+
+    # --- Test 2: other failures are not retried ---
+    server.fail_next(1, status=400)
+    requests_before = server.stats["requests"]
+    try:
+        post_category(processor, server, token, "Bad request")
+        raise AssertionError("400 did not raise")
+    except ProcessorError:
+        pass
+    assert server.stats["requests"] - requests_before == 1
+    print("PASS: 400 fails without retrying")
+
+    # --- Test 3: retries stop after max_tries ---
+    server.fail_next(3, status=502)
+    requests_before = server.stats["requests"]
+    try:
+        post_category(processor, server, token, "Gateway", max_tries=3)
+        raise AssertionError("exhausted retries did not raise")
+    except ProcessorError:
+        pass
+    assert server.stats["requests"] - requests_before == 3
+    print("PASS: max_tries respected")
+
+    # --- Test 4: backoff delay ---
+    delays = [processor.retry_delay(attempt) for attempt in range(1, 12)]
+    assert 0.025 <= delays[0] <= 0.05, delays
+    assert max(delays) <= 60
+    assert processor.retry_delay(1, retry_after=7) == 7
+    print("PASS: capped exponential backoff")
+
+    server.stop()
+    print("\nAll tests passed.")
+
+
+if __name__ == "__main__":
+    main()
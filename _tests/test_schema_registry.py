@@ -59,6 +59,21 @@ classic_data = {
         "/policies/name/{name}": {
             "get": {"tags": ["policies"], "responses": {"200": {}}},
         },
+        "/policies/id/{id}/subset/{subset}": {
+            "get": {
+                "tags": ["policies"],
+                "parameters": [
+                    {"name": "id", "in": "path", "type": "integer"},
+                    {
+                        "name": "subset",
+                        "in": "path",
+                        "type": "string",
+                        "enum": ["General", "SelfService", "PackageConfiguration"],
+                    },
+                ],
+                "responses": {"200": {}},
+            },
+        },
         "/computergroups": {
             "get": {"tags": ["computergroups"], "responses": {"200": {}}},
         },
@@ -71,6 +86,9 @@ classic_data = {
         "/computergroups/name/{name}": {
             "get": {"tags": ["computergroups"], "responses": {"200": {}}},
         },
+        "/computergroups/id/{id}/subset/{subset}": {
+            "get": {"tags": ["computergroups"], "responses": {"200": {}}},
+        },
         "/computers/id/{id}": {
             "get": {
                 "tags": ["computers"],
@@ -102,6 +120,14 @@ assert resources["computers"]["deprecated"] is True
 assert resources["computers"]["deprecation_date"] == "2025-02-11"
 assert resources["categories"]["has_name_path"] is True
 assert resources["categories"]["has_id_path"] is True
+assert resources["categories"]["has_subset_path"] is False
+assert resources["policies"]["subsets"] == {
+    "General",
+    "SelfService",
+    "PackageConfiguration",
+}
+assert resources["computergroups"]["has_subset_path"] is True
+assert resources["computergroups"]["subsets"] == set()
 print("  Classic parsing: PASS")
 
 # Test JPAPI schema parsing with minimal data
@@ -230,6 +256,8 @@ result = reg.resolve("policy")
 assert result is not None, "policy should resolve"
 assert result["api_type"] == "classic"
 assert result["endpoint"] == "JSSResource/policies"
+assert result["has_subset_path"] is True and "SelfService" in result["subsets"]
+assert result["has_name_path"] is True
 print(f"  resolve('policy'): PASS -> {result['endpoint']}")
 
 # Test 2: Classic alias for computer_group
@@ -280,6 +308,7 @@ result = reg.resolve("computers")
 assert result is not None
 assert result["deprecated"] is True
 assert result["deprecation_date"] == "2025-02-11"
+assert result["has_name_path"] is False
 print(
     f"  resolve('computers'): PASS -> deprecated={result['deprecated']}, date={result['deprecation_date']}"
 )
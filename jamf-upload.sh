@@ -249,6 +249,8 @@ Package Upload arguments:
                             Set CPU type requirement for the pkg
     --send-notification     Set to send a notification when the package is installed
     --replace-pkg-metadata  Set to replace the pkg metadata if no package is uploaded
+    --skip-unchanged-pkg    With --replace, don't upload the pkg if the existing pkg
+                            has the same hash
     --skip-metadata-upload  Set to skip pkg metadata upload
     --replace               Replace existing item
     --jcds                  Deprecated, ignored 
@@ -332,6 +334,14 @@ API Object Read arguments:
     --name <string>         The object name, if --all is not specified
     --all                   Read all objects
     --list                  Output a list all objects and nothing else
+    --download-workers <number>
+                            Number of objects to download at once with --all (default 4)
+    --export-format <string>
+                            With --all, write 'files' (default), or a single 'jsonl' or 'tar' archive
+    --incremental           With --all, only download objects that changed since the last
+                            export to the --output folder, and remove deleted objects
+    --resume                With --all, continue an export to the --output folder that did
+                            not finish
     --type <string>         The object type (e.g. policy)
     --settings-key          For settings-style endpoints, specify a key to get the value of
     --elements-to-remove <string>
@@ -385,6 +395,8 @@ Unused Package Clean arguments:
     --smb_pass <SMB_PASSWORD>
                             Password of the user
     --output <dir>          Optional directory to output the list to a CSV. Directory must exist.
+    --download-workers <number>
+                            Number of policies and patch titles to read at once (default 4)
     --dry-run               Dry run mode. No files will be deleted.
     --slack-url <url>       The slack_webhook_url
 
@@ -549,6 +561,7 @@ flag_takes_value() {
         --days|--days-until-force-install|--device-type|--version) return 0 ;;
         --version-type|--id|--api-filter|--settings-key) return 0 ;;
         --elements-to-remove|--elements-to-retain|--state|--retain-data) return 0 ;;
+        --download-workers|--export-format) return 0 ;;
         --keep|--smb_url|--smb-url|--smb_user*|--smb-user*) return 0 ;;
         --smb_pass*|--smb-pass*) return 0 ;;
         --pkg|--pkg_path|--pkg-path|--pkg-name|--pkg_name) return 0 ;;
@@ -1395,6 +1408,28 @@ while test $# -gt 0; do
             fi
         fi
         ;;
+    --export-format)
+        shift
+        if [[ $processor == "JamfObjectReader" ]]; then
+            if plutil -replace export_format -string "$1" "$temp_processor_plist"; then
+                echo "   [jamf-upload] Wrote export_format='$1' into $temp_processor_plist"
+            fi
+        fi
+        ;;
+    --resume)
+        if [[ $processor == "JamfObjectReader" ]]; then
+            if plutil -replace resume -string "True" "$temp_processor_plist"; then
+                echo "   [jamf-upload] Wrote resume='True' into $temp_processor_plist"
+            fi
+        fi
+        ;;
+    --incremental)
+        if [[ $processor == "JamfObjectReader" ]]; then
+            if plutil -replace incremental -string "True" "$temp_processor_plist"; then
+                echo "   [jamf-upload] Wrote incremental='True' into $temp_processor_plist"
+            fi
+        fi
+        ;;
     --list)
         if [[ $processor == "JamfObjectReader" ]]; then
             if plutil -replace list_only -string "True" "$temp_processor_plist"; then
@@ -1441,6 +1476,14 @@ while test $# -gt 0; do
             fi
         fi
         ;;
+    --download-workers)
+        shift
+        if [[ $processor == "JamfObjectReader" || $processor == "JamfUnusedPackageCleaner" ]]; then
+            if plutil -replace download_workers -string "$1" "$temp_processor_plist"; then
+                echo "   [jamf-upload] Wrote download_workers='$1' into $temp_processor_plist"
+            fi
+        fi
+        ;;
     --state)
         shift
         if [[ $processor == "JamfObjectStateChanger" ]]; then
@@ -1588,6 +1631,13 @@ while test $# -gt 0; do
             fi
         fi
         ;;
+    --skip_unchanged_pkg | --skip-unchanged-pkg)
+        if [[ $processor == "JamfPackageUploader" ]]; then
+            if plutil -replace skip_unchanged_pkg -string "true" "$temp_processor_plist"; then
+                echo "   [jamf-upload] Wrote skip_unchanged_pkg='True' into $temp_processor_plist"
+            fi
+        fi
+        ;;
     --skip_metadata_upload | --skip-metadata-upload)
         if [[ $processor == "JamfPackageUploader" ]]; then
             if plutil -replace skip_metadata_upload -string "true" "$temp_processor_plist"; then